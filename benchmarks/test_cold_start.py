@@ -0,0 +1,67 @@
+"""Cold-start benchmark: import time and first-call latency.
+
+Run with ``pytest benchmarks/test_cold_start.py -s``.  Each measurement runs
+in a fresh interpreter and the best of several runs is compared against a
+budget, overridable through the environment:
+
+- ``SQLNORM_IMPORT_BUDGET_US``      cumulative ``-X importtime`` of the package
+- ``SQLNORM_FIRST_CALL_BUDGET_US``  first ``normalize()`` call after import
+"""
+
+import os
+import subprocess
+import sys
+
+IMPORT_BUDGET_US = int(os.environ.get("SQLNORM_IMPORT_BUDGET_US", "15000"))
+FIRST_CALL_BUDGET_US = int(os.environ.get("SQLNORM_FIRST_CALL_BUDGET_US", "60000"))
+RUNS = int(os.environ.get("SQLNORM_COLD_START_RUNS", "7"))
+
+SAMPLE_SQL = (
+    "SELECT convert(VARCHAR(100) UTF8, group_concat(a SEPARATOR '|')) AS c\n"
+    "FROM (IMPORT INTO (a VARCHAR(10)) FROM JDBC AT CON STATEMENT 'SELECT a FROM dbo.t')\n"
+    "WHERE a REGEXP_LIKE('[0-9]+')"
+)
+
+_FIRST_CALL_SCRIPT = f"""
+import time
+from exasol_sql_normalizer import normalize
+start = time.perf_counter()
+normalize({SAMPLE_SQL!r})
+print(int((time.perf_counter() - start) * 1e6))
+"""
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True,
+    )
+
+
+def measure_import_us() -> int:
+    """Best-of-N cumulative import time of the package in microseconds."""
+    timings = []
+    for _ in range(RUNS):
+        proc = _run_python("-X", "importtime", "-c", "import exasol_sql_normalizer")
+        for line in proc.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            fields = [f.strip() for f in line.split("|")]
+            if len(fields) == 3 and fields[2] == "exasol_sql_normalizer":
+                timings.append(int(fields[1]))
+    return min(timings)
+
+
+def measure_first_call_us() -> int:
+    """Best-of-N latency of the first normalize() call in a fresh process."""
+    return min(int(_run_python("-c", _FIRST_CALL_SCRIPT).stdout) for _ in range(RUNS))
+
+
+def test_import_time_budget():
+    import_us = measure_import_us()
+    print(f"\nimport exasol_sql_normalizer: {import_us} us (budget {IMPORT_BUDGET_US})")
+    assert import_us <= IMPORT_BUDGET_US
+
+
+def test_first_call_budget():
+    first_call_us = measure_first_call_us()
+    print(f"\nfirst normalize() call: {first_call_us} us (budget {FIRST_CALL_BUDGET_US})")
+    assert first_call_us <= FIRST_CALL_BUDGET_US
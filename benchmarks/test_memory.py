@@ -0,0 +1,115 @@
+"""Benchmark: peak memory of ``normalize()`` and each handler, via tracemalloc.
+
+Run with ``pytest benchmarks/test_memory.py -s``.  Generated deployment
+scripts that exercise every handler are normalized under ``tracemalloc``,
+once with the full pipeline and once per handler (``normalize(sql,
+{name})``).  Two numbers are checked against budgets stored as ratios of
+the input size:
+
+- *peak*: the highest traced memory above the level before the call,
+  including the output itself;
+- *retained*: what is still allocated after the output is dropped, i.e.
+  caches that hold on to the input.
+
+Each budget is ``ratio * input size + FIXED_ALLOWANCE``, the allowance
+covering the constant overhead that dominates on tiny inputs.  tracemalloc
+has no cumulative "bytes allocated" counter, so allocation churn shows up
+only through the peak.  tracemalloc slows allocation-heavy code about ten
+times; the 100 MB size takes several minutes per target and is opt-in.
+Overridable through the environment:
+
+- ``SQLNORM_MEMORY_SIZES``         comma-separated input sizes, e.g. ``1K,10M,100M``
+                                   (default ``1K,100K,1M,10M``)
+- ``SQLNORM_MEMORY_BUDGET_SCALE``  factor applied to every ratio (default 1.0)
+"""
+
+import os
+import tracemalloc
+
+import pytest
+
+from exasol_sql_normalizer import handler_names, normalize
+
+SIZES = os.environ.get("SQLNORM_MEMORY_SIZES", "1K,100K,1M,10M")
+BUDGET_SCALE = float(os.environ.get("SQLNORM_MEMORY_BUDGET_SCALE", "1.0"))
+
+FIXED_ALLOWANCE = 256 * 1024
+
+# Peak / input size.  The output is one copy; rewritten statements are held
+# once more until the output is assembled.
+PEAK_BUDGETS = {
+    "normalize": 3.0,
+    "export_into": 2.75,
+    "import_into": 2.75,
+    "import_from": 2.75,
+    "group_concat": 2.75,
+    "convert": 2.75,
+    "regexp_like": 2.75,
+}
+RETAINED_BUDGET = 0.05
+
+_STATEMENTS = (
+    "SELECT * FROM (IMPORT INTO (a INT, b VARCHAR(10)) FROM JDBC AT CON "
+    "STATEMENT 'SELECT a, b FROM dbo.t{i}') x;\n",
+    "SELECT * FROM (IMPORT FROM JDBC AT CON STATEMENT 'SELECT a FROM dbo.u{i} JOIN dbo.v ON 1=1');\n",
+    "EXPORT (SELECT a, b FROM s.t{i} WHERE c > {i}) INTO SCRIPT s.exporter "
+    "WITH TARGET = 'x{i}' MODE = 'append';\n",
+    "SELECT k, GROUP_CONCAT(DISTINCT v ORDER BY v SEPARATOR '|') FROM t{i} GROUP BY k;\n",
+    "SELECT CONVERT(VARCHAR(100) UTF8, name), CONVERT(CHAR(2) ASCII, code) FROM t{i};\n",
+    "SELECT * FROM t{i} WHERE name REGEXP_LIKE('^[A-Z][a-z]+$') AND id > {i};\n",
+    "INSERT INTO stage.orders_{i} SELECT o.id, o.amount FROM stage.raw o "
+    "WHERE o.batch = {i} AND o.status IN ('open', 'paid');\n",
+)
+_BLOCK = "".join(s.format(i=i) for i in range(60) for s in _STATEMENTS)
+
+_UNITS = {"K": 1024, "M": 1024 ** 2}
+
+
+def _parse_size(text: str) -> int:
+    text = text.strip().upper()
+    if text[-1:] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+
+def _generate(size: int) -> str:
+    """About *size* characters of whole statements."""
+    sql = _BLOCK * (size // len(_BLOCK) + 1)
+    return sql[:sql.rfind("\n", 0, size) + 1] or _BLOCK[:_BLOCK.index("\n") + 1]
+
+
+def _measure(sql: str, handlers) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        output = normalize(sql, handlers)
+        peak = tracemalloc.get_traced_memory()[1]
+        del output
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return peak - before, retained - before
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _warm():
+    # Handler imports and regex compilation are not part of the budget
+    for name in handler_names():
+        normalize(_BLOCK, {name})
+    normalize(_BLOCK)
+
+
+@pytest.mark.parametrize("target", list(PEAK_BUDGETS))
+@pytest.mark.parametrize("size", [_parse_size(s) for s in SIZES.split(",") if s.strip()])
+def test_peak_memory_within_budget(size, target):
+    sql = _generate(size)
+    handlers = None if target == "normalize" else {target}
+    peak, retained = _measure(sql, handlers)
+
+    ratio = PEAK_BUDGETS[target] * BUDGET_SCALE
+    print(
+        f"\n{target:<13} {len(sql) / 1024:>10.0f} KiB: peak {peak / len(sql):5.2f}x input "
+        f"(budget {ratio:.2f}x), retained {retained / 1024:.0f} KiB"
+    )
+    assert peak <= ratio * len(sql) + FIXED_ALLOWANCE
+    assert retained <= RETAINED_BUDGET * BUDGET_SCALE * len(sql) + FIXED_ALLOWANCE
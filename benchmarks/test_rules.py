@@ -0,0 +1,91 @@
+"""Benchmark: the built-in rules in one scan vs. the six hand-written handlers.
+
+Run with ``pytest benchmarks/test_rules.py -s``.  ``BUILTIN_RULES`` is
+registered as a single handler and ``normalize(sql, {"rules"})`` is timed
+against ``normalize(sql)``; the outputs must be identical.  Each
+hand-written handler makes its own pass over a statement, so the single
+scan pays off on long statements, e.g. generated views with thousands of
+``UNION ALL`` branches; on scripts of short statements both are dominated
+by statement splitting.  Budgets are minimum speedups, overridable through
+the environment:
+
+- ``SQLNORM_RULES_MIN_SPEEDUP``        one long statement (default 1.15)
+- ``SQLNORM_RULES_MIN_SPEEDUP_SHORT``  a script of short statements (default 0.7)
+"""
+
+import os
+import time
+
+import pytest
+
+from exasol_sql_normalizer import normalize, unregister_handler
+from exasol_sql_normalizer.rules import BUILTIN_RULES, register_rules
+
+MIN_SPEEDUP = float(os.environ.get("SQLNORM_RULES_MIN_SPEEDUP", "1.15"))
+MIN_SPEEDUP_SHORT = float(os.environ.get("SQLNORM_RULES_MIN_SPEEDUP_SHORT", "0.7"))
+RUNS = 3
+
+_BRANCH = (
+    "SELECT o.id, o.amount, c.name, 'open' AS status FROM stage.orders_{i} o "
+    "JOIN stage.customers c ON c.id = o.customer_id WHERE o.batch = {i} "
+    "AND o.region IN ('EU', 'US')\nUNION ALL\n"
+)
+_SPECIAL = (
+    "SELECT k, CONVERT(VARCHAR(100) UTF8, GROUP_CONCAT(v ORDER BY v SEPARATOR '|')), 0, 'x', 0 "
+    "FROM (IMPORT INTO (k INT, v VARCHAR(10)) FROM JDBC AT CON STATEMENT 'SELECT k, v FROM dbo.t{i}') s "
+    "WHERE v REGEXP_LIKE('^[a-z]+$') GROUP BY k\nUNION ALL\n"
+)
+# One statement of about 1.5 MB, every tenth branch with Exasol constructs
+_VIEW = "".join(
+    (_SPECIAL if i % 10 == 0 else _BRANCH).format(i=i) for i in range(8000)
+) + "SELECT 0, 0, '', '', 0;\n"
+
+_STATEMENTS = (
+    "SELECT * FROM (IMPORT INTO (a INT, b VARCHAR(10)) FROM JDBC AT CON "
+    "STATEMENT 'SELECT a, b FROM dbo.t{i}') x;\n",
+    "SELECT * FROM (IMPORT FROM JDBC AT CON STATEMENT 'SELECT a FROM dbo.u{i}');\n",
+    "EXPORT (SELECT a, b FROM s.t{i} WHERE c > {i}) INTO SCRIPT s.exporter "
+    "WITH TARGET = 'x{i}' MODE = 'append';\n",
+    "SELECT k, GROUP_CONCAT(DISTINCT v ORDER BY v SEPARATOR '|') FROM t{i} GROUP BY k;\n",
+    "SELECT CONVERT(VARCHAR(100) UTF8, name), CONVERT(CHAR(2) ASCII, code) FROM t{i};\n",
+    "SELECT * FROM t{i} WHERE name REGEXP_LIKE('^[A-Z][a-z]+$') AND id > {i};\n",
+    "INSERT INTO stage.orders_{i} SELECT o.id, o.amount FROM stage.raw o "
+    "WHERE o.batch = {i} AND o.status IN ('open', 'paid');\n",
+)
+_SCRIPT = "".join(s.format(i=i) for i in range(1500) for s in _STATEMENTS)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _rules_handler():
+    register_rules("rules", BUILTIN_RULES)
+    yield
+    unregister_handler("rules")
+
+
+def _best_of(func, sql) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func(sql)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _compare(name, sql):
+    assert normalize(sql, {"rules"}) == normalize(sql)
+    handlers = _best_of(normalize, sql)
+    rules = _best_of(lambda text: normalize(text, {"rules"}), sql)
+    speedup = handlers / rules
+    print(
+        f"\n{name} ({len(sql) / 1e6:.1f} MB): handlers {handlers * 1000:.0f} ms, "
+        f"rules {rules * 1000:.0f} ms ({speedup:.2f}x)"
+    )
+    return speedup
+
+
+def test_long_statement_speedup():
+    assert _compare("one long statement", _VIEW) >= MIN_SPEEDUP
+
+
+def test_short_statements_speedup():
+    assert _compare("short statements", _SCRIPT) >= MIN_SPEEDUP_SHORT
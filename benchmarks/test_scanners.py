@@ -0,0 +1,111 @@
+"""Benchmark: quote and paren scanners on multi-KB STATEMENT literals.
+
+Run with ``pytest benchmarks/test_scanners.py -s``.  The ``utils`` scanners
+jump to the next quote or paren with ``str.find`` and compiled patterns.
+They are compared with the character-at-a-time loops they replaced (kept
+below as the baseline) on ``IMPORT ... STATEMENT '...'`` blocks whose
+remote query is several KB long.  The budget is the minimum speedup,
+overridable through the environment:
+
+- ``SQLNORM_SCANNER_MIN_SPEEDUP``  time(per-character loop) / time(utils)
+"""
+
+import os
+import time
+
+from exasol_sql_normalizer.utils import extract_quoted_string, find_matching_paren
+
+MIN_SPEEDUP = float(os.environ.get("SQLNORM_SCANNER_MIN_SPEEDUP", "5.0"))
+RUNS = 20
+
+# Remote T-SQL with an escaped quote every line, as generated by ETL tools
+_REMOTE = "".join(
+    f"SELECT o.id, o.amount, ''open'' AS status FROM dbo.orders_{i} o "
+    f"JOIN dbo.customers c ON c.id = o.customer_id WHERE o.batch = {i}\nUNION ALL\n"
+    for i in range(80)
+) + "SELECT 0, 0, ''none'' FROM dbo.dual"
+
+_IMPORT = (
+    "(IMPORT INTO (id INT, amount DECIMAL(18,2), status VARCHAR(10)) "
+    f"FROM JDBC AT SQLSERVER STATEMENT '{_REMOTE}')"
+)
+
+
+def _extract_per_char(sql: str, pos: int) -> tuple[int, str]:
+    i = pos + 1
+    chars = []
+    while i < len(sql):
+        if sql[i] == "'":
+            if i + 1 < len(sql) and sql[i + 1] == "'":
+                chars.append("'")
+                i += 2
+            else:
+                return i + 1, "".join(chars)
+        else:
+            chars.append(sql[i])
+            i += 1
+    return len(sql), "".join(chars)
+
+
+def _paren_per_char(sql: str, open_pos: int) -> int:
+    depth = 1
+    i = open_pos + 1
+    length = len(sql)
+    while i < length:
+        ch = sql[i]
+        if ch == "'":
+            i += 1
+            while i < length:
+                if sql[i] == "'":
+                    if i + 1 < length and sql[i + 1] == "'":
+                        i += 2
+                    else:
+                        break
+                else:
+                    i += 1
+        elif ch == '"':
+            i += 1
+            while i < length and sql[i] != '"':
+                i += 1
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+
+def _best_of(func, *args) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _compare(name, baseline, fast, *args):
+    assert baseline(*args) == fast(*args)
+    slow_time = _best_of(baseline, *args)
+    fast_time = _best_of(fast, *args)
+    speedup = slow_time / fast_time
+    per_char = 1e9 / len(_IMPORT)
+    print(
+        f"\n{name} over {len(_IMPORT) / 1000:.1f} KB: per-character "
+        f"{slow_time * per_char:.1f} ns/char, utils {fast_time * per_char:.2f} ns/char "
+        f"({speedup:.0f}x, budget {MIN_SPEEDUP}x)"
+    )
+    return speedup
+
+
+def test_extract_quoted_string_speedup():
+    pos = _IMPORT.index("'")
+    speedup = _compare("extract_quoted_string", _extract_per_char, extract_quoted_string, _IMPORT, pos)
+    assert speedup >= MIN_SPEEDUP
+
+
+def test_find_matching_paren_speedup():
+    speedup = _compare("find_matching_paren", _paren_per_char, find_matching_paren, _IMPORT, 0)
+    assert speedup >= MIN_SPEEDUP
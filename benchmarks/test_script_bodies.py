@@ -0,0 +1,66 @@
+"""Benchmark: normalizing deployment files dominated by script bodies.
+
+Run with ``pytest benchmarks/test_script_bodies.py -s``.  ``CREATE ... SCRIPT``
+bodies are copied through without being scanned by the handlers, so a file
+that is mostly Lua/Python script text should cost about as much as its SQL
+statements alone.  The budget is the allowed ratio between the two,
+overridable through the environment:
+
+- ``SQLNORM_SCRIPT_RATIO_BUDGET``  time(full file) / time(SQL statements only)
+"""
+
+import os
+import time
+
+from exasol_sql_normalizer import normalize
+
+RATIO_BUDGET = float(os.environ.get("SQLNORM_SCRIPT_RATIO_BUDGET", "4.0"))
+RUNS = int(os.environ.get("SQLNORM_SCRIPT_RUNS", "5"))
+
+_SQL = (
+    "SELECT CONVERT(VARCHAR(100) UTF8, GROUP_CONCAT(a SEPARATOR '|')) AS c\n"
+    "FROM (IMPORT INTO (a VARCHAR(10)) FROM JDBC AT CON STATEMENT 'SELECT a FROM dbo.t')\n"
+    "WHERE a REGEXP_LIKE('[0-9]+');\n"
+)
+
+# Python body full of handler keywords: "import", "export", "convert" ...
+_PY_BODY = "".join(
+    f"import mod{i}\n"
+    f"def convert_{i}(ctx):\n"
+    f"    # EXPORT results, IMPORT more, CONVERT( things\n"
+    f"    return ctx.export(\"IMPORT FROM JDBC AT C STATEMENT 'x{i}'\")\n"
+    for i in range(400)
+)
+
+
+def _script(n: int) -> str:
+    return (
+        f"CREATE OR REPLACE PYTHON3 SCALAR SCRIPT s.udf_{n}(a VARCHAR(10)) "
+        f"RETURNS VARCHAR(10) AS\n{_PY_BODY}/\n"
+    )
+
+
+def _best_of(sql: str) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        normalize(sql)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_script_bodies_are_not_scanned():
+    statements = 20
+    sql_only = _SQL * statements
+    full = "".join(_SQL + _script(i) for i in range(statements))
+
+    sql_time = _best_of(sql_only)
+    full_time = _best_of(full)
+    ratio = full_time / sql_time
+    print(
+        f"\n{len(full) // 1024} KiB file ({1 - len(sql_only) / len(full):.1%} script): "
+        f"{full_time * 1e3:.1f} ms vs {sql_time * 1e3:.1f} ms for SQL only "
+        f"(ratio {ratio:.2f}, budget {RATIO_BUDGET})"
+    )
+    assert normalize(full).count(_PY_BODY) == statements
+    assert ratio <= RATIO_BUDGET
@@ -0,0 +1,63 @@
+"""Benchmark: edit latency of ``NormalizerSession`` against buffer size.
+
+Run with ``pytest benchmarks/test_session.py -s``.  The same keystrokes
+(typing into a statement near the top, then deleting the text again) are
+replayed on a small buffer and on one a hundred times larger.  The edited
+statement is the same in both, so the latency per edit should barely
+depend on the buffer size.  The budget is the largest acceptable ratio,
+overridable through the environment:
+
+- ``SQLNORM_SESSION_RATIO_BUDGET``  latency(large) / latency(small) (default 3)
+"""
+
+import os
+import time
+
+from exasol_sql_normalizer import NormalizerSession, normalize
+
+RATIO_BUDGET = float(os.environ.get("SQLNORM_SESSION_RATIO_BUDGET", "3"))
+RUNS = 3
+
+_STATEMENTS = (
+    "SELECT CONVERT(VARCHAR(10) UTF8, a), b FROM stage.t{i} WHERE b REGEXP_LIKE('[0-9]');\n",
+    "SELECT k, GROUP_CONCAT(v SEPARATOR '|') FROM stage.u{i} GROUP BY k;\n",
+    "INSERT INTO stage.v{i} SELECT o.id, o.amount FROM stage.raw o WHERE o.batch = {i};\n",
+)
+
+
+def _buffer(n: int) -> str:
+    return "".join(_STATEMENTS[i % len(_STATEMENTS)].format(i=i) for i in range(n))
+
+
+def _edit_latency(text: str) -> float:
+    """Best-of-RUNS seconds per edit for typing and deleting a word."""
+    pos = text.index("VARCHAR(10)") + len("VARCHAR(10)")
+    word = " UTF8 x"
+    timings = []
+    for _ in range(RUNS):
+        session = NormalizerSession(text)
+        start = time.perf_counter()
+        for k, ch in enumerate(word):
+            session.edit(pos + k, pos + k, ch)
+        for k in range(len(word), 0, -1):
+            session.edit(pos + k - 1, pos + k, "")
+        timings.append((time.perf_counter() - start) / (2 * len(word)))
+        assert session.text == text
+    return min(timings)
+
+
+def test_edit_latency_independent_of_buffer_size():
+    small = _buffer(200)
+    large = _buffer(20000)
+    session = NormalizerSession(large)
+    assert session.output == normalize(large)
+
+    small_latency = _edit_latency(small)
+    large_latency = _edit_latency(large)
+    ratio = large_latency / small_latency
+    print(
+        f"\nper edit: {small_latency * 1e6:.0f} us on {len(small) / 1e3:.0f} KB, "
+        f"{large_latency * 1e6:.0f} us on {len(large) / 1e6:.1f} MB "
+        f"({ratio:.2f}x, budget {RATIO_BUDGET}x)"
+    )
+    assert ratio <= RATIO_BUDGET
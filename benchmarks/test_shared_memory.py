@@ -0,0 +1,75 @@
+"""Benchmark: shared-memory transport vs. pickling for large scripts.
+
+Run with ``pytest benchmarks/test_shared_memory.py -s``.  A batch of
+multi-MB deployment files, mostly UDF script bodies that normalization
+copies through, is normalized on one warm process pool twice: with plain
+``ProcessPoolExecutor.map(normalize, ...)``, which pickles every file to a
+worker and every result back, and with ``batch.normalize_shared``, which
+passes byte offsets into shared memory.  For such files moving the text is
+a large share of the work.  The gain is small and noisy on shared runners,
+so the default budget leaves headroom and only catches shared memory
+clearly losing; it is the allowed ratio between the two, overridable
+through the environment:
+
+- ``SQLNORM_SHM_RATIO_BUDGET``  time(normalize_shared) / time(executor.map)
+- ``SQLNORM_SHM_WORKERS``       pool size
+- ``SQLNORM_SHM_FILES``         number of ~2 MB files
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from exasol_sql_normalizer import normalize
+from exasol_sql_normalizer.batch import _warm_worker, normalize_shared
+
+RATIO_BUDGET = float(os.environ.get("SQLNORM_SHM_RATIO_BUDGET", "1.25"))
+WORKERS = int(os.environ.get("SQLNORM_SHM_WORKERS", "2"))
+FILES = int(os.environ.get("SQLNORM_SHM_FILES", "16"))
+RUNS = 5
+
+_SQL = (
+    "SELECT * FROM (IMPORT INTO (a VARCHAR(10)) FROM JDBC AT CON "
+    "STATEMENT 'SELECT a FROM dbo.t');\n"
+)
+
+_PY_BODY = "".join(
+    f"def transform_{i}(ctx):\n"
+    f"    return ctx.emit(ctx.value_{i}.strip().upper())\n"
+    for i in range(400)
+)
+
+
+def _file(n: int) -> str:
+    # About 2 MB: 60 UDFs, each preceded by a statement that gets rewritten
+    return "".join(
+        f"{_SQL}CREATE OR REPLACE PYTHON3 SCALAR SCRIPT s.udf_{n}_{i}(a VARCHAR(10)) "
+        f"RETURNS VARCHAR(10) AS\n{_PY_BODY}/\n"
+        for i in range(60)
+    )
+
+
+def test_shared_memory_beats_pickling():
+    files = [_file(n) for n in range(FILES)]
+    size_mb = sum(len(f) for f in files) / 1e6
+
+    pickled = shared = float("inf")
+    with ProcessPoolExecutor(WORKERS, initializer=_warm_worker, initargs=(None,)) as pool:
+        list(pool.map(int, range(WORKERS)))
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            expected = list(pool.map(normalize, files))
+            pickled = min(pickled, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            actual = normalize_shared(files, workers=WORKERS, executor=pool)
+            shared = min(shared, time.perf_counter() - start)
+
+    ratio = shared / pickled
+    print(
+        f"\n{FILES} files, {size_mb:.0f} MB, {WORKERS} workers: "
+        f"executor.map {pickled:.3f} s, shared memory {shared:.3f} s "
+        f"(ratio {ratio:.2f}, budget {RATIO_BUDGET})"
+    )
+    assert actual == expected
+    assert ratio <= RATIO_BUDGET
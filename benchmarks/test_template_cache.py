@@ -0,0 +1,62 @@
+"""Benchmark: replaying a query log through ``TemplateCache``.
+
+Run with ``pytest benchmarks/test_template_cache.py -s``.  The synthetic log
+holds a handful of generated statement shapes, each repeated with new
+dates, batch IDs and sizes, the way ETL schedulers emit them.  The test
+prints the hit rate and the speedup over plain ``normalize()``; the
+thresholds are overridable through the environment:
+
+- ``SQLNORM_TEMPLATE_MIN_HIT_RATE``  lowest acceptable hit rate
+- ``SQLNORM_TEMPLATE_MIN_SPEEDUP``   time(normalize) / time(cache)
+"""
+
+import os
+import time
+
+from exasol_sql_normalizer import TemplateCache, normalize
+
+MIN_HIT_RATE = float(os.environ.get("SQLNORM_TEMPLATE_MIN_HIT_RATE", "0.95"))
+MIN_SPEEDUP = float(os.environ.get("SQLNORM_TEMPLATE_MIN_SPEEDUP", "1.5"))
+LOG_SIZE = int(os.environ.get("SQLNORM_TEMPLATE_LOG_SIZE", "5000"))
+
+_SHAPES = [
+    "SELECT CONVERT(VARCHAR({n}) UTF8, GROUP_CONCAT(a SEPARATOR ',')) AS c\n"
+    "FROM (IMPORT INTO (a VARCHAR(10), d DATE) FROM JDBC AT CON_{s} "
+    "STATEMENT 'SELECT a, d FROM dbo.orders')\n"
+    "WHERE d = '{day}' AND batch_id = {n};\n",
+    "SELECT * FROM (IMPORT FROM JDBC AT CON_{s} STATEMENT 'SELECT * FROM dbo.items') "
+    "WHERE load_date >= '{day}' AND code REGEXP_LIKE('^[A-Z]{{3}}$') AND batch = {n};\n",
+    "EXPORT (SELECT a, b FROM stage.t{s} WHERE batch_id = {n} AND d = '{day}')\n"
+    "INTO SCRIPT etl.writer WITH TARGET = 'stage.t{s}' BATCH = '{n}';\n",
+    "SELECT id, '{day}' AS snapshot FROM stage.t{s} WHERE id > {n};\n",
+]
+
+
+def _log() -> list[str]:
+    return [
+        _SHAPES[i % len(_SHAPES)].format(s=i % 5, n=i, day=f"2024-{i % 12 + 1:02}-{i % 28 + 1:02}")
+        for i in range(LOG_SIZE)
+    ]
+
+
+def test_template_cache_replay():
+    log = _log()
+
+    start = time.perf_counter()
+    expected = [normalize(sql) for sql in log]
+    plain = time.perf_counter() - start
+
+    cache = TemplateCache()
+    start = time.perf_counter()
+    actual = [cache.normalize(sql) for sql in log]
+    cached = time.perf_counter() - start
+
+    speedup = plain / cached
+    print(
+        f"\n{len(log)} statements, {len(cache)} templates: hit rate {cache.hit_rate:.1%}, "
+        f"{plain * 1e6 / len(log):.0f} us -> {cached * 1e6 / len(log):.0f} us per statement "
+        f"(speedup {speedup:.2f}, minimum {MIN_SPEEDUP})"
+    )
+    assert actual == expected
+    assert cache.hit_rate >= MIN_HIT_RATE
+    assert speedup >= MIN_SPEEDUP
@@ -1,3 +1,60 @@
-from .normalizer import normalize
+from .guard import (
+    BudgetExceeded,
+    Guard,
+    InputTooLarge,
+    TooManyRewrites,
+    WorkBudgetExceeded,
+)
+from .normalizer import NormalizeResult, normalize, normalize_to
+from .registry import (
+    Handler,
+    build_pipeline,
+    handler_names,
+    register_handler,
+    unregister_handler,
+)
 
-__all__ = ["normalize"]
+# Optional features are resolved on first access (PEP 562) to keep
+# ``import exasol_sql_normalizer`` cheap.
+_LAZY_EXPORTS = {
+    "Diagnostic": "diagnostics",
+    "NormalizerSession": "session",
+    "split_statements": "statements",
+    "TemplateCache": "template_cache",
+    "fingerprint": "fingerprint",
+    "Rule": "rules",
+    "compile_rules": "rules",
+    "register_rules": "rules",
+}
+
+__all__ = [
+    "normalize",
+    "normalize_to",
+    "NormalizeResult",
+    "Handler",
+    "build_pipeline",
+    "handler_names",
+    "register_handler",
+    "unregister_handler",
+    "Guard",
+    "BudgetExceeded",
+    "InputTooLarge",
+    "TooManyRewrites",
+    "WorkBudgetExceeded",
+    *_LAZY_EXPORTS,
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,21 @@
+"""Imports of optional dependencies."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def require(module: str, extra: str) -> Any:
+    """Import *module*, naming the package extra that provides it if missing.
+
+    Raises:
+        ImportError: If *module* is not installed.
+    """
+    from importlib import import_module
+
+    try:
+        return import_module(module)
+    except ImportError as exc:
+        raise ImportError(
+            f"{module} is required: pip install 'exasol-sql-normalizer[{extra}]'"
+        ) from exc
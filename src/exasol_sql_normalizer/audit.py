@@ -0,0 +1,183 @@
+"""Ingestion of exported ``EXA_DBA_AUDIT_SQL`` CSV files.
+
+``ingest`` streams audit rows from CSV files (plain or gzip-compressed,
+detected from the content), normalizes each ``SQL_TEXT`` with
+``batch.normalize_many`` and writes one output record per row holding the
+row's key columns and the normalized SQL, as JSON Lines or CSV.
+
+Rows are read one at a time; multi-line quoted SQL fields are handled by
+the ``csv`` module, and identical SQL texts are normalized once.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from collections import deque
+from typing import BinaryIO, Iterable, Iterator, TextIO
+
+from .batch import BatchStats, normalize_many
+
+SQL_COLUMN = "SQL_TEXT"
+# Identify a statement in EXA_DBA_AUDIT_SQL
+KEY_COLUMNS = ("SESSION_ID", "STMT_ID")
+OUTPUT_COLUMN = "NORMALIZED_SQL"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class AuditStats:
+    """Outcome of an ``ingest`` call.
+
+    Attributes:
+        rows: Rows read and written.
+        normalized: Distinct SQL texts that ran through the handlers.
+        seconds: Wall-clock time of the whole ingest.
+    """
+
+    __slots__ = ("rows", "normalized", "seconds")
+
+    def __init__(self, rows: int, normalized: int, seconds: float) -> None:
+        self.rows = rows
+        self.normalized = normalized
+        self.seconds = seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"AuditStats(rows={self.rows}, normalized={self.normalized}, "
+            f"rows_per_second={self.rows_per_second:.0f})"
+        )
+
+
+def open_audit_file(path: str, encoding: str = "utf-8") -> TextIO:
+    """Open an audit CSV file for reading; gzip is detected from its first bytes.
+
+    ``"-"`` reads standard input.
+    """
+    raw: BinaryIO = sys.stdin.buffer if path == "-" else open(path, "rb")
+    if raw.peek(2)[:2] == _GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding=encoding, newline="")
+
+
+def read_audit_rows(f: TextIO, columns: list[str] | None = None) -> Iterator[dict[str, str]]:
+    """Yield the rows of an audit CSV as dicts.
+
+    The first line is the header unless *columns* names the columns (for
+    exports written without ``WITH COLUMN NAMES``).
+    """
+    # SQL texts easily exceed the csv module's default 128 KiB field limit
+    if csv.field_size_limit() < 2**31 - 1:
+        csv.field_size_limit(2**31 - 1)
+    yield from csv.DictReader(f, fieldnames=columns)
+
+
+def ingest(
+    sources: str | TextIO | Iterable[str | TextIO],
+    out: TextIO,
+    *,
+    output_format: str = "jsonl",
+    sql_column: str = SQL_COLUMN,
+    key_columns: list[str] | None = None,
+    columns: list[str] | None = None,
+    encoding: str = "utf-8",
+    handlers: Iterable[str] | None = None,
+    workers: int | None = None,
+    chunk_size: int = 256,
+) -> AuditStats:
+    """Normalize the SQL of every audit row in *sources* and write it to *out*.
+
+    Args:
+        sources: Paths (``"-"`` for stdin) or open text files, read in order.
+        out: Text writer for the output records.
+        output_format: ``"jsonl"`` or ``"csv"``.
+        sql_column: Column holding the SQL text.
+        key_columns: Columns copied to each output record.  Defaults to
+            ``KEY_COLUMNS`` when the input has them, else every column but
+            *sql_column*.
+        columns: Column names for input files without a header line.
+        encoding: Encoding of the input files.
+        handlers: Optional subset of handler names to run.
+        workers: Worker processes (see ``batch.normalize_many``).
+        chunk_size: Statements sent to a worker at a time.
+
+    Raises:
+        ValueError: On an unknown *output_format*, or if a column is missing
+            from the input.
+    """
+    if output_format not in ("jsonl", "csv"):
+        raise ValueError(f"Unknown output format: {output_format!r}")
+    if isinstance(sources, str) or hasattr(sources, "read"):
+        sources = [sources]
+
+    started = time.perf_counter()
+    rows = _rows(sources, columns, encoding)
+    first = next(rows, None)
+    if first is None:
+        return AuditStats(0, 0, time.perf_counter() - started)
+    if sql_column not in first:
+        raise ValueError(f"Column {sql_column!r} not found in the audit file")
+    if key_columns is None:
+        key_columns = (
+            list(KEY_COLUMNS) if all(c in first for c in KEY_COLUMNS)
+            else [c for c in first if c != sql_column]
+        )
+    missing = [c for c in key_columns if c not in first]
+    if missing:
+        raise ValueError(f"Key columns not found in the audit file: {', '.join(missing)}")
+
+    # Keys of the rows whose SQL is still being normalized, in input order
+    keys: deque[list[str]] = deque()
+
+    def texts() -> Iterator[str]:
+        for row in _chain(first, rows):
+            keys.append([row[c] for c in key_columns])
+            yield row[sql_column] or ""
+
+    write = _writer(out, output_format, key_columns)
+    stats = BatchStats()
+    for normalized in normalize_many(
+        texts(), handlers, workers=workers, chunk_size=chunk_size, stats=stats,
+    ):
+        write(keys.popleft(), normalized)
+
+    return AuditStats(stats.items, stats.normalized, time.perf_counter() - started)
+
+
+def _rows(
+    sources: Iterable[str | TextIO], columns: list[str] | None, encoding: str,
+) -> Iterator[dict[str, str]]:
+    for source in sources:
+        if isinstance(source, str):
+            with open_audit_file(source, encoding) as f:
+                yield from read_audit_rows(f, columns)
+        else:
+            yield from read_audit_rows(source, columns)
+
+
+def _chain(first: dict[str, str], rest: Iterator[dict[str, str]]) -> Iterator[dict[str, str]]:
+    yield first
+    yield from rest
+
+
+def _writer(out: TextIO, output_format: str, key_columns: list[str]):
+    """Return ``write(keys, sql)`` for *output_format*; CSV gets a header now."""
+    if output_format == "csv":
+        csv_out = csv.writer(out)
+        csv_out.writerow([*key_columns, OUTPUT_COLUMN])
+        return lambda keys, sql: csv_out.writerow([*keys, sql])
+
+    def write_json(keys: list[str], sql: str) -> None:
+        record = dict(zip(key_columns, keys))
+        record[OUTPUT_COLUMN] = sql
+        out.write(json.dumps(record) + "\n")
+
+    return write_json
@@ -0,0 +1,402 @@
+"""Order-preserving bulk normalization on a warm process pool.
+
+``normalize_many`` streams an iterable of statements through worker
+processes in chunks and yields the results in input order.  Identical texts
+are normalized once: a text already queued or in flight is not submitted
+again, and recent results are kept in an LRU cache.  Only a bounded number
+of chunks is in flight, so memory stays flat on arbitrarily long inputs.
+
+``normalize_shared`` is for a list of large texts (multi-MB scripts), where
+pickling the texts to the workers and the results back costs about as much
+as normalizing them.  The inputs are copied once into a shared-memory
+segment as UTF-8 and workers receive only byte offsets; they write their
+outputs into a shared output arena and send back offsets.  Unchanged
+outputs are not copied at all.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Iterable, Iterator, Sequence
+
+from .normalizer import normalize
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from .guard import Guard
+
+# Output arena size relative to the input; outputs that don't fit their
+# task's share of it are sent back pickled instead.
+_ARENA_HEADROOM = 1.25
+
+# Before Python 3.13 every SharedMemory registers with the resource tracker,
+# including segments a worker only attaches to (see ``_attach``)
+_TRACKED_ATTACH = sys.version_info < (3, 13) and os.name == "posix"
+
+_WARMUP_SQL = (
+    "EXPORT(SELECT CONVERT(VARCHAR(1) UTF8, GROUP_CONCAT(a SEPARATOR '|')) "
+    "FROM (IMPORT INTO (a INT) FROM JDBC AT C STATEMENT 'SELECT a FROM t') "
+    "WHERE a REGEXP_LIKE('x')) INTO SCRIPT s.x WITH A = 'b';"
+)
+
+
+def _warm_worker(handlers: frozenset[str] | None) -> None:
+    # Loads every handler module and compiles their regexes up front
+    normalize(_WARMUP_SQL, handlers)
+
+
+def _normalize_chunk(
+    sqls: list[str], handlers: frozenset[str] | None, guard: Guard | None,
+) -> list[str]:
+    return [normalize(sql, handlers, guard=guard) for sql in sqls]
+
+
+def _normalize_chunk_metered(
+    sqls: list[str], handlers: frozenset[str] | None, guard: Guard | None,
+):
+    """``_normalize_chunk`` plus the metrics it recorded, for ``metrics.merge()``."""
+    from . import metrics
+
+    metrics.enable()
+    # Drop counts inherited from a forked parent or left by a failed chunk
+    # (the parent counts failures itself)
+    metrics.drain()
+    return _normalize_chunk(sqls, handlers, guard), metrics.drain()
+
+
+class BatchStats:
+    """Counters filled in by ``normalize_many``.
+
+    Attributes:
+        items: Statements read from the input.
+        normalized: Statements that actually ran through the handlers; the
+            rest were duplicates answered from the queue or the cache.
+    """
+
+    __slots__ = ("items", "normalized")
+
+    def __init__(self) -> None:
+        self.items = 0
+        self.normalized = 0
+
+    def __repr__(self) -> str:
+        return f"BatchStats(items={self.items}, normalized={self.normalized})"
+
+
+class _Chunk:
+    __slots__ = ("texts", "future", "results")
+
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+        self.future: Future[list[str]] | None = None
+        self.results: list[str] | None = None
+
+
+def normalize_many(
+    sqls: Iterable[str],
+    handlers: Iterable[str] | None = None,
+    *,
+    workers: int | None = None,
+    chunk_size: int = 256,
+    cache_size: int = 65536,
+    guard: Guard | None = None,
+    stats: BatchStats | None = None,
+) -> Iterator[str]:
+    """Yield ``normalize(sql, handlers, guard=guard)`` for each of *sqls*, in order.
+
+    Args:
+        sqls: The statements; consumed lazily.
+        handlers: Optional subset of handler names to run.
+        workers: Worker processes (default: CPU count).  ``1`` normalizes in
+            the calling process.
+        chunk_size: Statements sent to a worker at a time.
+        cache_size: Distinct results kept for duplicate texts.
+        guard: Optional ``Guard`` applied to each statement.
+        stats: Optional ``BatchStats`` updated as the input is consumed.
+
+    Raises:
+        ValueError: If *handlers* names an unregistered handler, or a size
+            argument is not positive.
+        BudgetExceeded: If a statement exceeds *guard* in ``"raise"`` mode.
+    """
+    if chunk_size < 1 or cache_size < 1:
+        raise ValueError("chunk_size and cache_size must be positive")
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+    handler_set = None if handlers is None else frozenset(handlers)
+    # Fail on unknown handlers before any worker starts
+    normalize("", handler_set)
+    if stats is None:
+        stats = BatchStats()
+    workers = workers or os.cpu_count() or 1
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_warm_worker, initargs=(handler_set,),
+        )
+    try:
+        yield from _ordered(
+            sqls, pool, handler_set, guard, chunk_size, cache_size, 2 * workers, stats,
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def _ordered(
+    sqls: Iterable[str],
+    pool: ProcessPoolExecutor | None,
+    handlers: frozenset[str] | None,
+    guard: Guard | None,
+    chunk_size: int,
+    cache_size: int,
+    max_chunks: int,
+    stats: BatchStats,
+) -> Iterator[str]:
+    cache: OrderedDict[str, str] = OrderedDict()
+    # Texts queued or in flight -> (chunk, index)
+    queued: dict[str, tuple[_Chunk, int]] = {}
+    # Outputs in input order: a result, or a reference into a chunk
+    pending: deque[str | tuple[_Chunk, int]] = deque()
+    submitted: deque[_Chunk] = deque()
+    current = _Chunk()
+    max_pending = max_chunks * chunk_size * 4
+
+    def submit(chunk: _Chunk) -> None:
+        stats.normalized += len(chunk.texts)
+        if pool is None:
+            chunk.results = _normalize_chunk(chunk.texts, handlers, guard)
+            finish(chunk)
+        else:
+            chunk.future = pool.submit(_normalize_chunk, chunk.texts, handlers, guard)
+            submitted.append(chunk)
+
+    def finish(chunk: _Chunk) -> None:
+        if chunk.results is None:
+            chunk.results = chunk.future.result()
+        for text, result in zip(chunk.texts, chunk.results):
+            del queued[text]
+            cache[text] = result
+        while len(cache) > cache_size:
+            cache.popitem(last=False)
+
+    for sql in sqls:
+        stats.items += 1
+        result = cache.get(sql)
+        if result is not None:
+            cache.move_to_end(sql)
+            pending.append(result)
+        else:
+            ref = queued.get(sql)
+            if ref is None:
+                ref = queued[sql] = (current, len(current.texts))
+                current.texts.append(sql)
+                if len(current.texts) == chunk_size:
+                    submit(current)
+                    current = _Chunk()
+            pending.append(ref)
+
+        # Block on the oldest chunk only when too much is outstanding
+        if len(pending) >= max_pending and not submitted and current.texts:
+            submit(current)
+            current = _Chunk()
+        if submitted and (len(submitted) >= max_chunks or len(pending) >= max_pending):
+            finish(submitted.popleft())
+        while submitted and submitted[0].future.done():
+            finish(submitted.popleft())
+        yield from _ready(pending)
+
+    if current.texts:
+        submit(current)
+    while submitted:
+        finish(submitted.popleft())
+        yield from _ready(pending)
+    yield from _ready(pending)
+
+
+def _ready(pending: deque[str | tuple[_Chunk, int]]) -> Iterator[str]:
+    """Pop and yield the leading outputs that are already known."""
+    while pending:
+        head = pending[0]
+        if type(head) is str:
+            pending.popleft()
+            yield head
+            continue
+        chunk, index = head
+        if chunk.results is None:
+            return
+        pending.popleft()
+        yield chunk.results[index]
+
+
+def normalize_shared(
+    sqls: Sequence[str],
+    handlers: Iterable[str] | None = None,
+    *,
+    workers: int | None = None,
+    guard: Guard | None = None,
+    tasks_per_worker: int = 4,
+    executor: ProcessPoolExecutor | None = None,
+) -> list[str]:
+    """Return ``[normalize(sql, handlers, guard=guard) for sql in sqls]`` computed on a pool.
+
+    Texts travel through shared memory instead of being pickled.  As with
+    ``normalize()``, an unchanged text is returned as the input object.
+
+    Pass a running *executor* to reuse its workers across calls; otherwise
+    a pool of *workers* processes is started for this call.  Either way the
+    texts are split into about ``workers * tasks_per_worker`` tasks, so with
+    an *executor* set *workers* to its size (default: CPU count).  Workers
+    attach to the shared segments only while running a task.
+
+    Raises:
+        ValueError: If *handlers* names an unregistered handler, or
+            *workers* is not positive.
+        BudgetExceeded: If a statement exceeds *guard* in ``"raise"`` mode.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+    handler_set = None if handlers is None else frozenset(handlers)
+    normalize("", handler_set)
+    workers = workers or os.cpu_count() or 1
+    if len(sqls) < 2 or (workers == 1 and executor is None):
+        return [normalize(sql, handler_set, guard=guard) for sql in sqls]
+
+    sizes = [len(sql) if sql.isascii() else len(sql.encode()) for sql in sqls]
+    total = sum(sizes)
+    inputs = SharedMemory(create=True, size=max(total, 1))
+    arena = SharedMemory(create=True, size=max(int(total * _ARENA_HEADROOM), 1))
+    try:
+        spans = []
+        pos = 0
+        buf = inputs.buf
+        for sql, size in zip(sqls, sizes):
+            buf[pos:pos + size] = sql.encode()
+            spans.append((pos, pos + size))
+            pos += size
+
+        tasks = _partition(spans, total, workers * tasks_per_worker)
+        pool = executor or ProcessPoolExecutor(
+            max_workers=workers, initializer=_warm_worker, initargs=(handler_set,),
+        )
+        futures = []
+        try:
+            for first, stop in tasks:
+                futures.append(pool.submit(
+                    _normalize_shared_chunk, inputs.name, arena.name, spans[first:stop],
+                    int(spans[first][0] * _ARENA_HEADROOM),
+                    int(spans[stop - 1][1] * _ARENA_HEADROOM),
+                    handler_set, guard,
+                ))
+            results = []
+            for future in futures:
+                results.extend(future.result())
+        finally:
+            if pool is not executor:
+                pool.shutdown(cancel_futures=True)
+            else:
+                # No task may still be using the segments when they are unlinked
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+
+        out = arena.buf
+        return [
+            sql if result is None
+            else result if type(result) is str
+            else str(out[result[0]:result[1]], "utf-8")
+            for sql, result in zip(sqls, results)
+        ]
+    finally:
+        for segment in (inputs, arena):
+            segment.close()
+            if _TRACKED_ATTACH:
+                # A worker sharing this process's tracker may have dropped
+                # the registration (see ``_attach``); unlink() expects it
+                resource_tracker.register(f"/{segment.name}", "shared_memory")
+            segment.unlink()
+
+
+def _partition(spans: list[tuple[int, int]], total: int, count: int) -> list[tuple[int, int]]:
+    """Split *spans* into up to *count* contiguous runs of similar byte size."""
+    target = max(1, -(-total // count))
+    tasks = []
+    first = 0
+    for i, (_, end) in enumerate(spans):
+        if end >= target * (len(tasks) + 1) or i == len(spans) - 1:
+            tasks.append((first, i + 1))
+            first = i + 1
+    return tasks
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to the parent's segment *name* without taking ownership."""
+    if not _TRACKED_ATTACH:
+        return SharedMemory(name, track=False) if sys.version_info >= (3, 13) else SharedMemory(name)
+    # The registration would make the worker's resource tracker (if it has
+    # its own) unlink the segment and warn about a leak at exit
+    segment = SharedMemory(name)
+    resource_tracker.unregister(f"/{name}", "shared_memory")
+    return segment
+
+
+def _normalize_shared_chunk(
+    inputs_name: str,
+    arena_name: str,
+    spans: list[tuple[int, int]],
+    out_start: int,
+    out_end: int,
+    handlers: frozenset[str] | None,
+    guard: Guard | None,
+) -> list[tuple[int, int] | str | None]:
+    """Normalize the texts at *spans*; results are offsets into the arena.
+
+    ``None`` means unchanged; a ``str`` is an output that did not fit into
+    ``arena[out_start:out_end]``.  The segments are attached for this call
+    only, so a long-lived worker holds no mappings between calls.
+    """
+    inputs = _attach(inputs_name)
+    try:
+        arena = _attach(arena_name)
+        try:
+            return _normalize_spans(
+                inputs.buf, arena.buf, spans, out_start, out_end, handlers, guard,
+            )
+        finally:
+            arena.close()
+    finally:
+        inputs.close()
+
+
+def _normalize_spans(
+    source: memoryview,
+    arena: memoryview,
+    spans: list[tuple[int, int]],
+    out_start: int,
+    out_end: int,
+    handlers: frozenset[str] | None,
+    guard: Guard | None,
+) -> list[tuple[int, int] | str | None]:
+    results: list[tuple[int, int] | str | None] = []
+    pos = out_start
+    for start, end in spans:
+        sql = str(source[start:end], "utf-8")
+        output = normalize(sql, handlers, guard=guard)
+        if output is sql:
+            results.append(None)
+            continue
+        data = output.encode()
+        if pos + len(data) > out_end:
+            results.append(output)
+            continue
+        arena[pos:pos + len(data)] = data
+        results.append((pos, pos + len(data)))
+        pos += len(data)
+    return results
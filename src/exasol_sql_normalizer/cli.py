@@ -0,0 +1,418 @@
+"""Command-line interface: ``python -m exasol_sql_normalizer <command>``."""
+
+import argparse
+import json
+import os
+import sys
+
+
+def _handler_set(value: str) -> frozenset[str]:
+    return frozenset(name.strip() for name in value.split(",") if name.strip())
+
+
+def _guard_from_args(args: argparse.Namespace):
+    if args.max_input_size is None and args.max_rewrites is None and args.max_work is None:
+        return None
+    from .guard import Guard
+
+    return Guard(
+        max_input_size=args.max_input_size,
+        max_rewrites=args.max_rewrites,
+        max_work=args.max_work,
+    )
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    from .server import serve
+
+    try:
+        serve(
+            unix_path=args.unix,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            max_pending=args.max_pending,
+            handlers=args.handlers,
+            guard=_guard_from_args(args),
+            metrics=args.metrics,
+        )
+    except FileExistsError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    return 0
+
+
+def _cmd_changed(args: argparse.Namespace) -> int:
+    from .gitdiff import GitError, normalize_changed
+
+    try:
+        results = normalize_changed(
+            args.base, args.head, args.repo,
+            statements=args.statements, handlers=args.handlers,
+        )
+    except GitError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    for changed in results:
+        if changed.statements is not None:
+            for stmt in changed.statements:
+                record = {
+                    "path": changed.path,
+                    "start_line": stmt.start_line,
+                    "end_line": stmt.end_line,
+                    "sql": stmt.sql,
+                }
+                print(json.dumps(record))
+        elif args.output_dir:
+            target = os.path.join(args.output_dir, changed.path)
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(changed.sql)
+            print(target)
+        else:
+            print(json.dumps({"path": changed.path, "sql": changed.sql}))
+    return 0
+
+
+_SEVERITY_RANK = {"info": 0, "warning": 1, "error": 2}
+
+
+def _cmd_lint(args: argparse.Namespace) -> int:
+    import re
+    from bisect import bisect_right
+
+    from .normalizer import normalize
+
+    threshold = _SEVERITY_RANK[args.fail_on]
+    failed = False
+    for path in args.files:
+        if path == "-":
+            text = sys.stdin.read()
+        else:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        result = normalize(text, args.handlers, report=True, lint=True, strict=args.strict)
+        line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+        for diag in result.diagnostics:
+            line = bisect_right(line_starts, diag.start)
+            column = diag.start - line_starts[line - 1] + 1
+            if args.format == "json":
+                print(json.dumps({
+                    "path": path, "line": line, "column": column,
+                    "start": diag.start, "end": diag.end, "code": diag.code,
+                    "severity": diag.severity, "message": diag.message,
+                }))
+            else:
+                print(f"{path}:{line}:{column}: {diag.severity} {diag.code} {diag.message}")
+            failed = failed or _SEVERITY_RANK[diag.severity] >= threshold
+    return 1 if failed else 0
+
+
+def _column_list(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _cmd_audit(args: argparse.Namespace) -> int:
+    from .audit import ingest
+
+    if args.output in (None, "-"):
+        out = sys.stdout
+    else:
+        out = open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        stats = ingest(
+            args.files, out,
+            output_format=args.format,
+            sql_column=args.sql_column,
+            key_columns=args.keys,
+            columns=args.columns,
+            encoding=args.encoding,
+            handlers=args.handlers,
+            workers=args.workers,
+        )
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(
+        f"{stats.rows} rows ({stats.normalized} distinct statements) in "
+        f"{stats.seconds:.2f} s: {stats.rows_per_second:.0f} rows/s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _cmd_validate(args: argparse.Namespace) -> int:
+    from .validate import UNCHANGED, validate
+
+    try:
+        report = validate(
+            args.files,
+            dialect=args.dialect,
+            handlers=args.handlers,
+            workers=args.workers,
+            cache_path=None if args.no_cache else args.cache,
+        )
+    except (ImportError, OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    for failure in report.failures:
+        if args.format == "json":
+            print(json.dumps({
+                "path": failure.path, "line": failure.line, "column": failure.column,
+                "start": failure.start, "end": failure.end,
+                "handlers": list(failure.handlers), "error": failure.error,
+            }))
+        else:
+            handlers = ",".join(failure.handlers) or UNCHANGED
+            print(f"{failure.path}:{failure.line}:{failure.column}: [{handlers}] {failure.error}")
+
+    print(
+        f"{report.statements} statements, {len(report.failures)} failed "
+        f"({report.parsed} parsed, the rest cached) in {report.seconds:.2f} s",
+        file=sys.stderr,
+    )
+    if report.failures:
+        print("failures by handler (failed / rewritten):", file=sys.stderr)
+        for name, (failed, total) in sorted(report.by_handler.items()):
+            if failed:
+                print(f"  {name:<14} {failed} / {total}", file=sys.stderr)
+    return 0 if report.ok else 1
+
+
+def _cmd_shard(args: argparse.Namespace) -> int:
+    from .sharding import corpus_files, plan_shards, run_shard
+
+    try:
+        if args.list:
+            files = corpus_files(args.root, args.suffix)
+            sizes = dict(files)
+            for index, paths in enumerate(plan_shards(files, args.count, args.strategy)):
+                for path in paths:
+                    print(json.dumps({"path": path, "shard": index, "size": sizes[path]}))
+            return 0
+        if args.index is None or args.output is None:
+            print("shard: --index and --output are required unless --list is given", file=sys.stderr)
+            return 2
+        manifest = run_shard(
+            args.root, args.output, args.index, args.count,
+            strategy=args.strategy,
+            handlers=args.handlers,
+            workers=args.workers,
+            suffix=args.suffix,
+        )
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    stats = manifest["stats"]
+    for entry in manifest["files"]:
+        if "error" in entry:
+            print(f"{entry['path']}: {entry['error']}", file=sys.stderr)
+    print(
+        f"shard {args.index} of {args.count}: {stats['files']} files "
+        f"({stats['bytes'] / 1e6:.1f} MB, {stats['changed']} changed, {stats['errors']} errors) "
+        f"in {stats['seconds']:.2f} s",
+        file=sys.stderr,
+    )
+    return 1 if stats["errors"] else 0
+
+
+def _cmd_merge(args: argparse.Namespace) -> int:
+    from .sharding import merge_shards
+
+    try:
+        report = merge_shards(args.shards, args.output, root=args.root)
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    for path, error in report.errors:
+        print(f"{path}: {error}", file=sys.stderr)
+    for problem in report.problems:
+        print(problem, file=sys.stderr)
+    print(
+        f"{report.shards} shards, {report.files} files ({report.bytes / 1e6:.1f} MB, "
+        f"{report.changed} changed, {len(report.errors)} errors, "
+        f"{len(report.problems)} problems); shards spent {report.seconds:.2f} s",
+        file=sys.stderr,
+    )
+    return 0 if report.ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="exasol-sql-normalizer",
+        description="Rewrite Exasol-specific SQL into standard SQL.",
+    )
+    parser.add_argument(
+        "--handlers", type=_handler_set, default=None,
+        help="comma-separated subset of handlers to run (default: all)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser(
+        "serve", help="run a normalization server with a warm worker pool",
+    )
+    serve.add_argument("--unix", metavar="PATH", help="listen on a Unix socket (framed JSON)")
+    serve.add_argument("--host", default="127.0.0.1", help="HTTP bind address")
+    serve.add_argument("--port", type=int, default=8765, help="HTTP port")
+    serve.add_argument("--workers", type=int, default=None, help="worker processes")
+    serve.add_argument(
+        "--max-pending", type=int, default=None,
+        help="in-flight requests before new ones are rejected (default: 4 x workers)",
+    )
+    serve.add_argument(
+        "--max-input-size", type=int, default=None, metavar="CHARS",
+        help="reject statements longer than CHARS",
+    )
+    serve.add_argument(
+        "--max-rewrites", type=int, default=None, metavar="N",
+        help="reject statements needing more than N rewrites",
+    )
+    serve.add_argument(
+        "--max-work", type=int, default=None, metavar="CHARS",
+        help="reject statements whose handlers scan more than CHARS characters",
+    )
+    serve.add_argument(
+        "--metrics", action="store_true",
+        help="record metrics and serve them at GET /metrics (Prometheus text format)",
+    )
+    serve.set_defaults(func=_cmd_serve)
+
+    changed = commands.add_parser(
+        "changed",
+        help="normalize only the .sql files added or modified between two git revisions",
+        description=(
+            "Normalize the .sql files added or modified between BASE and HEAD "
+            "in a local git repository. Prints one JSON object per file (or per "
+            "changed statement with --statements)."
+        ),
+    )
+    changed.add_argument("base", help="base revision, e.g. origin/main")
+    changed.add_argument("head", nargs="?", default="HEAD", help="head revision (default: HEAD)")
+    changed.add_argument("--repo", default=".", help="path to the git repository")
+    changed.add_argument(
+        "--statements", action="store_true",
+        help="only output statements that overlap the changed lines",
+    )
+    changed.add_argument(
+        "--output-dir", metavar="DIR",
+        help="write normalized files under DIR instead of printing JSON",
+    )
+    changed.set_defaults(func=_cmd_changed)
+
+    lint = commands.add_parser(
+        "lint",
+        help="report expensive remote imports and conversions",
+        description=(
+            "Report query-performance findings (L001-L004) with file, line and "
+            "column. Exits with status 1 if any finding is at least as severe "
+            "as --fail-on."
+        ),
+    )
+    lint.add_argument("files", nargs="+", metavar="FILE", help="SQL files ('-' for stdin)")
+    lint.add_argument("--format", choices=("text", "json"), default="text", help="output format")
+    lint.add_argument(
+        "--fail-on", choices=tuple(_SEVERITY_RANK), default="warning",
+        help="lowest severity that makes the command fail (default: warning)",
+    )
+    lint.add_argument(
+        "--strict", action="store_true",
+        help="also report constructs left unrewritten (S001-S009)",
+    )
+    lint.set_defaults(func=_cmd_lint)
+
+    audit = commands.add_parser(
+        "audit",
+        help="normalize the SQL_TEXT of exported EXA_DBA_AUDIT_SQL CSV files",
+        description=(
+            "Stream audit rows from CSV files (gzip detected automatically), "
+            "normalize each SQL text on a process pool, and write one record "
+            "per row with its key columns. Prints rows/s to stderr."
+        ),
+    )
+    audit.add_argument("files", nargs="+", metavar="FILE", help="CSV or CSV.GZ files ('-' for stdin)")
+    audit.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="output format")
+    audit.add_argument("--output", "-o", metavar="PATH", help="output file (default: stdout)")
+    audit.add_argument("--sql-column", default="SQL_TEXT", help="column holding the SQL text")
+    audit.add_argument(
+        "--keys", type=_column_list, default=None, metavar="COLS",
+        help="comma-separated columns copied to the output "
+             "(default: SESSION_ID,STMT_ID, or all other columns)",
+    )
+    audit.add_argument(
+        "--columns", type=_column_list, default=None, metavar="COLS",
+        help="column names for files exported without a header line",
+    )
+    audit.add_argument("--encoding", default="utf-8", help="input encoding")
+    audit.add_argument("--workers", type=int, default=None, help="worker processes")
+    audit.set_defaults(func=_cmd_audit)
+
+    validate = commands.add_parser(
+        "validate", help="check that every normalized statement parses with sqlglot",
+    )
+    validate.add_argument("files", nargs="+", metavar="FILE", help="SQL files")
+    validate.add_argument(
+        "--dialect", default="tsql", help="sqlglot dialect to parse with (default: tsql)",
+    )
+    validate.add_argument("--workers", type=int, default=None, help="worker processes")
+    validate.add_argument(
+        "--cache", default=".sqlnorm-validate-cache.json", metavar="PATH",
+        help="results of earlier runs, keyed by normalized-text hash "
+             "(default: .sqlnorm-validate-cache.json)",
+    )
+    validate.add_argument("--no-cache", action="store_true", help="parse every statement")
+    validate.add_argument("--format", choices=("text", "json"), default="text")
+    validate.set_defaults(func=_cmd_validate)
+
+    shard = commands.add_parser(
+        "shard",
+        help="normalize one shard of a corpus of .sql files",
+        description=(
+            "Partition the .sql files under ROOT into COUNT shards, the same way "
+            "on every machine, and normalize shard INDEX into OUTPUT together "
+            "with a manifest. Combine the shard outputs with 'merge'."
+        ),
+    )
+    shard.add_argument("root", metavar="ROOT", help="corpus directory")
+    shard.add_argument("--count", type=int, required=True, help="number of shards")
+    shard.add_argument("--index", type=int, default=None, help="shard to process (0-based)")
+    shard.add_argument("--output", "-o", metavar="DIR", help="directory for the normalized files")
+    shard.add_argument(
+        "--strategy", choices=("hash", "size"), default="hash",
+        help="partition by path hash or by size-balanced bin-packing (default: hash)",
+    )
+    shard.add_argument("--workers", type=int, default=None, help="worker processes")
+    shard.add_argument("--suffix", default=".sql", help="file suffix of the corpus (default: .sql)")
+    shard.add_argument(
+        "--list", action="store_true", help="print the partition as JSON lines and exit",
+    )
+    shard.set_defaults(func=_cmd_shard)
+
+    merge = commands.add_parser(
+        "merge",
+        help="combine shard outputs and check every file was processed once",
+        description=(
+            "Copy the normalized files of each shard directory into OUTPUT, write a "
+            "combined manifest with summed statistics, and verify that no shard or "
+            "file is missing, duplicated or altered. Exits with status 1 otherwise."
+        ),
+    )
+    merge.add_argument("shards", nargs="+", metavar="SHARD_DIR", help="outputs of 'shard'")
+    merge.add_argument("--output", "-o", metavar="DIR", required=True, help="merged output directory")
+    merge.add_argument(
+        "--root", metavar="ROOT",
+        help="corpus directory to check the shards' plan against",
+    )
+    merge.set_defaults(func=_cmd_merge)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
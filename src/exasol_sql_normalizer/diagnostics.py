@@ -0,0 +1,59 @@
+"""Diagnostics reported alongside normalized SQL."""
+
+from __future__ import annotations
+
+
+class Diagnostic:
+    """A finding about the input, reported by ``normalize(..., report=True)``.
+
+    Attributes:
+        code: Short machine-readable identifier, e.g. ``"budget-exceeded"``.
+        message: Human-readable description.
+        start: Offset in the input the finding refers to, if any.
+        end: End offset (exclusive), if any.
+        severity: ``"error"``, ``"warning"`` or ``"info"``.
+    """
+
+    __slots__ = ("code", "message", "start", "end", "severity")
+
+    def __init__(
+        self,
+        code: str,
+        message: str,
+        start: int | None = None,
+        end: int | None = None,
+        severity: str = "error",
+    ) -> None:
+        self.code = code
+        self.message = message
+        self.start = start
+        self.end = end
+        self.severity = severity
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Diagnostic):
+            return NotImplemented
+        return (
+            (self.code, self.message, self.start, self.end, self.severity)
+            == (other.code, other.message, other.start, other.end, other.severity)
+        )
+
+    def __repr__(self) -> str:
+        where = "" if self.start is None else f" at {self.start}"
+        return f"Diagnostic({self.severity} {self.code}{where}: {self.message})"
+
+
+class DiagnosticCollector:
+    """Base for the passes that collect diagnostics during one ``normalize()`` call."""
+
+    __slots__ = ("diagnostics",)
+
+    def __init__(self) -> None:
+        self.diagnostics: list[Diagnostic] = []
+
+    def report(self, code: str, message: str, start: int, end: int, severity: str) -> None:
+        self.diagnostics.append(Diagnostic(code, message, start, end, severity))
+
+    def results(self) -> list[Diagnostic]:
+        """Return the findings ordered by position."""
+        return sorted(self.diagnostics, key=lambda d: (d.start, d.code))
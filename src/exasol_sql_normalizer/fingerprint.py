@@ -0,0 +1,85 @@
+"""Query fingerprints for grouping statements by shape.
+
+A fingerprint is a BLAKE2b hash of the normalized SQL's token stream in a
+canonical form:
+
+- whitespace and comments are dropped;
+- keywords and bare identifiers are upper-cased (double-quoted identifiers
+  are case-sensitive and kept as written);
+- string and number literals become ``?``;
+- an ``IN`` list of literals and bind parameters collapses to ``IN (...)``,
+  whatever its length.
+
+``CREATE ... SCRIPT`` bodies are hashed verbatim.  The hash depends only on
+the input text, so fingerprints are stable across processes and machines.
+"""
+
+from __future__ import annotations
+
+import re
+from hashlib import blake2b
+from typing import Iterable
+
+from .normalizer import normalize
+from .statements import script_regions
+
+# Tokens an IN list may hold and still be collapsed
+_IN_LIST_ITEMS = frozenset({"?", ",", "-", "+"})
+
+# The token kinds of ``tokens.tokenize`` folded into three groups, so that
+# ``findall`` does the per-token work: (literal, quoted identifier, word or
+# punctuation).  Whitespace and comments match with all groups empty.
+_CANONICAL_TOKEN = re.compile(
+    r"('[^']*(?:''[^']*)*'?|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)"
+    r'|("[^"]*"?)'
+    r"|\s+|--[^\n]*|/\*[\s\S]*?(?:\*/|\Z)"
+    r"|([^\W\d]\w*(?:[$#]\w*)*|.)",
+    re.DOTALL,
+)
+
+
+def fingerprint(sql: str, handlers: Iterable[str] | None = None) -> str:
+    """Return the fingerprint of *sql* after normalization, as 16 hex digits."""
+    return fingerprint_normalized(normalize(sql, handlers))
+
+
+def fingerprint_normalized(sql: str) -> str:
+    """Return the fingerprint of *sql*, which is already normalized."""
+    return blake2b(canonical(sql).encode(), digest_size=8).hexdigest()
+
+
+def canonical(sql: str) -> str:
+    """Return the canonical token text that ``fingerprint_normalized`` hashes."""
+    out: list[str] = []
+    pos = 0
+    for start, end in script_regions(sql):
+        _append_tokens(sql, pos, start, out)
+        out.append(sql[start:end].strip())
+        pos = end
+    _append_tokens(sql, pos, len(sql), out)
+    return " ".join(out)
+
+
+def _append_tokens(sql: str, start: int, end: int, out: list[str]) -> None:
+    # Index in *out* just after the "(" of an IN list still being collapsed
+    in_list = -1
+    for literal, quoted, other in _CANONICAL_TOKEN.findall(sql, start, end):
+        if other:
+            text = other.upper()
+        elif literal:
+            text = "?"
+        elif quoted:
+            text = quoted
+        else:
+            continue
+
+        if in_list != -1:
+            if text == ")":
+                del out[in_list:]
+                out.append("...")
+                in_list = -1
+            elif text not in _IN_LIST_ITEMS:
+                in_list = -1
+        elif text == "(" and out and out[-1] == "IN":
+            in_list = len(out) + 1
+        out.append(text)
@@ -0,0 +1,167 @@
+"""Normalize only the ``.sql`` files changed between two git revisions.
+
+Shells out to plain ``git`` on a local repository: the file list comes from
+``git diff --diff-filter=AM``, contents from ``git cat-file`` at the head
+revision, and changed line ranges from ``git diff -U0`` hunks.  External
+diff drivers are disabled and revisions follow ``--end-of-options``, so
+neither the user's git config nor a revision starting with ``-`` changes
+what is parsed.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+from bisect import bisect_right
+from typing import Iterable
+
+from .normalizer import normalize
+from .statements import split_statements
+
+_SQL_PATHSPECS = ("*.sql", "*.SQL")
+
+# "@@ -12,3 +14,0 @@" -> new-side start line and optional line count
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
+
+
+class GitError(RuntimeError):
+    """Raised when a git command fails."""
+
+
+def _git(repo: str, *args: str) -> bytes:
+    proc = subprocess.run(["git", "-C", repo, *args], capture_output=True)
+    if proc.returncode != 0:
+        raise GitError(
+            f"git {' '.join(args)} failed: {proc.stderr.decode(errors='replace').strip()}"
+        )
+    return proc.stdout
+
+
+def changed_sql_files(base: str, head: str, repo: str = ".") -> list[str]:
+    """Return ``.sql`` paths added or modified between *base* and *head*."""
+    out = _git(
+        repo, "diff", "--no-ext-diff", "--name-only", "-z", "--no-renames", "--diff-filter=AM",
+        "--end-of-options", base, head, "--", *_SQL_PATHSPECS,
+    )
+    return [path for path in out.decode().split("\0") if path]
+
+
+def read_file_at(rev: str, path: str, repo: str = ".") -> str:
+    """Return the contents of *path* at revision *rev*."""
+    return _git(repo, "cat-file", "blob", "--end-of-options", f"{rev}:{path}").decode("utf-8", errors="replace")
+
+
+def changed_line_ranges(base: str, head: str, path: str, repo: str = ".") -> list[tuple[int, int]]:
+    """Return 1-based inclusive line ranges of *path* at *head* touched by the diff.
+
+    A pure deletion is reported as the lines on either side of it, so the
+    statement the lines were removed from still counts as changed.
+    """
+    out = _git(
+        repo, "diff", "--no-ext-diff", "-U0", "--no-color",
+        "--end-of-options", base, head, "--", path,
+    ).decode("utf-8", errors="replace")
+    ranges = []
+    for m in _HUNK_HEADER.finditer(out):
+        start = int(m.group(1))
+        count = 1 if m.group(2) is None else int(m.group(2))
+        if count == 0:
+            ranges.append((max(start, 1), start + 1))
+        else:
+            ranges.append((start, start + count - 1))
+    return ranges
+
+
+class ChangedStatement:
+    """A normalized statement overlapping the diff.
+
+    Attributes:
+        start_line: First line of the statement at the head revision (1-based).
+        end_line: Last line of the statement (inclusive).
+        sql: The normalized statement text.
+    """
+
+    __slots__ = ("start_line", "end_line", "sql")
+
+    def __init__(self, start_line: int, end_line: int, sql: str) -> None:
+        self.start_line = start_line
+        self.end_line = end_line
+        self.sql = sql
+
+    def __repr__(self) -> str:
+        return f"ChangedStatement(lines={self.start_line}-{self.end_line})"
+
+
+def changed_statements(
+    text: str,
+    line_ranges: list[tuple[int, int]],
+    handlers: Iterable[str] | None = None,
+) -> list[ChangedStatement]:
+    """Normalize the statements of *text* that overlap *line_ranges*."""
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+
+    def line_of(pos: int) -> int:
+        return bisect_right(line_starts, pos)
+
+    result = []
+    for start, end in split_statements(text):
+        stmt = text[start:end]
+        stripped = stmt.lstrip()
+        if not stripped:
+            continue
+        first = line_of(start + len(stmt) - len(stripped))
+        last = line_of(start + len(stmt.rstrip()) - 1)
+        if any(lo <= last and first <= hi for lo, hi in line_ranges):
+            result.append(ChangedStatement(first, last, normalize(stripped.rstrip(), handlers)))
+    return result
+
+
+class ChangedFile:
+    """Normalization result for one changed file.
+
+    Attributes:
+        path: Repository-relative path.
+        sql: The whole normalized file, or ``None`` in statement mode.
+        statements: Normalized statements overlapping the diff, or ``None``
+            when statement filtering was not requested.
+    """
+
+    __slots__ = ("path", "sql", "statements")
+
+    def __init__(
+        self, path: str, sql: str | None, statements: list[ChangedStatement] | None,
+    ) -> None:
+        self.path = path
+        self.sql = sql
+        self.statements = statements
+
+    def __repr__(self) -> str:
+        return f"ChangedFile(path={self.path!r})"
+
+
+def normalize_changed(
+    base: str,
+    head: str = "HEAD",
+    repo: str = ".",
+    *,
+    statements: bool = False,
+    handlers: Iterable[str] | None = None,
+) -> list[ChangedFile]:
+    """Normalize the ``.sql`` files added or modified between two revisions.
+
+    With ``statements=True`` only the statements overlapping the changed
+    lines are normalized (``ChangedFile.statements``) instead of whole files.
+
+    Raises:
+        GitError: If a git command fails (unknown revision, not a repo, ...).
+    """
+    results = []
+    for path in changed_sql_files(base, head, repo):
+        text = read_file_at(head, path, repo)
+        if statements:
+            ranges = changed_line_ranges(base, head, path, repo)
+            stmts = changed_statements(text, ranges, handlers)
+            results.append(ChangedFile(path, None, stmts))
+        else:
+            results.append(ChangedFile(path, normalize(text, handlers), None))
+    return results
@@ -0,0 +1,130 @@
+"""Resource limits for normalizing untrusted input.
+
+A ``Guard`` bounds a single ``normalize()`` call by input size, number of
+rewrites, and scan work.  Scan work is counted in characters: the scanning
+loops in ``utils`` and the handlers report what they examine through
+``charge()``, which is a no-op unless a guarded call is active in the
+current context.  Exceeding a limit raises a ``BudgetExceeded`` subclass
+from inside the scan, so the call stops promptly without killing threads.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+
+
+class BudgetExceeded(Exception):
+    """Raised when a guarded ``normalize()`` call exceeds one of its limits.
+
+    Attributes:
+        limit: Name of the exceeded limit.
+        budget: The configured limit.
+        used: The amount used when the limit was hit.
+    """
+
+    limit = "budget"
+
+    def __init__(self, budget: int, used: int) -> None:
+        super().__init__(f"{self.limit} limit of {budget} exceeded ({used})")
+        self.budget = budget
+        self.used = used
+
+    def __reduce__(self):
+        return type(self), (self.budget, self.used)
+
+
+class InputTooLarge(BudgetExceeded):
+    """The input is longer than ``Guard.max_input_size`` characters."""
+
+    limit = "input size"
+
+
+class TooManyRewrites(BudgetExceeded):
+    """Handlers made more than ``Guard.max_rewrites`` rewrites."""
+
+    limit = "rewrite"
+
+
+class WorkBudgetExceeded(BudgetExceeded):
+    """Handlers scanned more than ``Guard.max_work`` characters."""
+
+    limit = "work"
+
+
+class _Meter:
+    __slots__ = ("budget", "used")
+
+    def __init__(self, budget: int) -> None:
+        self.budget = budget
+        self.used = 0
+
+    def spend(self, chars: int) -> None:
+        self.used += chars
+        if self.used > self.budget:
+            raise WorkBudgetExceeded(self.budget, self.used)
+
+
+_ACTIVE_METER: ContextVar[_Meter | None] = ContextVar("exasol_sql_normalizer_meter", default=None)
+
+
+def charge(chars: int) -> None:
+    """Count *chars* scanned characters against the active work budget."""
+    meter = _ACTIVE_METER.get()
+    if meter is not None:
+        meter.spend(chars)
+
+
+class Guard:
+    """Limits for one ``normalize()`` call.
+
+    Args:
+        max_input_size: Maximum input length in characters.
+        max_rewrites: Maximum total number of rewrites across handlers.
+        max_work: Maximum number of characters the handlers may scan.  Each
+            handler pass counts, so a reasonable value is a small multiple
+            of the input size.
+        on_exceed: ``"raise"`` to raise a ``BudgetExceeded`` subclass, or
+            ``"passthrough"`` to return the input unchanged with a
+            ``budget-exceeded`` diagnostic (see ``normalize(report=True)``).
+    """
+
+    __slots__ = ("max_input_size", "max_rewrites", "max_work", "on_exceed")
+
+    def __init__(
+        self,
+        max_input_size: int | None = None,
+        max_rewrites: int | None = None,
+        max_work: int | None = None,
+        on_exceed: str = "raise",
+    ) -> None:
+        if on_exceed not in ("raise", "passthrough"):
+            raise ValueError(f"on_exceed must be 'raise' or 'passthrough', not {on_exceed!r}")
+        self.max_input_size = max_input_size
+        self.max_rewrites = max_rewrites
+        self.max_work = max_work
+        self.on_exceed = on_exceed
+
+    def check_input(self, sql: str) -> None:
+        """Raise ``InputTooLarge`` if *sql* exceeds ``max_input_size``."""
+        if self.max_input_size is not None and len(sql) > self.max_input_size:
+            raise InputTooLarge(self.max_input_size, len(sql))
+
+    def check_rewrites(self, count: int) -> None:
+        """Raise ``TooManyRewrites`` if *count* exceeds ``max_rewrites``."""
+        if self.max_rewrites is not None and count > self.max_rewrites:
+            raise TooManyRewrites(self.max_rewrites, count)
+
+    def start_metering(self):
+        """Activate the work budget in the current context; returns a reset token."""
+        meter = None if self.max_work is None else _Meter(self.max_work)
+        return _ACTIVE_METER.set(meter)
+
+    @staticmethod
+    def stop_metering(token) -> None:
+        _ACTIVE_METER.reset(token)
+
+    def __repr__(self) -> str:
+        return (
+            f"Guard(max_input_size={self.max_input_size}, max_rewrites={self.max_rewrites}, "
+            f"max_work={self.max_work}, on_exceed={self.on_exceed!r})"
+        )
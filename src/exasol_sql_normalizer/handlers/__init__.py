@@ -1,15 +1,33 @@
-from .import_into import normalize_import_into
-from .import_from import normalize_import_from
-from .export_into import normalize_export_into
-from .group_concat import normalize_group_concat
-from .convert import normalize_convert_charset
-from .regexp_like import normalize_regexp_like
-
-__all__ = [
-    "normalize_import_into",
-    "normalize_import_from",
-    "normalize_export_into",
-    "normalize_group_concat",
-    "normalize_convert_charset",
-    "normalize_regexp_like",
-]
+# Handler modules are imported on first attribute access (PEP 562) so that
+# ``import exasol_sql_normalizer`` does not pay for handlers it never runs.
+_EXPORTS = {
+    "normalize_import_into": "import_into",
+    "normalize_import_from": "import_from",
+    "normalize_export_into": "export_into",
+    "normalize_group_concat": "group_concat",
+    "normalize_convert_charset": "convert",
+    "normalize_regexp_like": "regexp_like",
+    "import_into_edits": "import_into",
+    "import_from_edits": "import_from",
+    "export_into_edits": "export_into",
+    "group_concat_edits": "group_concat",
+    "convert_charset_edits": "convert",
+    "regexp_like_edits": "regexp_like",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -11,48 +11,55 @@ To:
 
 import re
 
-from ..utils import find_matching_paren
+from ..guard import charge
+from ..utils import apply_edits, find_matching_paren, matching_paren, skip_spans, skip_whitespace
 
 # Charset keywords that identify Exasol's CONVERT form
 _CHARSETS = {"UTF8", "ASCII"}
 
+# A word (type name or charset) with the whitespace around it
+_WORD = re.compile(r"\s*(\w*)\s*")
+
 
 def normalize_convert_charset(sql: str) -> str:
     """Rewrite Exasol CONVERT(type charset, expr) as CAST(expr AS type)."""
-    result = []
+    return apply_edits(sql, convert_charset_edits(sql))
+
+
+def convert_charset_edits(sql: str) -> list[tuple[int, int, str]]:
+    """Return ``(start, end, replacement)`` edits for every Exasol CONVERT call."""
+    edits = []
     upper = sql.upper()
+    charge(len(sql))
+    skips = skip_spans(sql)
     i = 0
     length = len(sql)
 
     while i < length:
         match_pos = upper.find("CONVERT", i)
+        charge((length if match_pos == -1 else match_pos) - i)
         if match_pos == -1:
-            result.append(sql[i:])
             break
 
         # Make sure it's not part of a longer identifier
         if match_pos > 0 and (upper[match_pos - 1].isalnum() or upper[match_pos - 1] == "_"):
-            result.append(sql[i:match_pos + 7])
             i = match_pos + 7
             continue
         after_end = match_pos + 7
         if after_end < length and (upper[after_end].isalnum() or upper[after_end] == "_"):
-            result.append(sql[i:match_pos + 7])
             i = match_pos + 7
             continue
 
-        # Check not inside a string
-        if _is_inside_string(sql, match_pos):
-            result.append(sql[i:match_pos + 7])
-            i = match_pos + 7
+        # Skip keywords inside strings, quoted identifiers and comments
+        skip_end = skips.end_at(match_pos)
+        if skip_end != -1:
+            i = skip_end
             continue
 
         # Find opening paren
-        after_kw = sql[match_pos + 7:].lstrip()
-        paren_offset = match_pos + 7 + (len(sql[match_pos + 7:]) - len(after_kw))
+        paren_offset = skip_whitespace(sql, match_pos + 7)
 
         if paren_offset >= length or sql[paren_offset] != "(":
-            result.append(sql[i:match_pos + 7])
             i = match_pos + 7
             continue
 
@@ -60,7 +67,6 @@ def normalize_convert_charset(sql: str) -> str:
         try:
             close_paren = find_matching_paren(sql, paren_offset)
         except ValueError:
-            result.append(sql[i:match_pos + 7])
             i = match_pos + 7
             continue
 
@@ -70,16 +76,17 @@ def normalize_convert_charset(sql: str) -> str:
         parsed = _parse_exasol_convert(inner)
         if parsed is None:
             # Not an Exasol CONVERT (no charset) — leave as-is
-            result.append(sql[i:close_paren + 1])
             i = close_paren + 1
             continue
 
         type_str, expr = parsed
-        result.append(sql[i:match_pos])
-        result.append(f"CAST({expr} AS {type_str})")
+        # The scan resumes after this call, so rewrite nested CONVERTs now;
+        # otherwise a second normalize() pass would still find work to do.
+        expr = normalize_convert_charset(expr)
+        edits.append((match_pos, close_paren + 1, f"CAST({expr} AS {type_str})"))
         i = close_paren + 1
 
-    return "".join(result)
+    return edits
 
 
 def _parse_exasol_convert(inner: str) -> tuple[str, str] | None:
@@ -88,86 +95,36 @@ def _parse_exasol_convert(inner: str) -> tuple[str, str] | None:
     Returns (type_str, expression) if this is an Exasol CONVERT with charset,
     or None if it's not.
     """
-    # The first argument is a type like "VARCHAR(10000) UTF8"
-    # We need to find the comma that separates type from expression,
-    # but the type itself may contain parens (e.g., VARCHAR(10000), DECIMAL(10,2))
-
-    i = 0
-    inner_stripped = inner.lstrip()
-    i = len(inner) - len(inner_stripped)
-    length = len(inner)
-
-    # Parse the type: identifier followed by optional (precision) followed by optional charset
-    # First, get the type name
-    type_start = i
-    while i < length and (inner[i].isalnum() or inner[i] == "_"):
-        i += 1
-
-    type_name = inner[type_start:i]
+    # The first argument is a type like "VARCHAR(10000) UTF8"; the type
+    # itself may contain parens (VARCHAR(10000), DECIMAL(10,2)), so the
+    # comma before the expression is only looked for after the charset.
+    charge(len(inner))
+
+    # The type name, then an optional (precision)
+    match = _WORD.match(inner)
+    type_name = match.group(1)
     if not type_name:
         return None
-
-    # Optional precision in parens: (10000) or (10,2)
     type_with_precision = type_name
-    rest = inner[i:].lstrip()
-    i = len(inner) - len(rest)
-
-    if i < length and inner[i] == "(":
-        # Find matching close paren for precision
-        depth = 1
-        j = i + 1
-        while j < length and depth > 0:
-            if inner[j] == "(":
-                depth += 1
-            elif inner[j] == ")":
-                depth -= 1
-            j += 1
-        type_with_precision = inner[type_start:j].strip()
-        # Reconstruct properly: type_name + paren content
-        type_with_precision = type_name + inner[i:j]
-        i = j
-
-    # Check for charset keyword
-    rest = inner[i:].lstrip()
-    i = len(inner) - len(rest)
-
-    charset_start = i
-    while i < length and (inner[i].isalnum() or inner[i] == "_"):
-        i += 1
-
-    potential_charset = inner[charset_start:i].upper()
-
-    if potential_charset not in _CHARSETS:
-        # No charset — not an Exasol CONVERT
+    i = match.end()
+    if i < len(inner) and inner[i] == "(":
+        close = matching_paren(inner, i)
+        if close == -1:
+            return None
+        type_with_precision = type_name + inner[i:close + 1]
+        i = close + 1
+
+    # Then the charset keyword; without one this is not an Exasol CONVERT
+    match = _WORD.match(inner, i)
+    if match.group(1).upper() not in _CHARSETS:
         return None
 
-    # Now expect a comma separating type from expression
-    rest = inner[i:].lstrip()
-    i = len(inner) - len(rest)
-
-    if i >= length or inner[i] != ",":
+    # Everything after the separating comma is the expression
+    i = match.end()
+    if i >= len(inner) or inner[i] != ",":
         return None
-
-    # Everything after the comma is the expression
     expr = inner[i + 1:].strip()
     if not expr:
         return None
 
     return (type_with_precision, expr)
-
-
-def _is_inside_string(sql: str, pos: int) -> bool:
-    """Check if position pos is inside a single-quoted string."""
-    in_string = False
-    i = 0
-    while i < pos:
-        if sql[i] == "'":
-            if in_string:
-                if i + 1 < len(sql) and sql[i + 1] == "'":
-                    i += 2
-                    continue
-                in_string = False
-            else:
-                in_string = True
-        i += 1
-    return in_string
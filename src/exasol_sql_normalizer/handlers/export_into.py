@@ -17,26 +17,45 @@ To:
 
 import re
 
-from ..utils import is_inside_string, skip_whitespace
-from .import_into import _find_matching_paren
+from ..guard import charge
+from ..utils import (
+    apply_edits,
+    closing_quote,
+    matching_paren,
+    skip_spans,
+    skip_whitespace,
+)
+
+# What ends or hides the end of a WITH clause
+_WITH_CLAUSE_SCAN = re.compile(r"[;']")
+# INTO SCRIPT <target>
+_INTO_SCRIPT = re.compile(r"INTO\s+SCRIPT\s+(\S+)", re.IGNORECASE)
 
 
 def normalize_export_into(sql: str) -> str:
     """Replace all EXPORT(...) INTO SCRIPT blocks with CREATE TABLE AS statements."""
-    result = []
+    return apply_edits(sql, export_into_edits(sql))
+
+
+def export_into_edits(sql: str) -> list[tuple[int, int, str]]:
+    """Return ``(start, end, replacement)`` edits for every EXPORT INTO SCRIPT block."""
+    edits = []
     upper = sql.upper()
+    charge(len(sql))
+    skips = skip_spans(sql)
     i = 0
     length = len(sql)
 
     while i < length:
         match_pos = upper.find("EXPORT", i)
+        charge((length if match_pos == -1 else match_pos) - i)
         if match_pos == -1:
-            result.append(sql[i:])
             break
 
-        if is_inside_string(sql, match_pos):
-            result.append(sql[i:match_pos + 6])
-            i = match_pos + 6
+        # Skip keywords inside strings, quoted identifiers and comments
+        skip_end = skips.end_at(match_pos)
+        if skip_end != -1:
+            i = skip_end
             continue
 
         cursor = match_pos + 6
@@ -44,17 +63,12 @@ def normalize_export_into(sql: str) -> str:
 
         # Expect opening paren immediately after EXPORT
         if cursor >= length or sql[cursor] != "(":
-            result.append(sql[i:match_pos + 6])
             i = match_pos + 6
             continue
 
-        # Append everything before EXPORT
-        result.append(sql[i:match_pos])
-
         # Find matching closing paren
-        close_paren = _find_matching_paren(sql, cursor)
+        close_paren = matching_paren(sql, cursor)
         if close_paren == -1:
-            result.append(sql[match_pos:match_pos + 6])
             i = match_pos + 6
             continue
 
@@ -64,57 +78,38 @@ def normalize_export_into(sql: str) -> str:
         cursor = skip_whitespace(sql, cursor)
 
         # Expect: INTO SCRIPT <target>
-        into_match = re.match(
-            r'INTO\s+SCRIPT\s+(\S+)',
-            sql[cursor:],
-            re.IGNORECASE,
-        )
+        into_match = _INTO_SCRIPT.match(sql, cursor)
         if not into_match:
-            result.append(sql[match_pos:close_paren + 1])
             i = close_paren + 1
             continue
+        charge(into_match.end() - cursor)
 
         target_name = into_match.group(1)
-        cursor += into_match.end()
+        cursor = into_match.end()
         cursor = skip_whitespace(sql, cursor)
 
         # Strip optional WITH ... ; tail
         if upper[cursor:cursor + 4] == "WITH":
             cursor = _skip_with_clause(sql, cursor)
 
-        result.append(f"CREATE TABLE {target_name} AS\n{inner_query}")
+        edits.append((match_pos, cursor, f"CREATE TABLE {target_name} AS\n{inner_query}"))
         i = cursor
 
-    return "".join(result)
+    return edits
 
 
 def _skip_with_clause(sql: str, pos: int) -> int:
     """Skip past WITH key=value pairs until ; or end of string."""
-    length = len(sql)
+    search = _WITH_CLAUSE_SCAN.search
     i = pos + 4  # past "WITH"
 
-    while i < length:
-        ch = sql[i]
-        if ch == ";":
+    while True:
+        m = search(sql, i)
+        if m is None:
+            charge(len(sql) - pos)
+            return len(sql)
+        i = m.start()
+        if sql[i] == ";":
+            charge(i - pos)
             return i + 1  # past the semicolon
-        elif ch == "'":
-            i = _skip_single_quoted(sql, i)
-        else:
-            i += 1
-
-    return length
-
-
-def _skip_single_quoted(sql: str, pos: int) -> int:
-    """Skip past a single-quoted string starting at pos."""
-    i = pos + 1
-    length = len(sql)
-    while i < length:
-        if sql[i] == "'":
-            if i + 1 < length and sql[i + 1] == "'":
-                i += 2
-            else:
-                return i + 1
-        else:
-            i += 1
-    return length
+        i = closing_quote(sql, i) + 1
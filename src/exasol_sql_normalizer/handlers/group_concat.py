@@ -10,35 +10,51 @@ Strips the SEPARATOR clause while preserving DISTINCT, ORDER BY, and nested func
 
 import re
 
-from ..utils import find_matching_paren
+from ..guard import charge
+from ..utils import (
+    apply_edits,
+    closing_quote,
+    find_matching_paren,
+    matching_paren,
+    skip_spans,
+    skip_whitespace,
+)
+
+# Quotes, parens and the SEPARATOR keyword (not inside a longer word)
+_SEPARATOR_SCAN = re.compile(r"['\"(]|(?<![^\W_])SEPARATOR(?![^\W_])", re.IGNORECASE)
 
 
 def normalize_group_concat(sql: str) -> str:
     """Remove SEPARATOR clauses from all GROUP_CONCAT calls."""
-    result = []
+    return apply_edits(sql, group_concat_edits(sql))
+
+
+def group_concat_edits(sql: str) -> list[tuple[int, int, str]]:
+    """Return edits replacing the body of each GROUP_CONCAT that has a SEPARATOR."""
+    edits = []
     upper = sql.upper()
+    charge(len(sql))
+    skips = skip_spans(sql)
     i = 0
     length = len(sql)
 
     while i < length:
         # Find next GROUP_CONCAT
         match_pos = upper.find("GROUP_CONCAT", i)
+        charge((length if match_pos == -1 else match_pos) - i)
         if match_pos == -1:
-            result.append(sql[i:])
             break
 
-        # Check not inside a string
-        if _is_inside_string(sql, match_pos):
-            result.append(sql[i:match_pos + 12])
-            i = match_pos + 12
+        # Skip keywords inside strings, quoted identifiers and comments
+        skip_end = skips.end_at(match_pos)
+        if skip_end != -1:
+            i = skip_end
             continue
 
         # Find the opening paren
-        after_kw = sql[match_pos + 12:].lstrip()
-        paren_offset = match_pos + 12 + (len(sql[match_pos + 12:]) - len(after_kw))
+        paren_offset = skip_whitespace(sql, match_pos + 12)
 
         if paren_offset >= length or sql[paren_offset] != "(":
-            result.append(sql[i:match_pos + 12])
             i = match_pos + 12
             continue
 
@@ -46,7 +62,6 @@ def normalize_group_concat(sql: str) -> str:
         try:
             close_paren = find_matching_paren(sql, paren_offset)
         except ValueError:
-            result.append(sql[i:match_pos + 12])
             i = match_pos + 12
             continue
 
@@ -55,14 +70,11 @@ def normalize_group_concat(sql: str) -> str:
 
         # Remove SEPARATOR clause from inner content
         cleaned_inner = _remove_separator(inner)
-
-        # Rebuild
-        result.append(sql[i:paren_offset + 1])
-        result.append(cleaned_inner)
-        result.append(")")
+        if cleaned_inner is not inner:
+            edits.append((paren_offset + 1, close_paren, cleaned_inner))
         i = close_paren + 1
 
-    return "".join(result)
+    return edits
 
 
 def _remove_separator(inner: str) -> str:
@@ -71,70 +83,34 @@ def _remove_separator(inner: str) -> str:
     The SEPARATOR keyword is always the last clause before the closing paren,
     after any ORDER BY clause.
     """
-    # Scan backwards-ish: find SEPARATOR keyword at depth 0
-    upper = inner.upper()
+    # Find the last SEPARATOR keyword at depth 0, jumping over strings,
+    # quoted identifiers and nested parens
+    charge(len(inner))
+    search = _SEPARATOR_SCAN.search
     i = 0
-    length = len(inner)
     last_separator_pos = -1
 
-    while i < length:
+    while True:
+        m = search(inner, i)
+        if m is None:
+            break
+        i = m.start()
         ch = inner[i]
-
         if ch == "'":
-            # Skip string
+            i = closing_quote(inner, i) + 1
+        elif ch == '"':
+            i = inner.find('"', i + 1)
+            if i == -1:
+                break
             i += 1
-            while i < length:
-                if inner[i] == "'":
-                    if i + 1 < length and inner[i + 1] == "'":
-                        i += 2
-                    else:
-                        break
-                else:
-                    i += 1
+        elif ch == "(":
+            i = matching_paren(inner, i)
+            if i == -1:
+                break
             i += 1
-            continue
-
-        if ch == '"':
-            i += 1
-            while i < length and inner[i] != '"':
-                i += 1
-            i += 1
-            continue
-
-        if ch == "(":
-            # Skip nested parens
-            depth = 1
-            i += 1
-            while i < length and depth > 0:
-                if inner[i] == "(":
-                    depth += 1
-                elif inner[i] == ")":
-                    depth -= 1
-                elif inner[i] == "'":
-                    i += 1
-                    while i < length:
-                        if inner[i] == "'":
-                            if i + 1 < length and inner[i + 1] == "'":
-                                i += 2
-                            else:
-                                break
-                        else:
-                            i += 1
-                elif inner[i] == '"':
-                    i += 1
-                    while i < length and inner[i] != '"':
-                        i += 1
-                i += 1
-            continue
-
-        # Check for SEPARATOR keyword at depth 0
-        if upper[i:i + 9] == "SEPARATOR" and (i == 0 or not upper[i - 1].isalnum()):
-            # Check it's followed by whitespace (not part of a longer word)
-            after = i + 9
-            if after >= length or not upper[after].isalnum():
-                last_separator_pos = i
-
-        i += 1
+        else:
+            last_separator_pos = i
+            i = m.end()
 
     if last_separator_pos == -1:
         return inner
@@ -142,20 +118,3 @@ def _remove_separator(inner: str) -> str:
     # Remove from SEPARATOR to end, preserving trailing whitespace pattern
     before = inner[:last_separator_pos].rstrip()
     return before
-
-
-def _is_inside_string(sql: str, pos: int) -> bool:
-    """Check if position pos is inside a single-quoted string."""
-    in_string = False
-    i = 0
-    while i < pos:
-        if sql[i] == "'":
-            if in_string:
-                if i + 1 < len(sql) and sql[i + 1] == "'":
-                    i += 2
-                    continue
-                in_string = False
-            else:
-                in_string = True
-        i += 1
-    return in_string
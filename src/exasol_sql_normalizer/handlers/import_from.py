@@ -9,14 +9,21 @@ To:
 
 import re
 
+from ..guard import charge
 from ..utils import (
+    apply_edits,
     extract_quoted_string,
     extract_tables_from_statement,
-    is_inside_string,
     skip_quoted_string,
+    skip_spans,
     skip_whitespace,
 )
 
+# FROM JDBC AT <connection>; the connection may be a /*...*/ block comment
+_FROM_JDBC = re.compile(
+    r'FROM\s+JDBC\s+AT\s+(/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|\S+)', re.IGNORECASE,
+)
+
 
 def normalize_import_from(sql: str) -> str:
     """Replace all IMPORT FROM JDBC blocks with SELECT * statements.
@@ -25,44 +32,43 @@ def normalize_import_from(sql: str) -> str:
     IMPORT INTO is handled separately and runs first, so by the time this handler
     runs, only bare IMPORT FROM blocks remain.
     """
-    result = []
+    return apply_edits(sql, import_from_edits(sql))
+
+
+def import_from_edits(sql: str) -> list[tuple[int, int, str]]:
+    """Return ``(start, end, replacement)`` edits for every IMPORT FROM block."""
+    edits = []
     upper = sql.upper()
+    charge(len(sql))
+    skips = skip_spans(sql)
     i = 0
     length = len(sql)
 
     while i < length:
         match_pos = upper.find("IMPORT", i)
+        charge((length if match_pos == -1 else match_pos) - i)
         if match_pos == -1:
-            result.append(sql[i:])
             break
 
-        # Check not inside a string
-        if is_inside_string(sql, match_pos):
-            result.append(sql[i:match_pos + 6])
-            i = match_pos + 6
+        # Skip keywords inside strings, quoted identifiers and comments
+        skip_end = skips.end_at(match_pos)
+        if skip_end != -1:
+            i = skip_end
             continue
 
         # Check "FROM JDBC AT" follows "IMPORT" (not "INTO")
         cursor = match_pos + 6
         cursor = skip_whitespace(sql, cursor)
 
-        match = re.match(
-            # also capture /*...*/ block comments
-            r'FROM\s+JDBC\s+AT\s+(/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|\S+)',
-            sql[cursor:],
-            re.IGNORECASE,
-        )
+        match = _FROM_JDBC.match(sql, cursor)
         if not match:
-            result.append(sql[i:match_pos + 6])
             i = match_pos + 6
             continue
+        charge(match.end() - cursor)
 
         connection_name = match.group(1)
 
-        # Append everything before IMPORT
-        result.append(sql[i:match_pos])
-
-        cursor += match.end()
+        cursor = match.end()
         cursor = skip_whitespace(sql, cursor)
 
         # Optional: STATEMENT '...' — extract content for table references
@@ -82,7 +88,7 @@ def normalize_import_from(sql: str) -> str:
             )
         else:
             table_refs = f"__JDBC_IMPORT__{connection_name}"
-        result.append(f"SELECT * FROM {table_refs}")
+        edits.append((match_pos, cursor, f"SELECT * FROM {table_refs}"))
         i = cursor
 
-    return "".join(result)
+    return edits
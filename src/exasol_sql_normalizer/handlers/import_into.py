@@ -9,39 +9,54 @@ To:
 
 import re
 
+from ..guard import charge
 from ..utils import (
+    apply_edits,
     extract_quoted_string,
     extract_tables_from_statement,
-    is_inside_string,
+    matching_paren,
     skip_quoted_string,
+    skip_spans,
     skip_whitespace,
+    split_top_level,
+)
+
+# FROM JDBC AT <connection>; the connection may be a /*...*/ block comment
+_FROM_JDBC = re.compile(
+    r'FROM\s+JDBC\s+AT\s+(/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|\S+)', re.IGNORECASE,
 )
 
 
 def normalize_import_into(sql: str) -> str:
     """Replace all IMPORT INTO blocks with equivalent SELECT statements."""
-    result = []
+    return apply_edits(sql, import_into_edits(sql))
+
+
+def import_into_edits(sql: str) -> list[tuple[int, int, str]]:
+    """Return ``(start, end, replacement)`` edits for every IMPORT INTO block."""
+    edits = []
     upper = sql.upper()
+    charge(len(sql))
+    skips = skip_spans(sql)
     i = 0
     length = len(sql)
 
     while i < length:
         match_pos = upper.find("IMPORT", i)
+        charge((length if match_pos == -1 else match_pos) - i)
         if match_pos == -1:
-            result.append(sql[i:])
             break
 
-        # Check not inside a string
-        if is_inside_string(sql, match_pos):
-            result.append(sql[i:match_pos + 6])
-            i = match_pos + 6
+        # Skip keywords inside strings, quoted identifiers and comments
+        skip_end = skips.end_at(match_pos)
+        if skip_end != -1:
+            i = skip_end
             continue
 
         # Check "INTO" follows "IMPORT" with whitespace
         cursor = match_pos + 6
         cursor = skip_whitespace(sql, cursor)
         if not upper[cursor:cursor + 4] == "INTO":
-            result.append(sql[i:match_pos + 6])
             i = match_pos + 6
             continue
 
@@ -50,17 +65,12 @@ def normalize_import_into(sql: str) -> str:
 
         # Expect opening paren
         if cursor >= length or sql[cursor] != "(":
-            result.append(sql[i:match_pos + 6])
             i = match_pos + 6
             continue
 
-        # Append everything before IMPORT
-        result.append(sql[i:match_pos])
-
         # Find matching closing paren for column definitions
-        close_paren = _find_matching_paren(sql, cursor)
+        close_paren = matching_paren(sql, cursor)
         if close_paren == -1:
-            result.append(sql[match_pos:match_pos + 6])
             i = match_pos + 6
             continue
 
@@ -72,19 +82,14 @@ def normalize_import_into(sql: str) -> str:
         cursor = skip_whitespace(sql, cursor)
 
         # Expect: FROM JDBC AT <connection>
-        from_match = re.match(
-            # Also capture /*...*/ block comments:
-            r'FROM\s+JDBC\s+AT\s+(/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|\S+)',
-            sql[cursor:],
-            re.IGNORECASE,
-        )
+        from_match = _FROM_JDBC.match(sql, cursor)
         if not from_match:
-            result.append(sql[match_pos:close_paren + 1])
             i = close_paren + 1
             continue
+        charge(from_match.end() - cursor)
 
         connection_name = from_match.group(1)
-        cursor += from_match.end()
+        cursor = from_match.end()
         cursor = skip_whitespace(sql, cursor)
 
         # Optional: STATEMENT '...' — extract content for table references
@@ -106,16 +111,16 @@ def normalize_import_into(sql: str) -> str:
             )
         else:
             table_refs = f"__JDBC_IMPORT__{connection_name}"
-        result.append(f"SELECT {col_list} FROM {table_refs}")
+        edits.append((match_pos, cursor, f"SELECT {col_list} FROM {table_refs}"))
         i = cursor
 
-    return "".join(result)
+    return edits
 
 
 def _extract_column_names(col_defs: str) -> list[str]:
     """Extract column names from a column definition block."""
     columns = []
-    for part in _split_column_defs(col_defs):
+    for part in split_top_level(col_defs):
         part = part.strip()
         if not part:
             continue
@@ -125,30 +130,6 @@ def _extract_column_names(col_defs: str) -> list[str]:
     return columns
 
 
-def _split_column_defs(col_defs: str) -> list[str]:
-    """Split column definitions by commas, respecting parentheses in type defs."""
-    parts = []
-    depth = 0
-    current = []
-
-    for ch in col_defs:
-        if ch == "(":
-            depth += 1
-            current.append(ch)
-        elif ch == ")":
-            depth -= 1
-            current.append(ch)
-        elif ch == "," and depth == 0:
-            parts.append("".join(current))
-            current = []
-        else:
-            current.append(ch)
-
-    if current:
-        parts.append("".join(current))
-    return parts
-
-
 def _extract_single_column_name(col_def: str) -> str:
     """Extract the column name from a single column definition."""
     col_def = col_def.strip()
@@ -163,46 +144,3 @@ def _extract_single_column_name(col_def: str) -> str:
 
     match = re.match(r'(\w+)', col_def)
     return match.group(1) if match else ""
-
-
-def _find_matching_paren(sql: str, open_pos: int) -> int:
-    """Find matching closing paren, aware of strings and nested parens."""
-    depth = 1
-    i = open_pos + 1
-    length = len(sql)
-
-    while i < length:
-        ch = sql[i]
-        if ch == "'":
-            i = _end_of_quoted_string(sql, i)
-        elif ch == '"':
-            i += 1
-            while i < length and sql[i] != '"':
-                i += 1
-            i += 1
-        elif ch == "(":
-            depth += 1
-            i += 1
-        elif ch == ")":
-            depth -= 1
-            if depth == 0:
-                return i
-            i += 1
-        else:
-            i += 1
-
-    return -1
-
-
-def _end_of_quoted_string(sql: str, pos: int) -> int:
-    """Return position after the closing quote of a single-quoted string at pos."""
-    i = pos + 1
-    while i < len(sql):
-        if sql[i] == "'":
-            if i + 1 < len(sql) and sql[i + 1] == "'":
-                i += 2
-            else:
-                return i + 1
-        else:
-            i += 1
-    return len(sql)
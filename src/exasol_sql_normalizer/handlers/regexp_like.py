@@ -8,77 +8,107 @@ To:
 
 import re
 
+from ..guard import charge
+from ..utils import apply_edits, matching_paren, skip_spans, skip_whitespace, top_level_comma
+
 # SQL keywords that can appear before REGEXP_LIKE but are NOT column expressions
 _SQL_KEYWORDS = {
     "WHERE", "AND", "OR", "ON", "WHEN", "THEN", "ELSE", "CASE", "NOT",
     "SELECT", "FROM", "SET", "VALUES", "HAVING", "IF", "ELSEIF",
+    "DISTINCT", "ALL", "BY", "ORDER", "GROUP", "PARTITION", "AS", "IN", "IS",
+    "LIKE", "BETWEEN", "EXISTS", "RETURN", "WITH", "USING", "QUALIFY",
+    "UNION", "INTERSECT", "EXCEPT", "MINUS", "PRIOR", "LIMIT", "TOP", "INTO",
 }
 
+# Longest column expression looked for in front of an infix REGEXP_LIKE;
+# the bound keeps scans linear in statements with thousands of calls
+LOOKBACK = 512
+
 
 def normalize_regexp_like(sql: str) -> str:
     """Rewrite infix REGEXP_LIKE to function-call syntax."""
+    return apply_edits(sql, regexp_like_edits(sql))
+
+
+def regexp_like_edits(sql: str) -> list[tuple[int, int, str]]:
+    """Return ``(start, end, replacement)`` edits for every infix REGEXP_LIKE."""
     # Use regex to find: <identifier> <whitespace> REGEXP_LIKE <whitespace>? ( ... )
     # The identifier is a column name or qualified name (t.col)
     #
     # Strategy: find each REGEXP_LIKE, look back for a column expression.
     # If the preceding word is a SQL keyword (WHERE, AND, etc.), it's function-call syntax.
 
-    result = []
+    edits = []
     upper = sql.upper()
+    charge(len(sql))
+    skips = skip_spans(sql)
     i = 0
     length = len(sql)
 
     while i < length:
         match_pos = upper.find("REGEXP_LIKE", i)
+        charge((length if match_pos == -1 else match_pos) - i)
         if match_pos == -1:
-            result.append(sql[i:])
             break
 
-        # Check not inside a string
-        if _is_inside_string(sql, match_pos):
-            result.append(sql[i:match_pos + 11])
-            i = match_pos + 11
-            continue
-
-        # Look backwards to extract the preceding token
-        before = sql[i:match_pos]
-        before_stripped = before.rstrip()
-
-        # Extract the last word/identifier from before
-        col_expr = _extract_trailing_identifier(before_stripped)
-
-        if not col_expr or col_expr.upper() in _SQL_KEYWORDS:
-            # No column expr or it's a SQL keyword — this is already function syntax
-            result.append(sql[i:match_pos + 11])
-            i = match_pos + 11
+        # Skip keywords inside strings, quoted identifiers and comments
+        skip_end = skips.end_at(match_pos)
+        if skip_end != -1:
+            i = skip_end
             continue
 
         # Find the opening paren after REGEXP_LIKE
-        cursor = match_pos + 11
-        while cursor < length and sql[cursor] in (" ", "\t", "\n", "\r"):
-            cursor += 1
+        cursor = skip_whitespace(sql, match_pos + 11)
 
         if cursor >= length or sql[cursor] != "(":
-            result.append(sql[i:match_pos + 11])
             i = match_pos + 11
             continue
 
         # Find matching closing paren
-        close_paren = _find_matching_paren(sql, cursor)
+        close_paren = matching_paren(sql, cursor)
         if close_paren == -1:
-            result.append(sql[i:match_pos + 11])
             i = match_pos + 11
             continue
 
-        args = sql[cursor + 1:close_paren]
+        # Look backwards for the column expression; none means function syntax
+        expr_start, col_expr = infix_operand(sql, match_pos, cursor, close_paren, i)
+        if expr_start == -1:
+            i = match_pos + 11
+            continue
 
-        # Build: prefix (without col_expr) + REGEXP_LIKE(col_expr, args)
-        prefix = before_stripped[:len(before_stripped) - len(col_expr)]
-        result.append(prefix)
-        result.append(f"REGEXP_LIKE({col_expr}, {args})")
+        # Nested infix forms are rewritten now to keep normalization idempotent
+        args = normalize_regexp_like(sql[cursor + 1:close_paren])
+
+        # Replace from the start of col_expr: REGEXP_LIKE(col_expr, args)
+        edits.append((expr_start, close_paren + 1, f"REGEXP_LIKE({col_expr}, {args})"))
         i = close_paren + 1
 
-    return "".join(result)
+    return edits
+
+
+def infix_operand(
+    sql: str,
+    pos: int,
+    open_paren: int,
+    close_paren: int,
+    lower: int = 0,
+) -> tuple[int, str]:
+    """Return ``(start, text)`` of the column expression before the REGEXP_LIKE at *pos*.
+
+    Returns ``(-1, "")`` for function-call syntax: no identifier before
+    *pos*, a SQL keyword such as ``WHERE`` or ``ORDER BY``, or a top-level
+    comma between *open_paren* and *close_paren* (``REGEXP_LIKE(col, 'p')``
+    already has both arguments).  The look-back stops at *lower* and at
+    ``LOOKBACK`` characters.
+    """
+    window = max(lower, pos - LOOKBACK)
+    before = sql[window:pos].rstrip()
+    operand = _extract_trailing_identifier(before)
+    if not operand or operand.upper() in _SQL_KEYWORDS:
+        return -1, ""
+    if top_level_comma(sql, open_paren + 1, close_paren) != -1:
+        return -1, ""
+    return window + len(before) - len(operand), operand
 
 
 def _extract_trailing_identifier(s: str) -> str:
@@ -116,53 +146,3 @@ def _extract_trailing_identifier(s: str) -> str:
         i -= 1
 
     return s[i + 1:]
-
-
-def _find_matching_paren(sql: str, open_pos: int) -> int:
-    """Find matching closing paren."""
-    depth = 1
-    i = open_pos + 1
-    length = len(sql)
-
-    while i < length:
-        ch = sql[i]
-        if ch == "'":
-            i += 1
-            while i < length:
-                if sql[i] == "'":
-                    if i + 1 < length and sql[i + 1] == "'":
-                        i += 2
-                    else:
-                        break
-                else:
-                    i += 1
-        elif ch == '"':
-            i += 1
-            while i < length and sql[i] != '"':
-                i += 1
-        elif ch == "(":
-            depth += 1
-        elif ch == ")":
-            depth -= 1
-            if depth == 0:
-                return i
-        i += 1
-
-    return -1
-
-
-def _is_inside_string(sql: str, pos: int) -> bool:
-    """Check if position pos is inside a single-quoted string."""
-    in_string = False
-    i = 0
-    while i < pos:
-        if sql[i] == "'":
-            if in_string:
-                if i + 1 < len(sql) and sql[i + 1] == "'":
-                    i += 2
-                    continue
-                in_string = False
-            else:
-                in_string = True
-        i += 1
-    return in_string
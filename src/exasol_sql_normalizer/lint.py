@@ -0,0 +1,113 @@
+"""Query-performance lint built on the handlers' matches.
+
+While ``normalize(..., report=True, lint=True)`` runs, a ``Linter`` sees the
+edits of every built-in handler stage and reports the constructs that are
+expensive on an Exasol cluster.  Offsets refer to the original input.
+
+==== ======== ============================================================
+Code Severity Finding
+==== ======== ============================================================
+L001 warning  ``IMPORT FROM JDBC`` without a column list pulls every remote
+              column (``SELECT *``).
+L002 info     IMPORT whose STATEMENT yields no table reference (dynamic or
+              unparseable remote SQL).
+L003 warning  The same remote STATEMENT is imported more than once.
+L004 warning  ``CONVERT`` to ``VARCHAR(n)`` with ``n >= LARGE_VARCHAR``
+              around ``GROUP_CONCAT``.
+==== ======== ============================================================
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable
+
+from .diagnostics import DiagnosticCollector
+from .utils import extract_quoted_string, extract_tables_from_statement
+
+# VARCHAR sizes from here on are reported by L004 (Exasol's maximum is 2000000)
+LARGE_VARCHAR = 100_000
+
+_STATEMENT_KW = re.compile(r"\bSTATEMENT\s*'", re.IGNORECASE)
+_CONVERT_VARCHAR = re.compile(r"CONVERT\s*\(\s*VARCHAR\s*\(\s*(\d+)", re.IGNORECASE)
+
+
+class Linter(DiagnosticCollector):
+    """Collects lint findings from the handler stages of one ``normalize()`` call."""
+
+    __slots__ = ("_remote_statements",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        # Normalized remote STATEMENT text -> offset of its first IMPORT
+        self._remote_statements: dict[str, int] = {}
+
+    def observe(
+        self,
+        handler: str,
+        sql: str,
+        edits: list[tuple[int, int, str]],
+        to_origin: Callable[[int], int],
+    ) -> None:
+        """Check the *edits* a handler stage made to *sql*.
+
+        *to_origin* maps offsets in *sql* to offsets in the original input.
+        """
+        rules = _RULES.get(handler)
+        if rules is None:
+            return
+        for start, end, _ in edits:
+            text = sql[start:end]
+            for rule in rules:
+                rule(self, text, to_origin(start), to_origin(end))
+
+
+def _remote_statement(text: str) -> str | None:
+    m = _STATEMENT_KW.search(text)
+    if m is None:
+        return None
+    _, content = extract_quoted_string(text, m.end() - 1)
+    return content
+
+
+def _check_select_star(linter: Linter, text: str, start: int, end: int) -> None:
+    linter.report(
+        "L001", "IMPORT FROM JDBC without a column list pulls every remote column",
+        start, end, "warning",
+    )
+
+
+def _check_remote_statement(linter: Linter, text: str, start: int, end: int) -> None:
+    statement = _remote_statement(text)
+    if statement is None or not extract_tables_from_statement(statement):
+        linter.report(
+            "L002", "No table reference found in the remote STATEMENT (dynamic SQL?)",
+            start, end, "info",
+        )
+    if statement is None:
+        return
+    key = " ".join(statement.split()).upper()
+    first = linter._remote_statements.setdefault(key, start)
+    if first != start:
+        linter.report(
+            "L003", f"Remote STATEMENT already imported at offset {first}",
+            start, end, "warning",
+        )
+
+
+def _check_large_convert(linter: Linter, text: str, start: int, end: int) -> None:
+    m = _CONVERT_VARCHAR.match(text)
+    if m is None or int(m.group(1)) < LARGE_VARCHAR:
+        return
+    if "GROUP_CONCAT" in text.upper():
+        linter.report(
+            "L004", f"GROUP_CONCAT converted to VARCHAR({m.group(1)})",
+            start, end, "warning",
+        )
+
+
+_RULES: dict[str, tuple[Callable[[Linter, str, int, int], None], ...]] = {
+    "import_into": (_check_remote_statement,),
+    "import_from": (_check_select_star, _check_remote_statement),
+    "convert": (_check_large_convert,),
+}
@@ -0,0 +1,268 @@
+"""Operational metrics with Prometheus text exposition.
+
+Metrics are off by default.  After ``enable()`` every ``normalize()`` and
+``normalize_to()`` call in this process is recorded:
+
+- ``sqlnorm_calls_total``: calls;
+- ``sqlnorm_input_bytes``: histogram of input sizes in UTF-8 bytes;
+- ``sqlnorm_latency_seconds``: histogram of call latency;
+- ``sqlnorm_rewrites_total{handler=...}``: rewrites per handler;
+- ``sqlnorm_guard_trips_total{limit=...}``: ``Guard`` limits hit;
+- ``sqlnorm_template_cache_hits_total`` / ``..._misses_total``:
+  ``TemplateCache`` lookups.
+
+``render()`` returns them in the Prometheus text format; the server exposes
+the same text at ``GET /metrics`` (``serve --metrics``).
+
+Each thread records into its own shard, so the hot path takes no lock;
+``render()`` and ``snapshot()`` sum the shards.  Shards of finished threads
+are folded together when a new thread starts recording.  When disabled,
+``normalize()`` pays a single ``is None`` test and this module is not even
+imported.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Iterator
+
+from . import normalizer
+
+# Upper bounds of the histogram buckets (Prometheus ``le``); +Inf is implied
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864,
+)
+
+_enabled = False
+_local = threading.local()
+_lock = threading.Lock()
+# (thread, shard) for every thread that has recorded
+_shards: list[tuple[threading.Thread, _Shard]] = []
+
+
+class _Shard:
+    __slots__ = (
+        "calls", "latency", "latency_sum", "sizes", "size_sum",
+        "rewrites", "guard_trips", "cache_hits", "cache_misses",
+    )
+
+    def __init__(self) -> None:
+        self.calls = 0
+        # Per-bucket (not cumulative) counts; the last bucket is +Inf
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.sizes = [0] * (len(SIZE_BUCKETS) + 1)
+        self.size_sum = 0
+        self.rewrites: dict[str, int] = {}
+        self.guard_trips: dict[str, int] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, other: _Shard) -> None:
+        self.calls += other.calls
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+        self.latency_sum += other.latency_sum
+        self.sizes = [a + b for a, b in zip(self.sizes, other.sizes)]
+        self.size_sum += other.size_sum
+        # Copies: *other* may belong to a thread that is recording right now
+        for name, count in other.rewrites.copy().items():
+            self.rewrites[name] = self.rewrites.get(name, 0) + count
+        for limit, count in other.guard_trips.copy().items():
+            self.guard_trips[limit] = self.guard_trips.get(limit, 0) + count
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+
+def enable() -> None:
+    """Start recording metrics in this process."""
+    global _enabled
+    _enabled = True
+    normalizer._metrics = _recorder
+
+
+def disable() -> None:
+    """Stop recording; the values recorded so far are kept."""
+    global _enabled
+    _enabled = False
+    normalizer._metrics = None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Zero every metric.
+
+    Counts recorded by other threads while this runs may be lost.
+    """
+    with _lock:
+        for _, shard in _shards:
+            shard.__init__()
+
+
+def snapshot() -> dict:
+    """Return the current totals as a plain dict."""
+    total = _total()
+    return {
+        "calls": total.calls,
+        "input_bytes": total.size_sum,
+        "latency_seconds": total.latency_sum,
+        "rewrites": dict(sorted(total.rewrites.items())),
+        "guard_trips": dict(sorted(total.guard_trips.items())),
+        "template_cache_hits": total.cache_hits,
+        "template_cache_misses": total.cache_misses,
+    }
+
+
+def render() -> str:
+    """Return all metrics in the Prometheus text exposition format (0.0.4)."""
+    total = _total()
+    lines = [
+        "# HELP sqlnorm_calls_total normalize() and normalize_to() calls.",
+        "# TYPE sqlnorm_calls_total counter",
+        f"sqlnorm_calls_total {total.calls}",
+        "# HELP sqlnorm_input_bytes Size of normalized inputs in UTF-8 bytes.",
+        "# TYPE sqlnorm_input_bytes histogram",
+        *_histogram("sqlnorm_input_bytes", SIZE_BUCKETS, total.sizes, total.size_sum),
+        "# HELP sqlnorm_latency_seconds Latency of normalize() and normalize_to() calls.",
+        "# TYPE sqlnorm_latency_seconds histogram",
+        *_histogram("sqlnorm_latency_seconds", LATENCY_BUCKETS, total.latency, total.latency_sum),
+        "# HELP sqlnorm_rewrites_total Rewrites made, by handler.",
+        "# TYPE sqlnorm_rewrites_total counter",
+        *_labelled("sqlnorm_rewrites_total", "handler", total.rewrites),
+        "# HELP sqlnorm_guard_trips_total Guard limits hit, by limit.",
+        "# TYPE sqlnorm_guard_trips_total counter",
+        *_labelled("sqlnorm_guard_trips_total", "limit", total.guard_trips),
+        "# HELP sqlnorm_template_cache_hits_total TemplateCache lookups answered from a plan.",
+        "# TYPE sqlnorm_template_cache_hits_total counter",
+        f"sqlnorm_template_cache_hits_total {total.cache_hits}",
+        "# HELP sqlnorm_template_cache_misses_total TemplateCache lookups that ran the handlers.",
+        "# TYPE sqlnorm_template_cache_misses_total counter",
+        f"sqlnorm_template_cache_misses_total {total.cache_misses}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Recording (hot path)
+# ---------------------------------------------------------------------------
+
+def _shard() -> _Shard:
+    try:
+        return _local.shard
+    except AttributeError:
+        pass
+    shard = _local.shard = _Shard()
+    with _lock:
+        _fold_finished()
+        _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+def _fold_finished() -> None:
+    """Merge the shards of finished threads into one; caller holds ``_lock``."""
+    finished = [shard for thread, shard in _shards if not thread.is_alive()]
+    if len(finished) < 2:
+        return
+    for shard in finished[1:]:
+        finished[0].add(shard)
+    dropped = {id(shard) for shard in finished[1:]}
+    _shards[:] = [entry for entry in _shards if id(entry[1]) not in dropped]
+
+
+def _total() -> _Shard:
+    total = _Shard()
+    with _lock:
+        shards = [shard for _, shard in _shards]
+    for shard in shards:
+        total.add(shard)
+    return total
+
+
+class _Recorder:
+    """The hooks called through ``normalizer._metrics`` while enabled."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def record_call(sql: str, seconds: float, rewrites: dict[str, int]) -> None:
+        shard = _shard()
+        shard.calls += 1
+        size = len(sql) if sql.isascii() else len(sql.encode("utf-8", "surrogatepass"))
+        shard.sizes[bisect_left(SIZE_BUCKETS, size)] += 1
+        shard.size_sum += size
+        shard.latency[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        shard.latency_sum += seconds
+        counts = shard.rewrites
+        for name, count in rewrites.items():
+            if count:
+                counts[name] = counts.get(name, 0) + count
+
+    @staticmethod
+    def record_guard_trip(limit: str) -> None:
+        trips = _shard().guard_trips
+        limit = limit.replace(" ", "_")
+        trips[limit] = trips.get(limit, 0) + 1
+
+    @staticmethod
+    def record_cache_lookup(hit: bool) -> None:
+        shard = _shard()
+        if hit:
+            shard.cache_hits += 1
+        else:
+            shard.cache_misses += 1
+
+
+_recorder = _Recorder()
+
+
+def record_guard_trip(limit: str) -> None:
+    """Count a ``BudgetExceeded.limit`` hit outside ``normalize()``, e.g. in a worker."""
+    if _enabled:
+        _recorder.record_guard_trip(limit)
+
+
+def drain() -> _Shard:
+    """Return the totals recorded so far and reset them.
+
+    Meant for single-threaded worker processes, whose totals the parent
+    adds to its own with ``merge()``.
+    """
+    total = _Shard()
+    with _lock:
+        for _, shard in _shards:
+            total.add(shard)
+            shard.__init__()
+    return total
+
+
+def merge(totals: _Shard) -> None:
+    """Add *totals* from ``drain()`` in another process to this one's."""
+    _shard().add(totals)
+
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+
+def _histogram(name: str, bounds: tuple, counts: list[int], total: float) -> Iterator[str]:
+    cumulative = 0
+    for bound, count in zip(bounds, counts):
+        cumulative += count
+        yield f'{name}_bucket{{le="{bound}"}} {cumulative}'
+    cumulative += counts[-1]
+    yield f'{name}_bucket{{le="+Inf"}} {cumulative}'
+    yield f"{name}_sum {total}"
+    yield f"{name}_count {cumulative}"
+
+
+def _labelled(name: str, label: str, values: dict[str, int]) -> Iterator[str]:
+    for value, count in sorted(values.items()):
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        yield f'{name}{{{label}="{escaped}"}} {count}'
@@ -1,25 +1,418 @@
-from .handlers import (
-    normalize_import_into,
-    normalize_import_from,
-    normalize_export_into,
-    normalize_group_concat,
-    normalize_convert_charset,
-    normalize_regexp_like,
-)
+from __future__ import annotations
 
+from time import perf_counter
 
-def normalize(sql: str) -> str:
+from .guard import BudgetExceeded
+from .piecetable import PieceTable
+from .registry import build_pipeline
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Iterable, Iterator, TextIO
+
+    from .diagnostics import Diagnostic
+    from .guard import Guard
+    from .lint import Linter
+    from .registry import Handler
+    from .strict import StrictChecker
+
+# Size of the slices written for the unnormalized rest in passthrough mode
+_PASSTHROUGH_CHUNK = 1 << 20
+
+# Recorder installed by ``metrics.enable()``; None while metrics are off
+_metrics = None
+
+
+class NormalizeResult:
+    """Outcome of ``normalize(..., report=True)``.
+
+    Attributes:
+        sql: The normalized SQL.  When nothing was rewritten this is the
+            input object itself.
+        rewrites: Number of rewrites made by each handler in the pipeline,
+            in execution order (0 for handlers that found nothing to do).
+        diagnostics: Findings about the input, e.g. a guard limit that was
+            hit in ``"passthrough"`` mode.
+    """
+
+    __slots__ = ("sql", "rewrites", "diagnostics")
+
+    def __init__(
+        self,
+        sql: str,
+        rewrites: dict[str, int],
+        diagnostics: list[Diagnostic] | None = None,
+    ) -> None:
+        self.sql = sql
+        self.rewrites = rewrites
+        self.diagnostics = diagnostics if diagnostics is not None else []
+
+    @property
+    def changed(self) -> bool:
+        """Whether any handler rewrote anything."""
+        return any(self.rewrites.values())
+
+    @property
+    def fingerprint(self) -> str:
+        """Shape hash of the normalized SQL (see ``fingerprint``)."""
+        from .fingerprint import fingerprint_normalized
+
+        return fingerprint_normalized(self.sql)
+
+    def __repr__(self) -> str:
+        return f"NormalizeResult(changed={self.changed}, rewrites={self.rewrites!r})"
+
+
+def normalize(
+    sql: str,
+    handlers: Iterable[str] | None = None,
+    *,
+    report: bool = False,
+    guard: Guard | None = None,
+    lint: bool = False,
+    strict: bool = False,
+) -> str | NormalizeResult:
     """Rewrite Exasol-specific SQL into standard SQL.
 
-    Handler execution order matters:
+    Handlers run in the order derived from their registered constraints
+    (see ``registry``):
     - EXPORT runs first because inner queries may contain IMPORT statements.
     - GROUP_CONCAT must run before CONVERT because CONVERT often wraps
       GROUP_CONCAT expressions.
+
+    ``CREATE ... SCRIPT`` bodies up to their terminating ``/`` line are not
+    SQL; they are copied through verbatim and never scanned by the handlers
+    (see ``statements.script_regions``).
+
+    Each top-level statement (see ``statements``) runs through the handlers
+    on its own and the output is collected in a ``PieceTable``, so the full
+    output string is built exactly once.
+
+    When no handler rewrites anything the input object itself is returned,
+    so ``normalize(sql) is sql`` is a cheap "unchanged" test.  Normalization
+    is idempotent: ``normalize(normalize(sql)) is normalize(sql)``.
+
+    Args:
+        sql: The SQL text to normalize.
+        handlers: Optional subset of handler names to run, e.g.
+            ``{"import_into", "convert"}``.  ``None`` runs all of them.
+        report: Return a ``NormalizeResult`` with per-handler rewrite counts
+            instead of the bare string.
+        guard: Optional ``Guard`` bounding input size, rewrites and scan
+            work for untrusted input.
+        lint: Add query-performance findings (see ``lint``) to
+            ``NormalizeResult.diagnostics``.  Requires ``report=True``.
+        strict: Add findings about constructs left unrewritten (see
+            ``strict``) to ``NormalizeResult.diagnostics``.  Implies
+            ``report=True``: the findings are the point of asking.
+
+    Raises:
+        ValueError: If *handlers* names an unregistered handler, or *lint*
+            is set without *report* or *strict*.
+        BudgetExceeded: If a *guard* limit is hit and its ``on_exceed`` is
+            ``"raise"``.
+    """
+    pipeline = build_pipeline(handlers)
+    rewrites = _zero_counts(pipeline)
+    report = report or strict
+    linter = None
+    if lint:
+        if not report:
+            raise ValueError("lint=True requires report=True")
+        from .lint import Linter
+
+        linter = Linter()
+    checker = None
+    if strict:
+        from .strict import StrictChecker
+
+        checker = StrictChecker(rewrites)
+
+    if _metrics is None:
+        return _normalize(sql, pipeline, rewrites, report, guard, linter, checker)
+    started = perf_counter()
+    try:
+        return _normalize(sql, pipeline, rewrites, report, guard, linter, checker)
+    finally:
+        _metrics.record_call(sql, perf_counter() - started, rewrites)
+
+
+def _normalize(
+    sql: str,
+    pipeline: tuple[Handler, ...],
+    rewrites: dict[str, int],
+    report: bool,
+    guard: Guard | None,
+    linter: Linter | None,
+    checker: StrictChecker | None = None,
+) -> str | NormalizeResult:
+    if guard is None:
+        sql = _normalize_pieces(sql, pipeline, rewrites, None, linter, checker).materialize()
+        return _result(sql, rewrites, linter, checker) if report else sql
+
+    token = guard.start_metering()
+    try:
+        guard.check_input(sql)
+        output = _normalize_pieces(sql, pipeline, rewrites, guard, linter, checker).materialize()
+    except BudgetExceeded as exc:
+        if _metrics is not None:
+            _metrics.record_guard_trip(exc.limit)
+        if guard.on_exceed == "raise":
+            raise
+        # The input comes back unchanged, so no rewrite counts
+        rewrites.update(dict.fromkeys(rewrites, 0))
+        if not report:
+            return sql
+        from .diagnostics import Diagnostic
+
+        return NormalizeResult(sql, rewrites, [Diagnostic("budget-exceeded", str(exc))])
+    finally:
+        guard.stop_metering(token)
+    return _result(output, rewrites, linter, checker) if report else output
+
+
+def normalize_to(
+    sql: str,
+    writer: TextIO,
+    handlers: Iterable[str] | None = None,
+    *,
+    guard: Guard | None = None,
+) -> dict[str, int]:
+    """Normalize *sql* and write the result to *writer* statement by statement.
+
+    Produces the same text as ``normalize()`` without ever holding the whole
+    output: each top-level statement (see ``statements``) is normalized and
+    passed to ``writer.write()`` on its own, and unchanged statements are
+    written as slices of the input.  *writer* is any object with a
+    ``write(str)`` method, e.g. an open text file or ``socket.makefile("w")``.
+
+    Returns the per-handler rewrite counts, as in ``NormalizeResult.rewrites``.
+
+    With a *guard* in ``"passthrough"`` mode output may already have been
+    written when a limit is hit, so the statement that hit it and all
+    following ones are written unchanged.
+
+    Raises:
+        ValueError: If *handlers* names an unregistered handler.
+        BudgetExceeded: If a *guard* limit is hit and its ``on_exceed`` is
+            ``"raise"``.
+    """
+    pipeline = build_pipeline(handlers)
+    rewrites = _zero_counts(pipeline)
+    if _metrics is None:
+        return _normalize_to(sql, writer.write, pipeline, rewrites, guard)
+    started = perf_counter()
+    try:
+        return _normalize_to(sql, writer.write, pipeline, rewrites, guard)
+    finally:
+        _metrics.record_call(sql, perf_counter() - started, rewrites)
+
+
+def _normalize_to(
+    sql: str,
+    write: Callable[[str], object],
+    pipeline: tuple[Handler, ...],
+    rewrites: dict[str, int],
+    guard: Guard | None,
+) -> dict[str, int]:
+    if guard is None:
+        for start, end, output in _outputs(sql, pipeline, rewrites):
+            write(sql[start:end] if output is None else output)
+        return rewrites
+
+    done = 0
+    token = guard.start_metering()
+    try:
+        guard.check_input(sql)
+        for start, end, output in _outputs(sql, pipeline, rewrites, guard):
+            write(sql[start:end] if output is None else output)
+            done = end
+    except BudgetExceeded as exc:
+        if _metrics is not None:
+            _metrics.record_guard_trip(exc.limit)
+        if guard.on_exceed == "raise":
+            raise
+        for start in range(done, len(sql), _PASSTHROUGH_CHUNK):
+            write(sql[start:start + _PASSTHROUGH_CHUNK])
+    finally:
+        guard.stop_metering(token)
+    return rewrites
+
+
+def _zero_counts(pipeline: tuple[Handler, ...]) -> dict[str, int]:
+    return dict.fromkeys([handler.name for handler in pipeline], 0)
+
+
+def _result(
+    sql: str,
+    rewrites: dict[str, int],
+    linter: Linter | None,
+    checker: StrictChecker | None = None,
+) -> NormalizeResult:
+    if checker is None:
+        return NormalizeResult(sql, rewrites, None if linter is None else linter.results())
+    diagnostics = checker.results()
+    if linter is not None:
+        diagnostics = sorted(diagnostics + linter.results(), key=lambda d: (d.start, d.code))
+    return NormalizeResult(sql, rewrites, diagnostics)
+
+
+def _normalize_pieces(
+    sql: str,
+    pipeline: tuple[Handler, ...],
+    rewrites: dict[str, int],
+    guard: Guard | None = None,
+    linter: Linter | None = None,
+    checker: StrictChecker | None = None,
+) -> PieceTable:
+    """Normalize *sql* into a ``PieceTable``.
+
+    Unchanged statements and script bodies are recorded as ranges of *sql*,
+    not copied.
+    """
+    table = PieceTable(sql)
+    for start, end, output in _outputs(sql, pipeline, rewrites, guard, linter, checker):
+        if output is None:
+            table.append_source(start, end)
+        else:
+            table.append_text(output)
+    return table
+
+
+def _outputs(
+    sql: str,
+    pipeline: tuple[Handler, ...],
+    rewrites: dict[str, int],
+    guard: Guard | None = None,
+    linter: Linter | None = None,
+    checker: StrictChecker | None = None,
+) -> Iterator[tuple[int, int, str | None]]:
+    """Yield ``(start, end, output)`` for consecutive pieces of *sql*.
+
+    Each top-level statement (see ``statements``) runs through the handlers
+    on its own, so transient copies (``upper()``, slices, rewritten text)
+    are statement-sized.  ``CREATE ... SCRIPT`` bodies are yielded without
+    being scanned.  *output* is ``None`` when the piece is unchanged.
     """
-    sql = normalize_export_into(sql)
-    sql = normalize_import_into(sql)
-    sql = normalize_import_from(sql)
-    sql = normalize_group_concat(sql)
-    sql = normalize_convert_charset(sql)
-    sql = normalize_regexp_like(sql)
+    from .statements import statement_layout
+
+    ends, regions = statement_layout(sql)
+    regions.append((len(sql), len(sql)))
+    k = 0
+    start = 0
+    for end in ends:
+        while start < end:
+            region_start, region_end = regions[k]
+            stop = min(region_start, end)
+            if start < stop:
+                piece = sql[start:stop]
+                output = _run_handlers(piece, pipeline, rewrites, guard, linter, start, checker)
+                yield start, stop, None if output is piece else output
+                start = stop
+            if start == region_start and region_start < end:
+                if checker is not None:
+                    checker.script(region_start, region_end)
+                yield region_start, region_end, None
+                start = region_end
+                k += 1
+
+
+def _run_handlers(
+    sql: str,
+    pipeline: tuple[Handler, ...],
+    rewrites: dict[str, int],
+    guard: Guard | None,
+    linter: Linter | None = None,
+    base: int = 0,
+    checker: StrictChecker | None = None,
+) -> str:
+    """Run *pipeline* over *sql*, adding rewrite counts into *rewrites*.
+
+    With a *linter*, each stage's edits are passed to it together with a
+    mapping back to input offsets (*sql* starts at offset *base*).  With a
+    *checker*, the final text is checked with the same mapping.  The
+    handlers share ``skip_spans`` results for the duration of the run only.
+    """
+    from .utils import share_skip_spans, stop_sharing_skip_spans
+
+    token = share_skip_spans()
+    try:
+        return _run_pipeline(sql, pipeline, rewrites, guard, linter, base, checker)
+    finally:
+        stop_sharing_skip_spans(token)
+
+
+def _run_pipeline(
+    sql: str,
+    pipeline: tuple[Handler, ...],
+    rewrites: dict[str, int],
+    guard: Guard | None,
+    linter: Linter | None,
+    base: int,
+    checker: StrictChecker | None,
+) -> str:
+    history: list[list[tuple[int, int, str]]] = []
+    track = linter is not None or checker is not None
+    for handler in pipeline:
+        if not handler.is_triggered(sql):
+            continue
+        if not track:
+            sql, count = handler.apply(sql)
+        elif handler.edits is None:
+            # No scanner: record the change as one edit so offsets still map
+            output, count = handler.apply(sql)
+            if output != sql:
+                history.append([_diff_edit(sql, output)])
+            sql = output
+        else:
+            from .utils import apply_edits
+
+            edits = handler.edits(sql)
+            count = len(edits)
+            if count:
+                if linter is not None:
+                    linter.observe(handler.name, sql, edits, _origin_map(history, base))
+                history.append(edits)
+                sql = apply_edits(sql, edits)
+        if count:
+            rewrites[handler.name] += count
+            if guard is not None:
+                guard.check_rewrites(sum(rewrites.values()))
+    if checker is not None:
+        checker.check(sql, _origin_map(history, base))
     return sql
+
+
+def _diff_edit(old: str, new: str) -> tuple[int, int, str]:
+    """Return the single edit turning *old* into *new*: the differing middle."""
+    limit = min(len(old), len(new))
+    # Longest common prefix and suffix by bisection on slice comparisons
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+    lo, hi = 0, limit - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return prefix, len(old) - lo, new[prefix:len(new) - lo]
+
+
+def _origin_map(history: list[list[tuple[int, int, str]]], base: int) -> Callable[[int], int]:
+    from .utils import original_offset
+
+    stages = tuple(reversed(history))
+
+    def to_origin(pos: int) -> int:
+        for edits in stages:
+            pos = original_offset(pos, edits)
+        return base + pos
+
+    return to_origin
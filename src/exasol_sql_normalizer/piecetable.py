@@ -0,0 +1,76 @@
+"""Piece table for assembling normalized output.
+
+Normalized output is mostly the input with a few statements rewritten.  A
+``PieceTable`` records it as ranges of the original buffer plus the inserted
+replacement text, so the pipeline never builds intermediate full-size
+strings; the final text is materialized once, or written out piece by piece.
+"""
+
+from __future__ import annotations
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, TextIO
+
+
+class PieceTable:
+    """Text made of ranges of *source* and inserted strings.
+
+    Pieces are ``(start, end)`` ranges of ``source`` or inserted ``str``
+    objects, in output order.  Adjacent source ranges are merged.
+    """
+
+    __slots__ = ("source", "_pieces", "_length", "_inserted")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._pieces: list[tuple[int, int] | str] = []
+        self._length = 0
+        self._inserted = False
+
+    def append_source(self, start: int, end: int) -> None:
+        """Append ``source[start:end]`` without copying it."""
+        if end <= start:
+            return
+        pieces = self._pieces
+        last = pieces[-1] if pieces else None
+        if type(last) is tuple and last[1] == start:
+            pieces[-1] = (last[0], end)
+        else:
+            pieces.append((start, end))
+        self._length += end - start
+
+    def append_text(self, text: str) -> None:
+        """Append an inserted string."""
+        if text:
+            self._pieces.append(text)
+            self._length += len(text)
+            self._inserted = True
+
+    def __len__(self) -> int:
+        return self._length
+
+    def chunks(self) -> Iterator[str]:
+        """Yield the text piece by piece."""
+        source = self.source
+        for piece in self._pieces:
+            if type(piece) is str:
+                yield piece
+            else:
+                yield source[piece[0]:piece[1]]
+
+    def write_to(self, writer: TextIO) -> None:
+        """Write the text to *writer* one piece at a time."""
+        write = writer.write
+        for chunk in self.chunks():
+            write(chunk)
+
+    def materialize(self) -> str:
+        """Return the text as one string.
+
+        When nothing was inserted and the table covers the whole source, the
+        source object itself is returned.
+        """
+        if not self._inserted and self._pieces == [(0, len(self.source))]:
+            return self.source
+        return "".join(self.chunks())
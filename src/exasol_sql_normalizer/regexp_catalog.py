@@ -0,0 +1,270 @@
+"""Catalog of REGEXP_LIKE patterns with syntax and backtracking checks.
+
+``find_regexp_patterns`` collects every REGEXP_LIKE with a literal pattern,
+in both the infix form (``col REGEXP_LIKE('p')``) and the function form
+(``REGEXP_LIKE(col, 'p')``).  ``build_catalog`` dedupes them and checks each
+distinct pattern once:
+
+- it is compiled with Python's ``re`` as a proxy for Exasol's PCRE syntax
+  (results are cached across calls);
+- its structure is searched for shapes prone to catastrophic backtracking,
+  e.g. nested quantifiers such as ``(a+)+``.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable
+
+from .handlers.regexp_like import infix_operand
+from .statements import script_regions
+from .utils import (
+    extract_quoted_string,
+    matching_paren,
+    skip_spans,
+    skip_whitespace,
+    split_top_level,
+)
+
+
+class PatternOccurrence:
+    """One REGEXP_LIKE with a literal pattern.
+
+    Attributes:
+        pattern: The pattern text (SQL ``''`` escapes resolved).
+        column: The expression the pattern is applied to.
+        start: Offset of the construct in the scanned SQL.
+        end: End offset (exclusive).
+        form: ``"infix"`` or ``"function"``.
+        source: Optional label of the scanned text, e.g. a file path.
+    """
+
+    __slots__ = ("pattern", "column", "start", "end", "form", "source")
+
+    def __init__(
+        self,
+        pattern: str,
+        column: str,
+        start: int,
+        end: int,
+        form: str,
+        source: str | None = None,
+    ) -> None:
+        self.pattern = pattern
+        self.column = column
+        self.start = start
+        self.end = end
+        self.form = form
+        self.source = source
+
+    def __repr__(self) -> str:
+        return f"PatternOccurrence({self.column} ~ {self.pattern!r} at {self.start})"
+
+
+class CatalogEntry:
+    """A distinct pattern with everything found about it.
+
+    Attributes:
+        pattern: The pattern text.
+        occurrences: Every ``PatternOccurrence`` of it, in scan order.
+        error: The ``re`` compile error message, or ``None`` if it compiles.
+        risks: Backtracking-risk codes from ``backtracking_risks``.
+    """
+
+    __slots__ = ("pattern", "occurrences", "error", "risks")
+
+    def __init__(self, pattern: str, error: str | None, risks: tuple[str, ...]) -> None:
+        self.pattern = pattern
+        self.occurrences: list[PatternOccurrence] = []
+        self.error = error
+        self.risks = risks
+
+    @property
+    def count(self) -> int:
+        return len(self.occurrences)
+
+    def __repr__(self) -> str:
+        return f"CatalogEntry({self.pattern!r}, count={self.count}, risks={self.risks!r})"
+
+
+def find_regexp_patterns(sql: str, source: str | None = None) -> list[PatternOccurrence]:
+    """Return every REGEXP_LIKE with a literal pattern in *sql*.
+
+    Occurrences inside strings, comments and ``CREATE ... SCRIPT`` bodies
+    are ignored, as are patterns that are not string literals.
+    """
+    found = []
+    upper = sql.upper()
+    skips = skip_spans(sql)
+    regions = script_regions(sql)
+    region_starts = [start for start, _ in regions]
+    i = 0
+    length = len(sql)
+
+    while i < length:
+        match_pos = upper.find("REGEXP_LIKE", i)
+        if match_pos == -1:
+            break
+        skip_end = skips.end_at(match_pos)
+        if skip_end != -1:
+            i = skip_end
+            continue
+        k = bisect_right(region_starts, match_pos) - 1
+        if k >= 0 and match_pos < regions[k][1]:
+            i = regions[k][1]
+            continue
+        i = match_pos + 11
+
+        cursor = skip_whitespace(sql, match_pos + 11)
+        if cursor >= length or sql[cursor] != "(":
+            continue
+        close_paren = matching_paren(sql, cursor)
+        if close_paren == -1:
+            continue
+        args = [arg.strip() for arg in split_top_level(sql, cursor + 1, close_paren)]
+
+        start, col_expr = infix_operand(sql, match_pos, cursor, close_paren)
+        if start != -1:
+            form, column, literal = "infix", col_expr, args[0]
+        elif len(args) >= 2:
+            form, column, literal = "function", args[0], args[1]
+            start = match_pos
+        else:
+            continue
+
+        pattern = _literal(literal)
+        if pattern is not None:
+            found.append(
+                PatternOccurrence(pattern, column, start, close_paren + 1, form, source)
+            )
+
+    return found
+
+
+def build_catalog(occurrences: Iterable[PatternOccurrence]) -> list[CatalogEntry]:
+    """Group *occurrences* by pattern and check each distinct pattern once.
+
+    Entries are ordered by first occurrence.
+    """
+    entries: dict[str, CatalogEntry] = {}
+    for occ in occurrences:
+        entry = entries.get(occ.pattern)
+        if entry is None:
+            entry = entries[occ.pattern] = CatalogEntry(
+                occ.pattern, compile_error(occ.pattern), backtracking_risks(occ.pattern),
+            )
+        entry.occurrences.append(occ)
+    return list(entries.values())
+
+
+@lru_cache(maxsize=4096)
+def compile_error(pattern: str) -> str | None:
+    """Return why Python's ``re`` rejects *pattern*, or ``None`` if it compiles."""
+    try:
+        re.compile(pattern)
+    except re.error as exc:
+        return str(exc)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def backtracking_risks(pattern: str) -> tuple[str, ...]:
+    """Return codes for pattern shapes prone to catastrophic backtracking.
+
+    - ``"nested-quantifier"``: a group containing an unbounded quantifier is
+      itself repeated without bound, e.g. ``(a+)+`` or ``(?:\\w*,)*``.
+    - ``"adjacent-wildcards"``: two unbounded ``.`` repetitions in a row,
+      e.g. ``.*.*``.
+    """
+    risks = []
+    # For each open group: does it contain an unbounded quantifier?
+    stack: list[bool] = []
+    inner_unbounded = False
+    prev_wildcard = False
+    i = 0
+    length = len(pattern)
+
+    while i < length:
+        ch = pattern[i]
+        atom_unbounded = False
+        is_dot = False
+        if ch == "\\":
+            i += 2
+        elif ch == "[":
+            i = _class_end(pattern, i)
+        elif ch == "(":
+            stack.append(inner_unbounded)
+            inner_unbounded = False
+            i += 1
+            if pattern.startswith("?", i):
+                # Skip the group modifier: (?:, (?=, (?<name>, ...
+                while i < length and pattern[i] not in ":=!>)":
+                    i += 1
+                i += 1
+            prev_wildcard = False
+            continue
+        elif ch == ")":
+            atom_unbounded = inner_unbounded
+            inner_unbounded = stack.pop() if stack else False
+            i += 1
+        else:
+            is_dot = ch == "."
+            i += 1
+
+        quantifier, i = _quantifier(pattern, i)
+        unbounded = quantifier == "unbounded"
+        if unbounded and atom_unbounded and "nested-quantifier" not in risks:
+            risks.append("nested-quantifier")
+        if unbounded or atom_unbounded:
+            inner_unbounded = True
+        wildcard = is_dot and unbounded
+        if wildcard and prev_wildcard and "adjacent-wildcards" not in risks:
+            risks.append("adjacent-wildcards")
+        prev_wildcard = wildcard
+
+    return tuple(risks)
+
+
+def _quantifier(pattern: str, i: int) -> tuple[str | None, int]:
+    """Parse a quantifier at *i*; returns ``(kind, next_index)``."""
+    if i >= len(pattern):
+        return None, i
+    ch = pattern[i]
+    if ch in "*+":
+        kind, i = "unbounded", i + 1
+    elif ch == "?":
+        kind, i = "bounded", i + 1
+    elif ch == "{":
+        m = re.match(r"\{(\d*)(,?)(\d*)\}", pattern[i:])
+        if m is None:
+            return None, i
+        kind = "unbounded" if m.group(2) and not m.group(3) else "bounded"
+        i += m.end()
+    else:
+        return None, i
+    # Lazy / possessive suffix
+    if i < len(pattern) and pattern[i] in "?+":
+        i += 1
+    return kind, i
+
+
+def _class_end(pattern: str, i: int) -> int:
+    """Return the index after the character class starting at *i*."""
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _literal(arg: str) -> str | None:
+    """Return the content of *arg* if it is exactly one string literal."""
+    if not arg.startswith("'"):
+        return None
+    end, content = extract_quoted_string(arg, 0)
+    return content if end == len(arg) else None
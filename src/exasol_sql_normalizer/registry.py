@@ -0,0 +1,285 @@
+"""Handler registry: trigger keywords and ordering constraints.
+
+Each handler is registered under a short name together with the keywords
+that must appear in the SQL for it to have any effect, and the names of the
+handlers it has to run before or after.  ``build_pipeline`` turns a set of
+names into an execution order via a topological sort of those constraints.
+"""
+
+# Kept free of typing/dataclasses/re imports: this module is on the
+# ``import exasol_sql_normalizer`` path, which short-lived processes pay for.
+from __future__ import annotations
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Iterable
+
+
+class Handler:
+    """A registered normalization handler.
+
+    Attributes:
+        name: Unique handler name, used to select handlers in ``normalize``.
+        func: ``str -> str`` rewrite function.  May be registered as a
+            ``"package.module:function"`` string, which is imported on first
+            use so that unused handlers never load.
+        edits: Optional ``str -> list[(start, end, replacement)]`` scanner
+            behind *func* (same lazy form allowed).  When present the
+            pipeline uses it to count rewrites and to leave untouched input
+            unallocated; ``None`` for handlers that only provide *func*.
+        triggers: Upper-case keywords; the handler is skipped when none of
+            them occur in the SQL.  An empty tuple means "always run".
+        before: Names of handlers this one must run before.
+        after: Names of handlers this one must run after.
+    """
+
+    __slots__ = ("name", "triggers", "before", "after", "_func", "_edits", "_trigger_re")
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[str], str] | str,
+        triggers: tuple[str, ...] = (),
+        before: frozenset[str] = frozenset(),
+        after: frozenset[str] = frozenset(),
+        edits: Callable[[str], list[tuple[int, int, str]]] | str | None = None,
+    ) -> None:
+        self.name = name
+        self.triggers = triggers
+        self.before = before
+        self.after = after
+        self._func = func
+        self._edits = edits
+        self._trigger_re = None
+
+    @property
+    def func(self) -> Callable[[str], str]:
+        func = self._func
+        if isinstance(func, str):
+            func = self._func = _resolve(func)
+        return func
+
+    @property
+    def edits(self) -> Callable[[str], list[tuple[int, int, str]]] | None:
+        edits = self._edits
+        if isinstance(edits, str):
+            edits = self._edits = _resolve(edits)
+        return edits
+
+    def is_triggered(self, sql: str) -> bool:
+        """Return whether any trigger keyword occurs in *sql* (case-insensitive).
+
+        Uses a regex search rather than ``sql.upper()`` so that input the
+        handler cannot touch is never copied.
+        """
+        if not self.triggers:
+            return True
+        pattern = self._trigger_re
+        if pattern is None:
+            import re
+
+            pattern = self._trigger_re = re.compile(
+                "|".join(re.escape(t) for t in self.triggers), re.IGNORECASE,
+            )
+        return pattern.search(sql) is not None
+
+    def apply(self, sql: str) -> tuple[str, int]:
+        """Run the handler on *sql* and return ``(result, rewrite_count)``.
+
+        *result* is *sql* itself when nothing was rewritten.  Handlers
+        without an edits scanner report a count of 1 for any change.
+        """
+        scan = self.edits
+        if scan is None:
+            rewritten = self.func(sql)
+            if rewritten == sql:
+                return sql, 0
+            return rewritten, 1
+
+        edits = scan(sql)
+        if not edits:
+            return sql, 0
+        from .utils import apply_edits
+
+        return apply_edits(sql, edits), len(edits)
+
+    def __repr__(self) -> str:
+        return f"Handler(name={self.name!r}, triggers={self.triggers!r})"
+
+
+def _resolve(target: str) -> Callable[[str], str]:
+    """Import ``"package.module:attr"`` and return the attribute."""
+    from importlib import import_module
+
+    module_name, _, attr = target.partition(":")
+    return getattr(import_module(module_name), attr)
+
+
+_HANDLERS: dict[str, Handler] = {}
+_PIPELINE_CACHE: dict[frozenset[str] | None, tuple[Handler, ...]] = {}
+
+
+def register_handler(
+    name: str,
+    func: Callable[[str], str] | str,
+    *,
+    triggers: Iterable[str] = (),
+    before: Iterable[str] = (),
+    after: Iterable[str] = (),
+    edits: Callable[[str], list[tuple[int, int, str]]] | str | None = None,
+    replace: bool = False,
+) -> Handler:
+    """Register a handler under *name* and return its record.
+
+    *func* is either the rewrite callable or a lazy ``"module:function"``
+    reference; *edits* optionally names the scanner behind it (see
+    ``Handler``).
+
+    Constraints may name handlers that are not registered (yet); they are
+    simply ignored while the other handler is absent from a pipeline.
+
+    Raises:
+        ValueError: If *name* is already registered and *replace* is false.
+    """
+    if name in _HANDLERS and not replace:
+        raise ValueError(f"Handler {name!r} is already registered")
+
+    handler = Handler(
+        name=name,
+        func=func,
+        triggers=tuple(t.upper() for t in triggers),
+        before=frozenset(before),
+        after=frozenset(after),
+        edits=edits,
+    )
+    # Re-registering keeps the original position in the tie-break order
+    _HANDLERS[name] = handler
+    _PIPELINE_CACHE.clear()
+    return handler
+
+
+def unregister_handler(name: str) -> None:
+    """Remove the handler registered under *name*.
+
+    Raises:
+        KeyError: If no handler with that name is registered.
+    """
+    del _HANDLERS[name]
+    _PIPELINE_CACHE.clear()
+
+
+def get_handler(name: str) -> Handler:
+    """Return the handler registered under *name*."""
+    return _HANDLERS[name]
+
+
+def handler_names() -> list[str]:
+    """Return the registered handler names in registration order."""
+    return list(_HANDLERS)
+
+
+def build_pipeline(names: Iterable[str] | None = None) -> tuple[Handler, ...]:
+    """Return the handlers for *names* in a valid execution order.
+
+    With ``names=None`` every registered handler is included.  Handlers are
+    sorted topologically by their ``before`` / ``after`` constraints; ties
+    are broken by registration order, so the result is deterministic.
+
+    Raises:
+        ValueError: If a name is not registered or the constraints among the
+            selected handlers form a cycle.
+    """
+    key = None if names is None else frozenset(names)
+    cached = _PIPELINE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    if key is None:
+        selected = list(_HANDLERS)
+    else:
+        unknown = sorted(key - _HANDLERS.keys())
+        if unknown:
+            raise ValueError(f"Unknown handler(s): {', '.join(unknown)}")
+        selected = [name for name in _HANDLERS if name in key]
+
+    pipeline = tuple(_HANDLERS[name] for name in _toposort(selected))
+    _PIPELINE_CACHE[key] = pipeline
+    return pipeline
+
+
+def _toposort(selected: list[str]) -> list[str]:
+    """Kahn's algorithm over the constraints among *selected* handlers."""
+    rank = {name: idx for idx, name in enumerate(selected)}
+    successors: dict[str, set[str]] = {name: set() for name in selected}
+
+    for name in selected:
+        handler = _HANDLERS[name]
+        for other in handler.before:
+            if other in rank:
+                successors[name].add(other)
+        for other in handler.after:
+            if other in rank:
+                successors[other].add(name)
+
+    indegree = {name: 0 for name in selected}
+    for targets in successors.values():
+        for target in targets:
+            indegree[target] += 1
+
+    order: list[str] = []
+    ready = [name for name in selected if indegree[name] == 0]
+    while ready:
+        # Lowest registration rank first keeps the order stable
+        ready.sort(key=rank.__getitem__)
+        name = ready.pop(0)
+        order.append(name)
+        for target in successors[name]:
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                ready.append(target)
+
+    if len(order) != len(selected):
+        cycle = sorted(name for name in selected if indegree[name] > 0)
+        raise ValueError(f"Handler ordering constraints form a cycle: {', '.join(cycle)}")
+    return order
+
+
+# ---------------------------------------------------------------------------
+# Built-in handlers
+# ---------------------------------------------------------------------------
+
+_BUILTIN = "exasol_sql_normalizer.handlers."
+
+# EXPORT bodies may contain IMPORT statements that need normalization.
+register_handler(
+    "export_into", _BUILTIN + "export_into:normalize_export_into",
+    edits=_BUILTIN + "export_into:export_into_edits",
+    triggers=("EXPORT",), before=("import_into", "import_from"),
+)
+register_handler(
+    "import_into", _BUILTIN + "import_into:normalize_import_into",
+    edits=_BUILTIN + "import_into:import_into_edits",
+    triggers=("IMPORT",),
+)
+# IMPORT FROM only handles the bare form left over once IMPORT INTO has run.
+register_handler(
+    "import_from", _BUILTIN + "import_from:normalize_import_from",
+    edits=_BUILTIN + "import_from:import_from_edits",
+    triggers=("IMPORT",), after=("import_into",),
+)
+register_handler(
+    "group_concat", _BUILTIN + "group_concat:normalize_group_concat",
+    edits=_BUILTIN + "group_concat:group_concat_edits",
+    triggers=("GROUP_CONCAT",),
+)
+# CONVERT often wraps GROUP_CONCAT, whose SEPARATOR must be stripped first.
+register_handler(
+    "convert", _BUILTIN + "convert:normalize_convert_charset",
+    edits=_BUILTIN + "convert:convert_charset_edits",
+    triggers=("CONVERT",), after=("group_concat",),
+)
+register_handler(
+    "regexp_like", _BUILTIN + "regexp_like:normalize_regexp_like",
+    edits=_BUILTIN + "regexp_like:regexp_like_edits",
+    triggers=("REGEXP_LIKE",),
+)
@@ -0,0 +1,556 @@
+"""Declarative rewrite rules compiled into a single-scan matcher.
+
+A ``Rule`` pairs a pattern with an output template::
+
+    Rule("convert",
+         "CONVERT ( {type:word} [{precision:parens}] UTF8|ASCII , {expr:expr} )",
+         "CAST({expr|strip} AS {type}{precision})")
+
+Pattern elements, separated by optional whitespace:
+
+- ``WORD``: a keyword, case-insensitive; ``A|B`` accepts either.  The first
+  keyword of a pattern is its anchor.
+- ``( ... )``: a balanced parenthesized group whose content must match the
+  elements inside.
+- ``[ ... ]``: an optional clause; its captures are empty when it is absent.
+- ``,`` ``;`` ``=`` ``.``: literal punctuation.
+- ``{name:shape}``: a capture.  Shapes:
+
+  ============== ==========================================================
+  Shape          Matches
+  ============== ==========================================================
+  word           an identifier (``\\w+``)
+  name           a ``/* */`` comment or a run of non-whitespace characters
+  string         a single-quoted literal; the value is unescaped
+  parens         a balanced ``( ... )`` group, parens included
+  body           SQL up to the group's closing paren, or up to the first
+                 top-level occurrence of the keyword or punctuation that
+                 follows it
+  expr           like ``body``, but not blank
+  through_semi   everything through the next ``;`` outside a literal, or
+                 to the end of the input
+  operand        the identifier before the anchor (first element only);
+                 not a SQL keyword, and not when the ``( ... )`` group
+                 after the anchor already holds two arguments
+  ============== ==========================================================
+
+Templates are plain text with ``{name}`` or ``{name|filter}`` (``{name|
+filter:other}`` passes the capture *other* too) placeholders; see
+``FILTERS``.  ``{keyword}`` is the anchor keyword as written in the
+input.  ``body`` and ``expr`` captures are rewritten by the whole rule set
+before they are substituted, so nested constructs come out normalized.
+
+``compile_rules`` merges the anchors of all rules into one pattern, so a
+``RuleMatcher`` finds every construct in one scan, dispatching on the
+keyword found.  ``BUILTIN_RULES`` expresses the six built-in handlers and
+gives the same output on well-formed SQL.  Templates spell out the
+replacement, so unusual whitespace between matched tokens is normalized,
+and keywords only match as whole words.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from .guard import charge
+from .utils import (
+    apply_edits,
+    closing_quote,
+    extract_tables_from_statement,
+    matching_paren,
+    skip_spans,
+    split_top_level,
+)
+
+if TYPE_CHECKING:
+    from .registry import Handler
+
+SHAPES = frozenset({
+    "word", "name", "string", "parens", "body", "expr", "through_semi", "operand",
+})
+
+_PATTERN_TOKEN = re.compile(
+    r"\s*(?:\{(?P<name>\w+):(?P<shape>\w+)\}|(?P<bracket>[\[\]()])"
+    r"|(?P<punct>[,;=.])|(?P<word>\w+(?:\|\w+)*))"
+)
+_PLACEHOLDER = re.compile(r"\{(\w+)(?:\|(\w+)(?::(\w+))?)?\}")
+_SPACE = re.compile(r"[ \t\n\r]*")
+_WORD = re.compile(r"\w+")
+_NAME = re.compile(r"/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|\S+")
+_THROUGH_SEMI = re.compile(r"[;']")
+
+
+class Rule:
+    """A declarative rewrite: *pattern* is replaced by *template*.
+
+    See the module docstring for the pattern and template syntax.
+    """
+
+    __slots__ = ("name", "pattern", "template")
+
+    def __init__(self, name: str, pattern: str, template: str) -> None:
+        self.name = name
+        self.pattern = pattern
+        self.template = template
+
+    def __repr__(self) -> str:
+        return f"Rule({self.name!r}, {self.pattern!r})"
+
+
+# ---------------------------------------------------------------------------
+# Template filters
+# ---------------------------------------------------------------------------
+
+def _column_names(value: str | None, other: str | None) -> str:
+    """Names of the column definitions in *value*, or ``*``."""
+    names = []
+    for part in split_top_level(value or ""):
+        part = part.strip()
+        if part.startswith('"'):
+            close = part.find('"', 1)
+            names.append(part[1:] if close == -1 else part[1:close])
+        else:
+            m = _WORD.match(part)
+            if m:
+                names.append(m.group())
+    return ", ".join(names) or "*"
+
+
+def _jdbc_tables(value: str | None, connection: str | None) -> str:
+    """Tables of the remote statement *value*, prefixed with the connection."""
+    tables = extract_tables_from_statement(value) if value else []
+    if not tables:
+        return f"__JDBC_IMPORT__{connection}"
+    return ", ".join(f"__JDBC_IMPORT__{connection}.{t}" for t in tables)
+
+
+# name -> function(capture, other capture named after the colon, or None)
+FILTERS: dict[str, Callable[[str | None, str | None], str]] = {
+    "strip": lambda value, other: (value or "").strip(),
+    "rstrip": lambda value, other: (value or "").rstrip(),
+    "column_names": _column_names,
+    "jdbc_tables": _jdbc_tables,
+}
+
+
+# ---------------------------------------------------------------------------
+# Built-in handlers as rules
+# ---------------------------------------------------------------------------
+
+BUILTIN_RULES = (
+    Rule(
+        "export_into",
+        "EXPORT ( {query:body} ) INTO SCRIPT {target:name} [WITH {options:through_semi}]",
+        "CREATE TABLE {target} AS\n{query|strip}",
+    ),
+    Rule(
+        "import_into",
+        "IMPORT INTO ( {columns:body} ) FROM JDBC AT {connection:name} "
+        "[STATEMENT {statement:string}]",
+        "SELECT {columns|column_names} FROM {statement|jdbc_tables:connection}",
+    ),
+    Rule(
+        "import_from",
+        "IMPORT FROM JDBC AT {connection:name} [STATEMENT {statement:string}]",
+        "SELECT * FROM {statement|jdbc_tables:connection}",
+    ),
+    Rule(
+        "group_concat",
+        "GROUP_CONCAT ( {args:body} SEPARATOR {separator:body} )",
+        "{keyword}({args|rstrip})",
+    ),
+    Rule(
+        "convert",
+        "CONVERT ( {type:word} [{precision:parens}] UTF8|ASCII , {expr:expr} )",
+        "CAST({expr|strip} AS {type}{precision})",
+    ),
+    Rule(
+        "regexp_like",
+        "{operand:operand} REGEXP_LIKE ( {args:body} )",
+        "REGEXP_LIKE({operand}, {args})",
+    ),
+)
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+class _CompiledRule:
+    __slots__ = ("name", "steps", "operand", "template", "rewrite")
+
+    def __init__(self, rule: Rule) -> None:
+        self.name = rule.name
+        self.operand: str | None = None
+        shapes: dict[str, str] = {}
+        tokens = _tokenize_pattern(rule)
+        if tokens and tokens[0][0] == "capture" and tokens[0][2] == "operand":
+            self.operand = tokens[0][1]
+            shapes[self.operand] = "operand"
+            tokens = tokens[1:]
+        self.steps, rest = _parse_steps(rule, tokens, 0, shapes, None)
+        if rest != len(tokens):
+            raise ValueError(f"rule {rule.name!r}: unbalanced {tokens[rest][1]!r}")
+        if not self.steps or self.steps[0][0] != "keyword":
+            raise ValueError(f"rule {rule.name!r}: pattern must start with a keyword")
+        self.template = _parse_template(rule, shapes)
+        # Captures whose SQL is normalized before substitution
+        self.rewrite = frozenset(n for n, s in shapes.items() if s in ("body", "expr"))
+
+    @property
+    def anchors(self) -> tuple[str, ...]:
+        return self.steps[0][1]
+
+
+def _tokenize_pattern(rule: Rule) -> list[tuple]:
+    tokens = []
+    pos = 0
+    pattern = rule.pattern.rstrip()
+    while pos < len(pattern):
+        m = _PATTERN_TOKEN.match(pattern, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"rule {rule.name!r}: cannot parse pattern at {pattern[pos:]!r}")
+        pos = m.end()
+        if m.group("name"):
+            shape = m.group("shape")
+            if shape not in SHAPES:
+                raise ValueError(f"rule {rule.name!r}: unknown shape {shape!r}")
+            if m.group("name") == "keyword":
+                raise ValueError(f"rule {rule.name!r}: 'keyword' is reserved")
+            if shape == "operand" and tokens:
+                raise ValueError(f"rule {rule.name!r}: an operand must come first")
+            tokens.append(("capture", m.group("name"), shape))
+        elif m.group("bracket"):
+            tokens.append(("bracket", m.group("bracket")))
+        elif m.group("punct"):
+            tokens.append(("punct", m.group("punct")))
+        else:
+            tokens.append(("keyword", tuple(w.upper() for w in m.group("word").split("|"))))
+    return tokens
+
+
+def _parse_steps(
+    rule: Rule,
+    tokens: list[tuple],
+    pos: int,
+    shapes: dict[str, str],
+    closer: str | None,
+) -> tuple[list[tuple], int]:
+    """Turn *tokens* from *pos* up to *closer* into matcher steps.
+
+    Steps: ``("keyword", words)``, ``("punct", ch)``, ``("group", steps)``,
+    ``("optional", steps, names)`` and ``("capture", name, shape, stop)``,
+    where *stop* is the keyword or punctuation ending a ``body``/``expr``
+    capture.
+    """
+    steps: list[tuple] = []
+    while pos < len(tokens):
+        token = tokens[pos]
+        kind = token[0]
+        if kind == "bracket" and token[1] in ")]":
+            if token[1] != closer:
+                raise ValueError(f"rule {rule.name!r}: unbalanced {token[1]!r}")
+            break
+        pos += 1
+        if kind == "keyword" or kind == "punct":
+            steps.append(token)
+        elif kind == "capture":
+            name, shape = token[1], token[2]
+            if name in shapes:
+                raise ValueError(f"rule {rule.name!r}: capture {name!r} appears twice")
+            shapes[name] = shape
+            stop = None
+            if shape in ("body", "expr"):
+                following = tokens[pos] if pos < len(tokens) else None
+                if following is not None and following[0] == "punct":
+                    stop = following[1]
+                elif following is not None and following[0] == "keyword" and len(following[1]) == 1:
+                    stop = following[1][0]
+                elif following != ("bracket", ")") or closer != ")":
+                    raise ValueError(
+                        f"rule {rule.name!r}: {shape} capture {name!r} must end its "
+                        "group or precede a keyword or punctuation"
+                    )
+            steps.append(("capture", name, shape, stop))
+        else:
+            opener = token[1]
+            before = set(shapes)
+            inner, pos = _parse_steps(rule, tokens, pos, shapes, ")" if opener == "(" else "]")
+            pos += 1
+            if opener == "(":
+                steps.append(("group", inner))
+            else:
+                steps.append(("optional", inner, tuple(n for n in shapes if n not in before)))
+    if closer is not None and pos == len(tokens):
+        raise ValueError(f"rule {rule.name!r}: unbalanced {'(' if closer == ')' else '['!r}")
+    return steps, pos
+
+
+def _parse_template(rule: Rule, shapes: dict[str, str]) -> list:
+    """Split the template into literal text and ``(name, filter, other)`` parts."""
+    parts: list = []
+    pos = 0
+    for m in _PLACEHOLDER.finditer(rule.template):
+        name, filter_name, other = m.groups()
+        for ref in (name, other):
+            if ref is not None and ref not in shapes and ref != "keyword":
+                raise ValueError(f"rule {rule.name!r}: template uses unknown capture {ref!r}")
+        if filter_name is not None and filter_name not in FILTERS:
+            raise ValueError(f"rule {rule.name!r}: unknown filter {filter_name!r}")
+        parts.append(rule.template[pos:m.start()])
+        parts.append((name, filter_name, other))
+        pos = m.end()
+    parts.append(rule.template[pos:])
+    return [part for part in parts if part != ""]
+
+
+# ---------------------------------------------------------------------------
+# Matching
+# ---------------------------------------------------------------------------
+
+class RuleMatcher:
+    """Applies a compiled rule set in one scan over the input.
+
+    Rules sharing an anchor keyword are tried in the order given.
+
+    Attributes:
+        keywords: Upper-case anchor keywords, usable as handler triggers.
+    """
+
+    __slots__ = ("keywords", "_dispatch", "_anchor", "_stops")
+
+    def __init__(self, rules: Iterable[_CompiledRule]) -> None:
+        dispatch: dict[str, list[_CompiledRule]] = {}
+        for rule in rules:
+            for keyword in rule.anchors:
+                dispatch.setdefault(keyword, []).append(rule)
+        self._dispatch = {k: tuple(v) for k, v in dispatch.items()}
+        self.keywords = tuple(dispatch)
+        # Longest first, so a keyword never shadows a longer one it prefixes
+        alternatives = "|".join(re.escape(k) for k in sorted(dispatch, key=len, reverse=True))
+        self._anchor = re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE)
+        self._stops: dict[str, re.Pattern[str]] = {}
+
+    def __call__(self, sql: str) -> str:
+        """Return *sql* with every rule applied."""
+        return apply_edits(sql, self.edits(sql))
+
+    def edits(self, sql: str) -> list[tuple[int, int, str]]:
+        """Return ``(start, end, replacement)`` edits for every rule match."""
+        edits = []
+        charge(len(sql))
+        search = self._anchor.search
+        m = search(sql)
+        if m is None:
+            return edits
+        skips = skip_spans(sql)
+        done = 0
+        while m is not None:
+            keyword = m.start()
+            skip_end = skips.end_at(keyword)
+            if skip_end != -1:
+                m = search(sql, skip_end)
+                continue
+            for rule in self._dispatch[m.group().upper()]:
+                match = self._match_rule(rule, sql, keyword, m.end(), done)
+                if match is not None:
+                    start, end, replacement = match
+                    edits.append((start, end, replacement))
+                    done = end
+                    m = search(sql, end)
+                    break
+            else:
+                m = search(sql, m.end())
+        return edits
+
+    def _match_rule(
+        self, rule: _CompiledRule, sql: str, keyword: int, pos: int, lower: int,
+    ) -> tuple[int, int, str] | None:
+        captures: dict[str, str | None] = {"keyword": sql[keyword:pos]}
+        start = keyword
+        if rule.operand is not None:
+            from .handlers.regexp_like import infix_operand
+
+            open_paren = close_paren = _SPACE.match(sql, pos).end()
+            if open_paren < len(sql) and sql[open_paren] == "(":
+                close_paren = max(matching_paren(sql, open_paren), open_paren)
+            start, operand = infix_operand(sql, keyword, open_paren, close_paren, lower)
+            if start == -1:
+                return None
+            captures[rule.operand] = operand
+        end = self._match(rule.steps[1:], sql, pos, len(sql), captures)
+        if end == -1:
+            return None
+        charge(end - start)
+        return start, end, self._render(rule, captures)
+
+    def _match(
+        self, steps: list[tuple], sql: str, pos: int, end: int, captures: dict[str, str | None],
+    ) -> int:
+        """Match *steps* against ``sql[pos:end]``; return the end, or -1."""
+        for step in steps:
+            kind = step[0]
+            if kind == "capture":
+                pos = self._capture(step, sql, pos, end, captures)
+                if pos == -1:
+                    return -1
+                continue
+            pos = _SPACE.match(sql, pos, end).end()
+            if kind == "keyword":
+                m = _WORD.match(sql, pos, end)
+                if m is None or m.group().upper() not in step[1]:
+                    return -1
+                pos = m.end()
+            elif kind == "punct":
+                if pos >= end or sql[pos] != step[1]:
+                    return -1
+                pos += 1
+            elif kind == "group":
+                if pos >= end or sql[pos] != "(":
+                    return -1
+                close = matching_paren(sql, pos)
+                if close == -1 or close >= end:
+                    return -1
+                inner = self._match(step[1], sql, pos + 1, close, captures)
+                if inner == -1 or _SPACE.match(sql, inner, close).end() != close:
+                    return -1
+                pos = close + 1
+            else:
+                attempt = dict(captures)
+                found = self._match(step[1], sql, pos, end, attempt)
+                if found == -1:
+                    captures.update(dict.fromkeys(step[2]))
+                else:
+                    captures.update(attempt)
+                    pos = found
+        return pos
+
+    def _capture(
+        self, step: tuple, sql: str, pos: int, end: int, captures: dict[str, str | None],
+    ) -> int:
+        _, name, shape, stop = step
+        if shape in ("body", "expr"):
+            stop_at = end if stop is None else self._find_stop(sql, pos, end, stop)
+            if stop_at == -1:
+                return -1
+            value = sql[pos:stop_at]
+            if shape == "expr" and not value.strip():
+                return -1
+            captures[name] = value
+            return stop_at
+        if shape == "through_semi":
+            search = _THROUGH_SEMI.search
+            i = pos
+            while True:
+                m = search(sql, i, end)
+                if m is None:
+                    i = end
+                    break
+                i = m.start()
+                if sql[i] == ";":
+                    i += 1
+                    break
+                i = closing_quote(sql, i) + 1
+            captures[name] = sql[pos:i]
+            return i
+        pos = _SPACE.match(sql, pos, end).end()
+        if shape == "word" or shape == "name":
+            m = (_WORD if shape == "word" else _NAME).match(sql, pos, end)
+            if m is None:
+                return -1
+            captures[name] = m.group()
+            return m.end()
+        if pos >= end:
+            return -1
+        if shape == "string":
+            if sql[pos] != "'":
+                return -1
+            close = closing_quote(sql, pos)
+            if close >= end:
+                return -1
+            captures[name] = sql[pos + 1:close].replace("''", "'")
+            return close + 1
+        # parens
+        if sql[pos] != "(":
+            return -1
+        close = matching_paren(sql, pos)
+        if close == -1 or close >= end:
+            return -1
+        captures[name] = sql[pos:close + 1]
+        return close + 1
+
+    def _find_stop(self, sql: str, pos: int, end: int, stop: str) -> int:
+        """Offset of the first *stop* in ``sql[pos:end]`` outside literals and parens."""
+        pattern = self._stops.get(stop)
+        if pattern is None:
+            token = re.escape(stop) if stop in ",;=." else rf"(?<!\w){re.escape(stop)}(?!\w)"
+            pattern = self._stops[stop] = re.compile(rf"['\"(]|{token}", re.IGNORECASE)
+        search = pattern.search
+        i = pos
+        while True:
+            m = search(sql, i, end)
+            if m is None:
+                return -1
+            i = m.start()
+            ch = sql[i]
+            if ch == "'":
+                i = closing_quote(sql, i) + 1
+            elif ch == '"':
+                i = sql.find('"', i + 1, end)
+                if i == -1:
+                    return -1
+                i += 1
+            elif ch == "(":
+                i = matching_paren(sql, i)
+                if i == -1:
+                    return -1
+                i += 1
+            else:
+                return i
+
+    def _render(self, rule: _CompiledRule, captures: dict[str, str | None]) -> str:
+        out = []
+        for part in rule.template:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            name, filter_name, other = part
+            value = captures.get(name)
+            if value is not None and name in rule.rewrite:
+                value = self(value)
+            if filter_name is not None:
+                value = FILTERS[filter_name](value, None if other is None else captures.get(other))
+            out.append(value or "")
+        return "".join(out)
+
+
+def compile_rules(rules: Iterable[Rule]) -> RuleMatcher:
+    """Compile *rules* into one ``RuleMatcher``.
+
+    Raises:
+        ValueError: If a pattern or template is malformed.
+    """
+    return RuleMatcher([_CompiledRule(rule) for rule in rules])
+
+
+def register_rules(
+    name: str,
+    rules: Iterable[Rule],
+    *,
+    before: Iterable[str] = (),
+    after: Iterable[str] = (),
+    replace: bool = False,
+) -> Handler:
+    """Compile *rules* and register them as one handler named *name*.
+
+    The anchor keywords become the handler's triggers; see
+    ``register_handler`` for the other arguments.
+    """
+    from .registry import register_handler
+
+    matcher = compile_rules(rules)
+    return register_handler(
+        name, matcher, edits=matcher.edits, triggers=matcher.keywords,
+        before=before, after=after, replace=replace,
+    )
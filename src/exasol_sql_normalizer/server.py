@@ -0,0 +1,418 @@
+"""Long-running normalization server with a warm worker pool.
+
+Two transports share one ``NormalizationService``:
+
+- **HTTP** on localhost: ``POST /normalize`` with ``{"sql": "..."}`` or
+  ``{"batch": ["...", ...]}``; ``GET /health``, ``GET /stats`` and, with
+  metrics enabled, ``GET /metrics`` (Prometheus text format).
+- **Unix socket** with length-prefixed frames: a 4-byte big-endian length
+  followed by a UTF-8 JSON object ``{"op": "normalize" | "health" |
+  "stats" | "metrics", ...}``.  Responses use the same framing.
+
+Requests beyond ``max_pending`` in-flight requests are rejected immediately
+(HTTP 503 / ``{"error": "busy"}``) instead of queueing without bound.  An
+optional ``Guard`` bounds each statement; a request containing a statement
+that exceeds it fails with HTTP 422 / ``{"error": "budget-exceeded"}``.
+Any other failure, e.g. a crashed worker, is answered with HTTP 500 /
+``{"error": "internal"}`` rather than a dropped connection.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Iterable
+
+from .batch import _normalize_chunk, _normalize_chunk_metered, _warm_worker
+from .guard import BudgetExceeded
+
+if TYPE_CHECKING:
+    from .guard import Guard
+
+_FRAME_HEADER = struct.Struct(">I")
+
+# Upper bound for a single request body / frame
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class ServiceBusy(Exception):
+    """Raised when the service already has ``max_pending`` requests in flight."""
+
+
+class NormalizationService:
+    """Process pool plus request accounting shared by both transports.
+
+    With *metrics* set, ``metrics`` recording is enabled in this process
+    and the workers send their counts back with each result.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        handlers: Iterable[str] | None = None,
+        guard: Guard | None = None,
+        metrics: bool = False,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.handlers = None if handlers is None else frozenset(handlers)
+        self.guard = guard
+        self.metrics = metrics
+        if metrics:
+            from . import metrics as metrics_module
+
+            metrics_module.enable()
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_warm_worker,
+            initargs=(self.handlers,),
+        )
+        # Force every worker to start (and run the initializer) now
+        for future in [self._pool.submit(int) for _ in range(self.workers)]:
+            future.result()
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._stats = {
+            "requests": 0,
+            "statements": 0,
+            "input_bytes": 0,
+            "rejected": 0,
+            "budget_exceeded": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "busy_seconds": 0.0,
+        }
+
+    def normalize_batch(self, sqls: list[str]) -> list[str]:
+        """Normalize *sqls* on the pool, preserving order.
+
+        Raises:
+            ServiceBusy: If ``max_pending`` requests are already in flight.
+            BudgetExceeded: If a statement exceeds the service's guard.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._bump(rejected=1)
+            raise ServiceBusy("too many pending requests")
+
+        self._bump(in_flight=1)
+        started = time.perf_counter()
+        try:
+            chunk = max(1, -(-len(sqls) // self.workers))
+            task = _normalize_chunk_metered if self.metrics else _normalize_chunk
+            futures = [
+                self._pool.submit(task, sqls[i:i + chunk], self.handlers, self.guard)
+                for i in range(0, len(sqls), chunk)
+            ]
+            results = []
+            for future in futures:
+                if self.metrics:
+                    from . import metrics
+
+                    outputs, counts = future.result()
+                    metrics.merge(counts)
+                    results.extend(outputs)
+                else:
+                    results.extend(future.result())
+        except BudgetExceeded as exc:
+            self._bump(budget_exceeded=1)
+            if self.metrics:
+                from . import metrics
+
+                metrics.record_guard_trip(exc.limit)
+            raise
+        except Exception:
+            self._bump(errors=1)
+            raise
+        finally:
+            self._slots.release()
+            self._bump(in_flight=-1, busy_seconds=time.perf_counter() - started)
+
+        self._bump(
+            requests=1,
+            statements=len(sqls),
+            input_bytes=sum(len(sql) for sql in sqls),
+        )
+        return results
+
+    def stats(self) -> dict:
+        """Return a snapshot of the request counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["workers"] = self.workers
+        stats["max_pending"] = self.max_pending
+        stats["uptime_seconds"] = round(time.monotonic() - self._started, 3)
+        return stats
+
+    def metrics_text(self) -> str | None:
+        """Return the metrics in Prometheus text format, or None when disabled."""
+        if not self.metrics:
+            return None
+        from . import metrics
+
+        return metrics.render()
+
+    def handle(self, request: dict) -> dict:
+        """Dispatch a decoded request object and return the response object."""
+        op = request.get("op", "normalize")
+        if op == "health":
+            return {"status": "ok"}
+        if op == "stats":
+            return self.stats()
+        if op == "metrics":
+            text = self.metrics_text()
+            if text is None:
+                raise ValueError("metrics are not enabled")
+            return {"metrics": text}
+        if op != "normalize":
+            raise ValueError(f"Unknown op: {op!r}")
+
+        if "batch" in request:
+            batch = request["batch"]
+            if not isinstance(batch, list) or not all(isinstance(s, str) for s in batch):
+                raise ValueError("'batch' must be a list of strings")
+            return {"batch": self.normalize_batch(batch)}
+        sql = request.get("sql")
+        if not isinstance(sql, str):
+            raise ValueError("'sql' must be a string")
+        return {"sql": self.normalize_batch([sql])[0]}
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def _bump(self, **deltas: float) -> None:
+        with self._lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+
+# ---------------------------------------------------------------------------
+# HTTP transport
+# ---------------------------------------------------------------------------
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    server: _HTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._reply(200, service.handle({"op": "health"}))
+        elif self.path == "/stats":
+            self._reply(200, service.handle({"op": "stats"}))
+        elif self.path == "/metrics" and service.metrics:
+            payload = service.metrics_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/normalize":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(400, {"error": "invalid Content-Length"})
+            return
+        if length > MAX_REQUEST_BYTES:
+            self._reply(413, {"error": "request too large"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise ValueError("request body must be a JSON object")
+            request["op"] = "normalize"
+            self._reply(200, self.server.service.handle(request))
+        except ServiceBusy as exc:
+            self._reply(503, {"error": "busy", "detail": str(exc)})
+        except BudgetExceeded as exc:
+            self._reply(422, {"error": "budget-exceeded", "detail": str(exc)})
+        except ValueError as exc:
+            self._reply(400, {"error": str(exc)})
+        except Exception as exc:
+            self._reply(500, {"error": "internal", "detail": repr(exc)})
+
+    def _reply(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: NormalizationService) -> None:
+        super().__init__(address, _HTTPHandler)
+        self.service = service
+
+
+# ---------------------------------------------------------------------------
+# Unix socket transport (length-prefixed JSON frames)
+# ---------------------------------------------------------------------------
+
+def read_frame(sock: socket.socket) -> bytes | None:
+    """Read one length-prefixed frame; ``None`` on a clean end of stream."""
+    header = _recv_exact(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    (length,) = _FRAME_HEADER.unpack(header)
+    if length > MAX_REQUEST_BYTES:
+        raise ValueError("frame too large")
+    payload = _recv_exact(sock, length)
+    if payload is None:
+        raise ConnectionError("connection closed mid-frame")
+    return payload
+
+
+def write_frame(sock: socket.socket, payload: bytes) -> None:
+    """Write *payload* as one length-prefixed frame."""
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes | None:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            if chunks:
+                raise ConnectionError("connection closed mid-frame")
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class _FrameHandler(socketserver.BaseRequestHandler):
+    server: _UnixServer
+
+    def handle(self):
+        while True:
+            try:
+                frame = read_frame(self.request)
+            except (ValueError, ConnectionError):
+                return
+            if frame is None:
+                return
+            try:
+                request = json.loads(frame)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                response = self.server.service.handle(request)
+            except ServiceBusy as exc:
+                response = {"error": "busy", "detail": str(exc)}
+            except BudgetExceeded as exc:
+                response = {"error": "budget-exceeded", "detail": str(exc)}
+            except ValueError as exc:
+                response = {"error": str(exc)}
+            except Exception as exc:
+                response = {"error": "internal", "detail": repr(exc)}
+            write_frame(self.request, json.dumps(response).encode())
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: NormalizationService) -> None:
+        super().__init__(path, _FrameHandler)
+        self.service = service
+
+
+def call_unix(path: str, request: dict) -> dict:
+    """Send one request to a Unix-socket server and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        write_frame(sock, json.dumps(request).encode())
+        frame = read_frame(sock)
+    if frame is None:
+        raise ConnectionError("server closed the connection")
+    return json.loads(frame)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def make_server(
+    service: NormalizationService,
+    *,
+    unix_path: str | None = None,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+) -> socketserver.BaseServer:
+    """Create (but do not start) the HTTP or Unix-socket server.
+
+    A stale socket left at *unix_path* by an earlier run is removed.
+
+    Raises:
+        FileExistsError: If *unix_path* exists and is not a socket.
+    """
+    if unix_path is not None:
+        try:
+            mode = os.lstat(unix_path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{unix_path} exists and is not a socket")
+            os.unlink(unix_path)
+        return _UnixServer(unix_path, service)
+    return _HTTPServer((host, port), service)
+
+
+def serve(
+    *,
+    unix_path: str | None = None,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    workers: int | None = None,
+    max_pending: int | None = None,
+    handlers: Iterable[str] | None = None,
+    guard: Guard | None = None,
+    metrics: bool = False,
+) -> None:
+    """Run the server until interrupted (SIGINT or SIGTERM)."""
+    service = NormalizationService(workers, max_pending, handlers, guard, metrics)
+    try:
+        server = make_server(service, unix_path=unix_path, host=host, port=port)
+    except BaseException:
+        service.close()
+        raise
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if unix_path is not None and os.path.exists(unix_path):
+            os.unlink(unix_path)
@@ -0,0 +1,216 @@
+"""Incremental re-normalization for editors.
+
+A ``NormalizerSession`` keeps the buffer split into top-level statements
+(see ``statements``) together with each statement's normalized output.  An
+edit only re-splits and re-normalizes the statements it touches, so the cost
+of an edit is proportional to the affected statements, not to the buffer.
+Statement offsets are kept in Fenwick trees (``_Offsets``), so finding the
+edited statements and updating their lengths costs O(log n) as well.
+"""
+
+from __future__ import annotations
+
+from itertools import accumulate
+from typing import Iterable
+
+from .normalizer import normalize
+from .statements import statement_ends
+
+
+class NormalizerSession:
+    """Normalized view of a text buffer that is updated edit by edit.
+
+    ``session.output`` always equals the concatenation of ``normalize()``
+    applied to each top-level statement of ``session.text``.
+    """
+
+    def __init__(self, text: str, handlers: Iterable[str] | None = None) -> None:
+        self._handlers = None if handlers is None else frozenset(handlers)
+        self._inputs = _split(text)
+        self._outputs = [self._normalize(stmt) for stmt in self._inputs]
+        self._in_ends = _Offsets([len(stmt) for stmt in self._inputs])
+        self._out_ends = _Offsets([len(stmt) for stmt in self._outputs])
+        self._text: str | None = None
+        self._output: str | None = None
+
+    @property
+    def text(self) -> str:
+        """The current input buffer."""
+        if self._text is None:
+            self._text = "".join(self._inputs)
+        return self._text
+
+    @property
+    def output(self) -> str:
+        """The normalized buffer."""
+        if self._output is None:
+            self._output = "".join(self._outputs)
+        return self._output
+
+    def edit(self, start: int, end: int, new_text: str) -> tuple[int, int, str]:
+        """Replace ``text[start:end]`` with *new_text* and re-normalize.
+
+        Returns ``(out_start, out_end, replacement)``: the range of the
+        previous ``output`` that changed and the text that now stands there.
+
+        Raises:
+            ValueError: If the range is outside the current text.
+        """
+        in_ends = self._in_ends
+        length = in_ends.total
+        if not 0 <= start <= end <= length:
+            raise ValueError(f"Edit range ({start}, {end}) outside text of length {length}")
+
+        count = len(self._inputs)
+        if count == 0:
+            first = stop = 0
+            new_inputs = _split(new_text)
+        else:
+            # An edit at a boundary also re-splits the statement before it:
+            # whether a script's "/" line ends it depends on what follows
+            first = min(in_ends.count_below(start), count - 1)
+            last = max(min(in_ends.count_below(end), count - 1), first)
+            new_inputs, stop = self._resplit(first, last + 1, start, end, new_text)
+
+        # Keep the reported range tight: statements whose text is unchanged
+        # at either end of the region keep their output.
+        old_inputs = self._inputs
+        while first < stop and new_inputs and new_inputs[0] == old_inputs[first]:
+            new_inputs.pop(0)
+            first += 1
+        while first < stop and new_inputs and new_inputs[-1] == old_inputs[stop - 1]:
+            new_inputs.pop()
+            stop -= 1
+
+        out_start = self._out_ends.end(first - 1)
+        out_end = self._out_ends.end(stop - 1)
+        new_outputs = [self._normalize(stmt) for stmt in new_inputs]
+
+        self._inputs[first:stop] = new_inputs
+        self._outputs[first:stop] = new_outputs
+        self._in_ends.replace(first, stop, [len(stmt) for stmt in new_inputs])
+        self._out_ends.replace(first, stop, [len(stmt) for stmt in new_outputs])
+        self._text = None
+        self._output = None
+        return out_start, out_end, "".join(new_outputs)
+
+    def _resplit(
+        self, first: int, stop: int, start: int, end: int, new_text: str,
+    ) -> tuple[list[str], int]:
+        """Apply the edit to statements ``first:stop`` and split them again.
+
+        The region grows while the edited text does not end on a statement
+        boundary (e.g. a ``;`` was deleted or a quote opened).  The region is
+        split together with the first characters after it, which decide
+        whether a ``/`` line at its end still closes a script.
+        """
+        count = len(self._inputs)
+        region_start = self._in_ends.end(first - 1)
+        while True:
+            region = "".join(self._inputs[first:stop])
+            edited = (
+                region[:start - region_start]
+                + new_text
+                + region[end - region_start:]
+            )
+            ends, _ = statement_ends(edited + self._lookahead(stop))
+            ends = [e for e in ends if e <= len(edited)]
+            if stop == count or (ends and ends[-1] == len(edited)):
+                break
+            stop = min(count, stop + max(1, stop - first))
+        return _pieces(edited, ends), stop
+
+    def _lookahead(self, k: int) -> str:
+        """Return up to two characters of the text from statement *k* on."""
+        ahead = ""
+        while len(ahead) < 2 and k < len(self._inputs):
+            ahead += self._inputs[k][:2 - len(ahead)]
+            k += 1
+        return ahead
+
+    def _normalize(self, stmt: str) -> str:
+        return normalize(stmt, self._handlers)
+
+
+class _Offsets:
+    """End offsets of a list of statements, as a Fenwick tree of their lengths.
+
+    Changing lengths in place costs O(log n) each; only an edit that adds or
+    removes statements rebuilds the tree.
+    """
+
+    __slots__ = ("_lengths", "_tree", "total")
+
+    def __init__(self, lengths: list[int]) -> None:
+        self._build(lengths)
+
+    def _build(self, lengths: list[int]) -> None:
+        ends = [0, *accumulate(lengths)]
+        self._lengths = lengths
+        self._tree = [0] + [ends[i] - ends[i - (i & -i)] for i in range(1, len(ends))]
+        self.total = ends[-1]
+
+    def end(self, k: int) -> int:
+        """Return the end offset of statement *k* (0 for ``k == -1``)."""
+        tree = self._tree
+        total = 0
+        k += 1
+        while k > 0:
+            total += tree[k]
+            k &= k - 1
+        return total
+
+    def count_upto(self, pos: int) -> int:
+        """Return the number of statements ending at or before *pos*."""
+        return self._search(pos, True)
+
+    def count_below(self, pos: int) -> int:
+        """Return the number of statements ending before *pos*."""
+        return self._search(pos, False)
+
+    def _search(self, pos: int, inclusive: bool) -> int:
+        tree = self._tree
+        n = len(tree) - 1
+        k = 0
+        step = 1 << n.bit_length() >> 1 if n else 0
+        while step:
+            nxt = k + step
+            if nxt <= n and (tree[nxt] <= pos if inclusive else tree[nxt] < pos):
+                k = nxt
+                pos -= tree[nxt]
+            step >>= 1
+        return k
+
+    def replace(self, first: int, stop: int, lengths: list[int]) -> None:
+        """Replace the lengths of statements ``first:stop`` with *lengths*."""
+        if len(lengths) != stop - first:
+            self._build(self._lengths[:first] + lengths + self._lengths[stop:])
+            return
+        tree = self._tree
+        n = len(tree) - 1
+        for k, length in enumerate(lengths, first):
+            delta = length - self._lengths[k]
+            if not delta:
+                continue
+            self._lengths[k] = length
+            self.total += delta
+            i = k + 1
+            while i <= n:
+                tree[i] += delta
+                i += i & -i
+
+
+def _split(text: str) -> list[str]:
+    ends, _ = statement_ends(text)
+    return _pieces(text, ends)
+
+
+def _pieces(text: str, ends: list[int]) -> list[str]:
+    pieces = []
+    start = 0
+    for end in ends:
+        pieces.append(text[start:end])
+        start = end
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
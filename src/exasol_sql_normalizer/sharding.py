@@ -0,0 +1,437 @@
+"""Normalize a large corpus in shards on several machines, then merge.
+
+Every machine lists the same corpus (the ``.sql`` files under a root
+directory) and computes the same partition into *count* shards with
+``plan_shards``:
+
+- ``"hash"``: by a hash of the relative path, so a file stays in its shard
+  as the corpus grows;
+- ``"size"``: size-balanced bin-packing (largest file first onto the
+  lightest shard), so shards take about the same time.
+
+``run_shard`` normalizes the files of one shard into an output directory,
+mirroring their relative paths, and writes ``MANIFEST`` last: one entry
+per file with input and output hashes and rewrite counts, plus statistics.
+``merge_shards`` combines the shard directories into one tree, sums the
+statistics and checks that every corpus file was processed exactly once:
+all shards agree on the corpus and the plan, no shard or file is missing
+or duplicated, and every output file matches its recorded hash.
+
+Shard and merge directories are found by their manifest and skipped when
+listing a corpus, so they may live under the corpus root.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+from typing import Iterable
+
+from .normalizer import normalize, normalize_to
+
+MANIFEST = "sqlnorm-manifest.json"
+MANIFEST_VERSION = 1
+STRATEGIES = ("hash", "size")
+
+_COPY_CHUNK = 1 << 20
+
+# Keys merge_shards reads from a shard manifest
+_SHARD_KEYS = ("version", "shard", "count", "strategy", "corpus", "files", "stats")
+_CORPUS_KEYS = frozenset({"files", "digest"})
+_STATS_KEYS = frozenset({"rewrites", "seconds"})
+
+
+class MergeReport:
+    """Outcome of ``merge_shards``.
+
+    Attributes:
+        shards: Shard directories merged.
+        files: Files in the merged output.
+        bytes: Size of their inputs.
+        changed: Files some handler rewrote.
+        rewrites: Rewrites per handler over all files.
+        errors: ``(path, message)`` for files a shard could not normalize.
+        problems: Violations of "every file exactly once"; empty when the
+            merge is complete.
+        seconds: Summed normalization time of the shards.
+    """
+
+    __slots__ = ("shards", "files", "bytes", "changed", "rewrites", "errors", "problems", "seconds")
+
+    def __init__(self) -> None:
+        self.shards = 0
+        self.files = 0
+        self.bytes = 0
+        self.changed = 0
+        self.rewrites: dict[str, int] = {}
+        self.errors: list[tuple[str, str]] = []
+        self.problems: list[str] = []
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems and not self.errors
+
+    def __repr__(self) -> str:
+        return (
+            f"MergeReport(shards={self.shards}, files={self.files}, "
+            f"errors={len(self.errors)}, problems={len(self.problems)})"
+        )
+
+
+def corpus_files(root: str, suffix: str = ".sql") -> list[tuple[str, int]]:
+    """Return ``(relative path, size)`` of the corpus files under *root*.
+
+    Paths use ``/`` and are sorted; *suffix* is matched case-insensitively.
+    Directories holding a ``MANIFEST`` (shard or merge outputs) are skipped.
+    """
+    suffix = suffix.lower()
+    files = []
+    for directory, subdirs, names in os.walk(root):
+        if MANIFEST in names:
+            subdirs.clear()
+            continue
+        subdirs.sort()
+        for name in names:
+            if name.lower().endswith(suffix):
+                path = os.path.join(directory, name)
+                rel = os.path.relpath(path, root).replace(os.sep, "/")
+                files.append((rel, os.path.getsize(path)))
+    files.sort()
+    return files
+
+
+def corpus_digest(files: Iterable[tuple[str, int]]) -> str:
+    """Hash of the sorted ``(path, size)`` list; equal on every machine seeing the same corpus."""
+    h = blake2b(digest_size=16)
+    for path, size in sorted(files):
+        h.update(f"{path}\0{size}\n".encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def shard_of(path: str, count: int) -> int:
+    """Shard of *path* under the ``"hash"`` strategy."""
+    digest = blake2b(path.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def plan_shards(
+    files: list[tuple[str, int]],
+    count: int,
+    strategy: str = "hash",
+) -> list[list[str]]:
+    """Partition *files* (from ``corpus_files``) into *count* lists of paths.
+
+    Raises:
+        ValueError: If *count* is not positive or *strategy* is unknown.
+    """
+    if count < 1:
+        raise ValueError(f"count must be positive, got {count}")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+    shards: list[list[str]] = [[] for _ in range(count)]
+    if strategy == "hash":
+        for path, _ in files:
+            shards[shard_of(path, count)].append(path)
+    else:
+        loads = [0] * count
+        # Ties on size are broken by path, on load by shard index
+        for path, size in sorted(files, key=lambda f: (-f[1], f[0])):
+            k = loads.index(min(loads))
+            shards[k].append(path)
+            loads[k] += size
+    for paths in shards:
+        paths.sort()
+    return shards
+
+
+def run_shard(
+    root: str,
+    output: str,
+    index: int,
+    count: int,
+    *,
+    strategy: str = "hash",
+    handlers: Iterable[str] | None = None,
+    workers: int | None = None,
+    suffix: str = ".sql",
+    encoding: str = "utf-8",
+) -> dict:
+    """Normalize shard *index* of *count* of the corpus under *root* into *output*.
+
+    Returns the manifest, which is also written to ``output/MANIFEST``.
+    Files that cannot be read, decoded or written are recorded with an
+    ``"error"``.  Inputs are read with ``newline=""``, so line endings are
+    kept as they are.
+
+    Raises:
+        ValueError: If *index*, *count*, *strategy* or *handlers* is invalid.
+    """
+    if not 0 <= index < count:
+        raise ValueError(f"index must be in [0, {count}), got {index}")
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+    handler_list = None if handlers is None else sorted(handlers)
+    normalize("", handler_list)
+
+    started = time.perf_counter()
+    files = corpus_files(root, suffix)
+    paths = plan_shards(files, count, strategy)[index]
+    os.makedirs(output, exist_ok=True)
+
+    args = (root, output, handler_list, encoding)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        entries = [_process_file(path, *args) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            n = len(paths)
+            entries = list(pool.map(
+                _process_file, paths, *([a] * n for a in args),
+                chunksize=max(1, n // (workers * 4)),
+            ))
+
+    rewrites: dict[str, int] = {}
+    for entry in entries:
+        for name, k in entry.get("rewrites", {}).items():
+            rewrites[name] = rewrites.get(name, 0) + k
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "shard": index,
+        "count": count,
+        "strategy": strategy,
+        "handlers": handler_list,
+        "suffix": suffix,
+        "corpus": {
+            "files": len(files),
+            "bytes": sum(size for _, size in files),
+            "digest": corpus_digest(files),
+        },
+        "files": entries,
+        "stats": {
+            "files": len(entries),
+            "bytes": sum(entry["size"] for entry in entries),
+            "changed": sum(1 for entry in entries if entry.get("changed")),
+            "errors": sum(1 for entry in entries if "error" in entry),
+            "rewrites": dict(sorted(rewrites.items())),
+            "seconds": time.perf_counter() - started,
+        },
+    }
+    _write_manifest(output, manifest)
+    return manifest
+
+
+def merge_shards(shard_dirs: Iterable[str], output: str, *, root: str | None = None) -> MergeReport:
+    """Merge the outputs of ``run_shard`` into *output*.
+
+    Copies every normalized file, writes a combined ``MANIFEST`` and returns
+    the totals.  ``MergeReport.problems`` lists shards or files that are
+    missing, duplicated, planned differently or altered; with *root* the
+    files are also checked against a fresh plan of the corpus there, listed
+    with the suffix the shards used.  A shard whose manifest cannot be read
+    or lacks a required key is reported as a problem and skipped.
+    """
+    report = MergeReport()
+    manifests: list[tuple[str, dict]] = []
+    for directory in shard_dirs:
+        try:
+            manifests.append((directory, _read_manifest(directory)))
+        except (OSError, ValueError) as exc:
+            report.problems.append(f"{directory}: no readable manifest ({exc})")
+    report.shards = len(manifests)
+    if not manifests:
+        report.problems.append("no shards to merge")
+        return report
+
+    first = manifests[0][1]
+    plan_keys = ("version", "count", "strategy", "handlers", "suffix", "corpus")
+    for directory, manifest in manifests[1:]:
+        for key in plan_keys:
+            if manifest.get(key) != first.get(key):
+                report.problems.append(
+                    f"{directory}: {key} differs from {manifests[0][0]}"
+                )
+    count = first["count"]
+    seen_shards: dict[int, str] = {}
+    for directory, manifest in manifests:
+        index = manifest["shard"]
+        if index in seen_shards:
+            report.problems.append(f"shard {index} appears in {seen_shards[index]} and {directory}")
+        seen_shards[index] = directory
+    missing = sorted(set(range(count)) - seen_shards.keys())
+    if missing:
+        report.problems.append(f"missing shard(s): {', '.join(map(str, missing))} of {count}")
+
+    expected: dict[str, int] | None = None
+    if root is not None:
+        files = corpus_files(root, first.get("suffix", ".sql"))
+        if corpus_digest(files) != first["corpus"]["digest"]:
+            report.problems.append(f"corpus under {root} differs from the one the shards processed")
+        plan = plan_shards(files, count, first["strategy"])
+        expected = {path: k for k, paths in enumerate(plan) for path in paths}
+
+    os.makedirs(output, exist_ok=True)
+    owner: dict[str, int] = {}
+    entries = []
+    for directory, manifest in manifests:
+        index = manifest["shard"]
+        for entry in manifest["files"]:
+            path = entry["path"]
+            if path in owner:
+                report.problems.append(f"{path}: processed by shards {owner[path]} and {index}")
+                continue
+            owner[path] = index
+            if expected is not None and expected.get(path) != index:
+                report.problems.append(f"{path}: processed by shard {index}, planned for {expected.get(path)}")
+            entries.append(entry)
+            if "error" in entry:
+                report.errors.append((path, entry["error"]))
+                continue
+            digest = _copy(os.path.join(directory, path), os.path.join(output, path))
+            if digest != entry["output"]:
+                report.problems.append(f"{path}: output in {directory} does not match its manifest")
+        stats = manifest["stats"]
+        report.seconds += stats["seconds"]
+        for name, k in stats["rewrites"].items():
+            report.rewrites[name] = report.rewrites.get(name, 0) + k
+
+    processed = [(entry["path"], entry["size"]) for entry in entries]
+    if not missing and corpus_digest(processed) != first["corpus"]["digest"]:
+        report.problems.append(
+            f"{len(processed)} files processed, corpus has {first['corpus']['files']}"
+            if len(processed) != first["corpus"]["files"]
+            else "processed files differ from the corpus the shards planned"
+        )
+    if expected is not None:
+        for path in sorted(expected.keys() - owner.keys()):
+            report.problems.append(f"{path}: not processed (planned for shard {expected[path]})")
+
+    report.files = len(entries)
+    report.bytes = sum(size for _, size in processed)
+    report.changed = sum(1 for entry in entries if entry.get("changed"))
+    report.rewrites = dict(sorted(report.rewrites.items()))
+    entries.sort(key=lambda entry: entry["path"])
+    _write_manifest(output, {
+        "version": MANIFEST_VERSION,
+        "merged": sorted(seen_shards),
+        **{key: first.get(key) for key in plan_keys[1:]},
+        "files": entries,
+        "stats": {
+            "files": report.files,
+            "bytes": report.bytes,
+            "changed": report.changed,
+            "errors": len(report.errors),
+            "rewrites": report.rewrites,
+            "seconds": report.seconds,
+        },
+        "problems": report.problems,
+    })
+    return report
+
+
+def _read_manifest(directory: str) -> dict:
+    """Load and check the shard manifest in *directory*.
+
+    Raises:
+        OSError: If the manifest cannot be read.
+        ValueError: If it is not JSON or lacks a key ``merge_shards`` needs;
+            the message names the file.
+    """
+    path = os.path.join(directory, MANIFEST)
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict):
+        raise ValueError(f"{path}: not a manifest object")
+    for key in _SHARD_KEYS:
+        if key not in manifest:
+            raise ValueError(f"{path}: missing key {key!r}")
+    for key, keys in (("corpus", _CORPUS_KEYS), ("stats", _STATS_KEYS)):
+        if not isinstance(manifest[key], dict) or not keys <= manifest[key].keys():
+            raise ValueError(f"{path}: {key!r} needs keys {', '.join(sorted(keys))}")
+    if not isinstance(manifest["files"], list):
+        raise ValueError(f"{path}: 'files' is not a list")
+    for entry in manifest["files"]:
+        if not isinstance(entry, dict):
+            raise ValueError(f"{path}: file entry is not an object")
+        keys = {"path", "size"} if "error" in entry else {"path", "size", "output"}
+        if not keys <= entry.keys():
+            raise ValueError(f"{path}: file entry needs keys {', '.join(sorted(keys))}")
+    return manifest
+
+
+def _process_file(
+    path: str,
+    root: str,
+    output: str,
+    handlers: list[str] | None,
+    encoding: str,
+) -> dict:
+    source = os.path.join(root, path)
+    entry: dict = {"path": path, "size": os.path.getsize(source)}
+    try:
+        with open(source, encoding=encoding, newline="") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as exc:
+        entry["error"] = str(exc)
+        return entry
+    entry["input"] = _digest(text)
+    target = os.path.join(output, path)
+    try:
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        with open(target, "w", encoding=encoding, newline="") as f:
+            writer = _HashingWriter(f, encoding)
+            rewrites = normalize_to(text, writer, handlers)
+    except OSError as exc:
+        entry["error"] = str(exc)
+        return entry
+    entry["output"] = writer.hash.hexdigest()
+    entry["changed"] = any(rewrites.values())
+    entry["rewrites"] = {name: k for name, k in rewrites.items() if k}
+    return entry
+
+
+class _HashingWriter:
+    """Writes through to *f*, hashing the bytes that end up in the file."""
+
+    __slots__ = ("_f", "_encoding", "hash")
+
+    def __init__(self, f, encoding: str) -> None:
+        self._f = f
+        self._encoding = encoding
+        self.hash = blake2b(digest_size=16)
+
+    def write(self, text: str) -> int:
+        self.hash.update(text.encode(self._encoding))
+        return self._f.write(text)
+
+
+def _digest(text: str) -> str:
+    return blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _copy(source: str, target: str) -> str | None:
+    """Copy *source* to *target* and return the hash of its bytes (None if unreadable)."""
+    h = blake2b(digest_size=16)
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            while True:
+                chunk = src.read(_COPY_CHUNK)
+                if not chunk:
+                    break
+                h.update(chunk)
+                dst.write(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def _write_manifest(directory: str, manifest: dict) -> None:
+    path = os.path.join(directory, MANIFEST)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
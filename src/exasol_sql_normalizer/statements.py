@@ -0,0 +1,148 @@
+"""Top-level statement splitting.
+
+Statements end after a ``;`` that is outside quotes, comments and
+parentheses.  No handler construct can span such a boundary, so each
+statement can be normalized on its own.
+
+``CREATE ... SCRIPT`` statements (Lua, Python, Java, ... UDF and scripting
+bodies) are not SQL: they run from the ``CREATE`` at the start of a line up
+to and including the next line holding only ``/``, and any ``;`` or quote
+inside them is ignored.  ``script_regions`` reports these spans so callers
+can pass them through verbatim.
+"""
+
+from __future__ import annotations
+
+import re
+
+# CREATE [OR REPLACE] [<language>] [SCALAR | SET | ADAPTER] SCRIPT, at the
+# start of a line.  The lookahead keeps e.g. "CREATE TABLE script" out.
+_SCRIPT_HEADER = (
+    r"^[ \t]*CREATE\s+(?:OR\s+REPLACE\s+)?"
+    r"(?:(?!(?:TABLE|VIEW|SCHEMA|VIRTUAL|FUNCTION|CONNECTION|USER|ROLE|CONSUMER)\b)"
+    r"[A-Z_][A-Z0-9_]*\s+){0,2}SCRIPT\b"
+)
+_SCRIPT_START = re.compile(_SCRIPT_HEADER, re.IGNORECASE | re.MULTILINE)
+# The "/" line; starting with a literal "\n" lets the search skip ahead fast
+_SCRIPT_END = re.compile(r"\n[ \t]*/[ \t]*(?=\r?\n|\Z)")
+_SPECIAL = re.compile(r"[;()'\"]|--|/\*|" + _SCRIPT_HEADER, re.IGNORECASE | re.MULTILINE)
+
+
+def split_statements(sql: str) -> list[tuple[int, int]]:
+    """Split *sql* into top-level statements.
+
+    Returns contiguous ``(start, end)`` spans covering the whole text.  Each
+    span ends just after its terminating ``;``; text after the last ``;``
+    forms a final span of its own.  Returns ``[]`` for empty input.
+    """
+    ends, _ = statement_ends(sql)
+    if not ends or ends[-1] != len(sql):
+        ends.append(len(sql))
+
+    spans = []
+    start = 0
+    for end in ends:
+        if end > start:
+            spans.append((start, end))
+        start = end
+    return spans
+
+
+def statement_ends(sql: str, pos: int = 0) -> tuple[list[int], bool]:
+    """Return the positions just after each top-level ``;`` from *pos* on.
+
+    The second item tells whether the scan finished outside any quote,
+    comment or parenthesis, i.e. whether text appended after *sql* would start a fresh
+    statement context.  A ``CREATE ... SCRIPT`` statement ends just after
+    its ``/`` line; without one the scan is not clean.
+    """
+    return _scan(sql, pos, None)
+
+
+def script_regions(sql: str) -> list[tuple[int, int]]:
+    """Return the ``(start, end)`` spans of top-level ``CREATE ... SCRIPT`` statements.
+
+    Each span runs from the start of the ``CREATE`` line to the end of the
+    terminating ``/`` line, or to the end of *sql* if there is none.
+    """
+    if _SCRIPT_START.search(sql) is None:
+        return []
+    regions: list[tuple[int, int]] = []
+    _scan(sql, 0, regions)
+    return regions
+
+
+def statement_layout(sql: str) -> tuple[list[int], list[tuple[int, int]]]:
+    """Return statement end offsets and script regions of *sql* in one scan.
+
+    The ends are those of ``statement_ends``, with ``len(sql)`` appended if
+    the text does not end on a statement boundary; the regions are those of
+    ``script_regions``.  A region never spans a statement end.
+    """
+    regions: list[tuple[int, int]] = []
+    ends, _ = _scan(sql, 0, regions)
+    if not ends or ends[-1] != len(sql):
+        ends.append(len(sql))
+    return ends, regions
+
+
+def _scan(
+    sql: str, pos: int, regions: list[tuple[int, int]] | None,
+) -> tuple[list[int], bool]:
+    ends = []
+    depth = 0
+    length = len(sql)
+    search = _SPECIAL.search
+
+    while True:
+        m = search(sql, pos)
+        if m is None:
+            return ends, depth == 0
+        pos = m.end()
+        ch = m.group()
+
+        if ch == ";":
+            if depth == 0:
+                ends.append(pos)
+        elif ch == "--":
+            close = sql.find("\n", pos)
+            if close == -1:
+                return ends, False
+            pos = close + 1
+        elif ch == "/*":
+            close = sql.find("*/", pos)
+            if close == -1:
+                return ends, False
+            pos = close + 2
+        elif len(ch) > 1:
+            # CREATE ... SCRIPT header; only a statement at the top level
+            if depth:
+                continue
+            close = _SCRIPT_END.search(sql, pos)
+            if regions is not None:
+                regions.append((m.start(), len(sql) if close is None else close.end()))
+            if close is None:
+                return ends, False
+            pos = close.end()
+            ends.append(pos)
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            # A stray ')' cannot close anything a later statement opened
+            if depth > 0:
+                depth -= 1
+        elif ch == "'":
+            while True:
+                close = sql.find("'", pos)
+                if close == -1:
+                    return ends, False
+                if close + 1 < length and sql[close + 1] == "'":
+                    pos = close + 2
+                    continue
+                pos = close + 1
+                break
+        else:
+            close = sql.find('"', pos)
+            if close == -1:
+                return ends, False
+            pos = close + 1
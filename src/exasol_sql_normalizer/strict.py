@@ -0,0 +1,213 @@
+"""Strict mode: report what normalization left unrewritten.
+
+With ``normalize(..., strict=True)`` every statement is scanned
+once more after the handlers ran, with a single pattern, for the constructs
+a downstream parser will reject: the known gaps (see "What It Does NOT
+Handle" in the README) and handler near-misses, i.e. an IMPORT, EXPORT,
+``SEPARATOR``, charset ``CONVERT`` or infix ``REGEXP_LIKE`` that is still
+there because its syntax was incomplete.  Offsets refer to the original
+input, so a caller can route the statement to a slower path before ever
+parsing it.
+
+==== ======== ============================================================
+Code Severity Finding
+==== ======== ============================================================
+S001 error    Top-level IMPORT, e.g. ``IMPORT INTO <table> FROM ...``.
+S002 error    ``CONNECT BY`` hierarchical query.
+S003 warning  ``MERGE``, which may use Exasol extensions.
+S004 info     ``CREATE ... SCRIPT`` body, passed through verbatim.
+S005 error    IMPORT near-miss: unclosed column list, no ``FROM JDBC AT``.
+S006 error    EXPORT near-miss: table export, unclosed query, no
+              ``INTO SCRIPT``.
+S007 error    ``SEPARATOR`` left over from an unrewritten ``GROUP_CONCAT``.
+S008 error    ``CONVERT(<type> <charset>, ...)`` left unrewritten.
+S009 error    Infix ``REGEXP_LIKE`` left unrewritten.
+==== ======== ============================================================
+
+Near-misses (S005-S009) are only reported for handlers in the pipeline.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Iterable
+
+from .diagnostics import DiagnosticCollector
+from .guard import charge
+from .utils import matching_paren, skip_spans, skip_whitespace
+
+# Every construct strict mode looks at, found in one scan per statement
+_CONSTRUCTS = re.compile(
+    r"\b(?:(?P<import>IMPORT)\b|(?P<export>EXPORT)\b|(?P<connect_by>CONNECT\s+BY)\b"
+    r"|(?P<merge>MERGE)\s+INTO\b|(?P<separator>SEPARATOR)\s*'"
+    r"|(?P<convert>CONVERT)\s*\(|(?P<regexp_like>REGEXP_LIKE)\b)",
+    re.IGNORECASE,
+)
+# Whitespace and comments before a statement
+_LEADING_TRIVIA = re.compile(r"(?:\s+|--[^\n]*|/\*.*?(?:\*/|\Z))*", re.DOTALL)
+_IMPORT_SOURCE = re.compile(r"FROM\s+(\w+)", re.IGNORECASE)
+_SOURCE_CLAUSE = re.compile(r"\bFROM\s+\w+\s+AT\b", re.IGNORECASE)
+_JDBC_CONNECTION = re.compile(r"JDBC\s+AT\s+\S", re.IGNORECASE)
+_INTO_SCRIPT = re.compile(r"INTO\s+(\w+)", re.IGNORECASE)
+_CHARSET_TYPE = re.compile(r"\s*\w+\s*(?:\([^()]*\))?\s+(?:UTF8|ASCII)\b", re.IGNORECASE)
+
+# Handlers whose near-misses each construct reveals
+_HANDLERS = {
+    "import": ("import_into", "import_from"),
+    "export": ("export_into",),
+    "separator": ("group_concat",),
+    "convert": ("convert",),
+    "regexp_like": ("regexp_like",),
+}
+
+
+class StrictChecker(DiagnosticCollector):
+    """Collects strict-mode findings from one ``normalize()`` call."""
+
+    __slots__ = ("_active",)
+
+    def __init__(self, handlers: Iterable[str]) -> None:
+        super().__init__()
+        names = set(handlers)
+        # Construct groups whose near-misses are reported
+        self._active = frozenset(
+            group for group, owners in _HANDLERS.items() if names.intersection(owners)
+        )
+
+    def check(self, sql: str, to_origin: Callable[[int], int]) -> None:
+        """Scan the normalized statement *sql*.
+
+        *to_origin* maps offsets in *sql* to offsets in the original input.
+        """
+        charge(len(sql))
+        m = _CONSTRUCTS.search(sql)
+        if m is None:
+            return
+        skips = skip_spans(sql)
+        statement_start = _LEADING_TRIVIA.match(sql).end()
+        while m is not None:
+            skip_end = skips.end_at(m.start())
+            if skip_end != -1:
+                m = _CONSTRUCTS.search(sql, skip_end)
+                continue
+            group = m.lastgroup
+            start, end = m.start(group), m.end(group)
+            found = _FINDINGS[group](self, sql, start, end, start == statement_start)
+            if found is not None:
+                code, severity, message = found
+                self.report(code, message, to_origin(start), to_origin(end), severity)
+            m = _CONSTRUCTS.search(sql, end)
+
+    def script(self, start: int, end: int) -> None:
+        """Note the ``CREATE ... SCRIPT`` region ``[start, end)`` of the input."""
+        self.report("S004", "script body is passed through verbatim", start, end, "info")
+
+
+# ---------------------------------------------------------------------------
+# Findings: (code, severity, message) for a match, or None
+# ---------------------------------------------------------------------------
+
+def _import(checker: StrictChecker, sql: str, start: int, end: int, leading: bool):
+    reason = _import_problem(sql, end)
+    if "import" not in checker._active and reason == "unrecognized syntax":
+        reason = "import handlers not run"
+    if leading:
+        return "S001", "error", f"top-level IMPORT is not rewritten ({reason})"
+    if "import" not in checker._active:
+        return None
+    return "S005", "error", f"IMPORT not rewritten: {reason}"
+
+
+def _import_problem(sql: str, cursor: int) -> str:
+    cursor = skip_whitespace(sql, cursor)
+    if sql[cursor:cursor + 4].upper() == "INTO":
+        cursor = skip_whitespace(sql, cursor + 4)
+        if cursor >= len(sql) or sql[cursor] != "(":
+            return "loads into a table"
+        close = matching_paren(sql, cursor)
+        # An unclosed list may borrow the ')' of the enclosing derived table
+        if close == -1 or _SOURCE_CLAUSE.search(sql, cursor, close):
+            return "column list has no closing ')'"
+        cursor = skip_whitespace(sql, close + 1)
+    source = _IMPORT_SOURCE.match(sql, cursor)
+    if source is None:
+        return "no FROM JDBC AT <connection>"
+    if source.group(1).upper() != "JDBC":
+        return f"FROM {source.group(1)} is not a JDBC source"
+    if _JDBC_CONNECTION.match(sql, source.start(1)) is None:
+        return "FROM JDBC without AT <connection>"
+    return "unrecognized syntax"
+
+
+def _export(checker: StrictChecker, sql: str, start: int, end: int, leading: bool):
+    if "export" not in checker._active:
+        return None
+    cursor = skip_whitespace(sql, end)
+    if cursor >= len(sql) or sql[cursor] != "(":
+        reason = "exports a table, not a (query)"
+    else:
+        close = matching_paren(sql, cursor)
+        target = None if close == -1 else _INTO_SCRIPT.match(sql, skip_whitespace(sql, close + 1))
+        if close == -1:
+            reason = "query has no closing ')'"
+        elif target is None:
+            reason = "no INTO SCRIPT after the query"
+        elif target.group(1).upper() != "SCRIPT":
+            reason = f"INTO {target.group(1)} is not INTO SCRIPT"
+        else:
+            reason = "unrecognized syntax"
+    return "S006", "error", f"EXPORT not rewritten: {reason}"
+
+
+def _connect_by(checker: StrictChecker, sql: str, start: int, end: int, leading: bool):
+    return "S002", "error", "CONNECT BY hierarchical query is not rewritten"
+
+
+def _merge(checker: StrictChecker, sql: str, start: int, end: int, leading: bool):
+    return "S003", "warning", "MERGE may use Exasol extensions that are not rewritten"
+
+
+def _separator(checker: StrictChecker, sql: str, start: int, end: int, leading: bool):
+    if "separator" not in checker._active:
+        return None
+    return "S007", "error", "SEPARATOR left over from a GROUP_CONCAT that was not rewritten"
+
+
+def _convert(checker: StrictChecker, sql: str, start: int, end: int, leading: bool):
+    if "convert" not in checker._active:
+        return None
+    paren = sql.index("(", end)
+    if _CHARSET_TYPE.match(sql, paren + 1) is None:
+        return None
+    if matching_paren(sql, paren) == -1:
+        return "S008", "error", "CONVERT with a character set has no closing ')'"
+    return "S008", "error", "CONVERT with a character set was not rewritten"
+
+
+def _regexp_like(checker: StrictChecker, sql: str, start: int, end: int, leading: bool):
+    if "regexp_like" not in checker._active:
+        return None
+    from .handlers.regexp_like import infix_operand
+
+    cursor = skip_whitespace(sql, end)
+    if cursor >= len(sql) or sql[cursor] != "(":
+        close, reason = cursor, "pattern is not parenthesized"
+    else:
+        close, reason = matching_paren(sql, cursor), "unrecognized syntax"
+        if close == -1:
+            close, reason = len(sql), "pattern has no closing ')'"
+    # Same operand rules as the handler, so function syntax is never flagged
+    if infix_operand(sql, start, cursor, close)[0] == -1:
+        return None
+    return "S009", "error", f"infix REGEXP_LIKE not rewritten: {reason}"
+
+
+_FINDINGS = {
+    "import": _import,
+    "export": _export,
+    "connect_by": _connect_by,
+    "merge": _merge,
+    "separator": _separator,
+    "convert": _convert,
+    "regexp_like": _regexp_like,
+}
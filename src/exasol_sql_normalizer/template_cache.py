@@ -0,0 +1,190 @@
+"""Normalization cache shared by statements that differ only in literals.
+
+Generated SQL often repeats the same IMPORT/CONVERT scaffolding with new
+dates, batch IDs or other literals.  ``TemplateCache`` keys on the text
+with its string and number literals replaced by placeholders.  Literals the
+handlers read stay in the key:
+
+- the remote ``STATEMENT '...'`` (its tables end up in the output);
+- the connection after ``AT``.
+
+Literals inside ``CREATE ... SCRIPT`` bodies and literals spanning lines are
+not replaced either.
+
+On a miss the handlers run on the input, and also once on a probe copy whose
+literals are unique markers.  The probe's output, split at the markers, is
+the rewrite plan; it is kept only if filling it with the input's literals
+reproduces the real output.  A hit fills the plan with the new literals
+instead of running the handlers.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from itertools import count
+from typing import Iterable
+
+from . import normalizer as _normalizer
+from .normalizer import normalize
+from .statements import script_regions
+from .tokens import literals
+
+# Private-use characters that mark literals in keys and probes.  Input that
+# already contains one is never cached.
+_STRING_MARK = "\ue000"
+_NUMBER_MARK = "\ue001"
+_PROBE_OPEN = "\ue002"
+_PROBE_CLOSE = "\ue003"
+_RESERVED = re.compile("[\ue000-\ue003]")
+_KEY_SLOT = re.compile(f"'{_STRING_MARK}'|{_NUMBER_MARK}")
+_PROBE_SLOT = re.compile("'\ue002(\\d+)\ue003'|\ue002(\\d+)\ue003")
+
+# Text in front of a literal that the handlers read
+_KEEP_BEFORE = re.compile(r"(?:\bSTATEMENT\s*|\bAT\s+\S*)\Z", re.IGNORECASE)
+_KEEP_WINDOW = 64
+
+
+class TemplateCache:
+    """LRU cache of rewrite plans keyed on literal-stripped SQL.
+
+    ``cache.normalize(sql)`` returns exactly what ``normalize(sql, handlers)``
+    returns, including the input object itself when nothing was rewritten.
+
+    Attributes:
+        maxsize: Number of plans kept.
+        hits: Lookups answered from a plan.
+        misses: Lookups that ran the handlers.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "_handlers", "_plans")
+
+    def __init__(self, maxsize: int = 1024, handlers: Iterable[str] | None = None) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._handlers = None if handlers is None else frozenset(handlers)
+        # key -> (unchanged, parts) or None when the template can't be replayed
+        self._plans: OrderedDict[str, tuple[bool, tuple[str | int, ...]] | None] = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from a plan (0.0 before any lookup)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def clear(self) -> None:
+        """Drop all plans and reset the counters."""
+        self._plans.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def normalize(self, sql: str) -> str:
+        """Normalize *sql*, replaying a cached plan when one matches."""
+        if _RESERVED.search(sql):
+            self.misses += 1
+            _record_lookup(False)
+            return normalize(sql, self._handlers)
+
+        key, values = parameterize(sql)
+        plans = self._plans
+        plan = plans.get(key, False)
+        if plan is not False:
+            plans.move_to_end(key)
+            if plan is not None:
+                self.hits += 1
+                _record_lookup(True)
+                return _replay(sql, plan, values)
+
+        self.misses += 1
+        _record_lookup(False)
+        output = normalize(sql, self._handlers)
+        if plan is False:
+            plans[key] = _plan(sql, key, values, output, self._handlers)
+            if len(plans) > self.maxsize:
+                plans.popitem(last=False)
+        return output
+
+
+def parameterize(sql: str) -> tuple[str, list[str]]:
+    """Split *sql* into a template key and the literals taken out of it.
+
+    Returns ``(key, values)``: *key* is *sql* with each replaceable string
+    literal replaced by ``'\\ue000'`` and each number by ``\\ue001``;
+    *values* are the replaced literals in order.
+    """
+    parts = []
+    values = []
+    pos = 0
+    regions = script_regions(sql)
+    gaps = []
+    for start, end in regions:
+        gaps.append((pos, start))
+        pos = end
+    gaps.append((pos, len(sql)))
+
+    pos = 0
+    for gap_start, gap_end in gaps:
+        for kind, start, end in literals(sql, gap_start, gap_end):
+            value = sql[start:end]
+            if "\n" in value or _KEEP_BEFORE.search(sql, max(0, start - _KEEP_WINDOW), start):
+                continue
+            parts.append(sql[pos:start])
+            parts.append(f"'{_STRING_MARK}'" if kind == "string" else _NUMBER_MARK)
+            values.append(value)
+            pos = end
+    parts.append(sql[pos:])
+    return "".join(parts), values
+
+
+def _plan(
+    sql: str,
+    key: str,
+    values: list[str],
+    output: str,
+    handlers: frozenset[str] | None,
+) -> tuple[bool, tuple[str | int, ...]] | None:
+    """Build the rewrite plan for *key*, or ``None`` if it can't be replayed."""
+    unchanged = output is sql
+    if not values:
+        return unchanged, (output,)
+
+    slots = count()
+
+    def marker(m: re.Match[str]) -> str:
+        # String markers stay quoted so the probe lexes like the input
+        text = f"{_PROBE_OPEN}{next(slots)}{_PROBE_CLOSE}"
+        return text if m.group() == _NUMBER_MARK else f"'{text}'"
+
+    probe = _KEY_SLOT.sub(marker, key)
+    probe_output = normalize(probe, handlers)
+    parts: list[str | int] = []
+    pos = 0
+    for m in _PROBE_SLOT.finditer(probe_output):
+        parts.append(probe_output[pos:m.start()])
+        parts.append(int(m.group(1) or m.group(2)))
+        pos = m.end()
+    parts.append(probe_output[pos:])
+
+    plan = ((probe_output is probe), tuple(parts))
+    if plan[0] != unchanged or _replay(sql, plan, values) != output:
+        return None
+    return plan
+
+
+def _replay(sql: str, plan: tuple[bool, tuple[str | int, ...]], values: list[str]) -> str:
+    unchanged, parts = plan
+    if unchanged:
+        return sql
+    return "".join(values[p] if type(p) is int else p for p in parts)
+
+
+def _record_lookup(hit: bool) -> None:
+    recorder = _normalizer._metrics
+    if recorder is not None:
+        recorder.record_cache_lookup(hit)
@@ -0,0 +1,76 @@
+"""A lexical tokenizer for SQL text.
+
+Tokens are ``(kind, start, end)`` tuples covering the input without gaps.
+The kinds are:
+
+- ``"string"``: single-quoted literal (``''`` escapes included);
+- ``"number"``: numeric literal, e.g. ``42``, ``3.14``, ``1e-5``;
+- ``"quoted"``: double-quoted identifier;
+- ``"comment"``: ``--`` line comment or ``/* */`` block comment;
+- ``"word"``: keyword or bare identifier;
+- ``"space"``: whitespace;
+- ``"punct"``: any other single character.
+
+Unterminated strings, identifiers and comments run to the end of the input,
+as in ``utils.skip_spans``.  The tokenizer knows nothing about script bodies;
+callers tokenize the SQL between ``statements.script_regions``.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterator
+
+# Kinds that carry no meaning for the SQL around them
+TRIVIA = frozenset({"space", "comment"})
+
+_TOKEN = re.compile(
+    r"(?P<string>'[^']*(?:''[^']*)*'?)"
+    r'|(?P<quoted>"[^"]*"?)'
+    r"|(?P<comment>--[^\n]*|/\*[\s\S]*?(?:\*/|\Z))"
+    r"|(?P<word>[^\W\d]\w*(?:[$#]\w*)*)"
+    r"|(?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<space>\s+)"
+    r"|(?P<punct>.)",
+    re.DOTALL,
+)
+
+
+def tokenize(sql: str, start: int = 0, end: int | None = None) -> Iterator[tuple[str, int, int]]:
+    """Yield the ``(kind, start, end)`` tokens of ``sql[start:end]``.
+
+    Offsets refer to *sql*, so a slice between two script regions can be
+    tokenized without copying it.
+    """
+    if end is None:
+        end = len(sql)
+    for m in _TOKEN.finditer(sql, start, end):
+        yield m.lastgroup, m.start(), m.end()
+
+
+
+# Everything but literals is consumed in long runs by the first alternative,
+# which keeps the per-character work inside the regex engine.
+_LITERAL = re.compile(
+    r"[^'\"\-/\d.]+"
+    r"|(?P<string>'[^']*(?:''[^']*)*')"
+    r"|'[\s\S]*"
+    r'|"[^"]*"?'
+    r"|--[^\n]*|/\*[\s\S]*?(?:\*/|\Z)"
+    r"|(?P<number>(?<![\w$#.])(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?(?![\w$#]))"
+    r"|[\s\S]",
+)
+
+
+def literals(sql: str, start: int = 0, end: int | None = None) -> Iterator[tuple[str, int, int]]:
+    """Yield the ``(kind, start, end)`` string and number literals of ``sql[start:end]``.
+
+    Cheaper than filtering ``tokenize``.  Unterminated strings and digits
+    attached to an identifier (``1abc``) are not reported.
+    """
+    if end is None:
+        end = len(sql)
+    for m in _LITERAL.finditer(sql, start, end):
+        kind = m.lastgroup
+        if kind is not None:
+            yield kind, m.start(), m.end()
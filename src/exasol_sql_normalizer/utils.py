@@ -1,6 +1,11 @@
 """Shared utilities for SQL string scanning."""
 
 import re
+from bisect import bisect_right
+from contextvars import ContextVar
+from functools import cache
+
+from .guard import charge
 
 
 # ---------------------------------------------------------------------------
@@ -17,32 +22,40 @@ _TABLE_REF = _IDENT_SEG + r'(?:\.' + _IDENT_SEG + r')*'
 _JOIN_KW = r'(?:INNER|LEFT|RIGHT|CROSS|FULL)(?:\s+OUTER)?\s+JOIN'
 _TABLE_KW = r'(?:FROM|JOIN|' + _JOIN_KW + r')'
 
-_STMT_TABLE_PATTERN = re.compile(
-    _TABLE_KW + r'\s+(' + _TABLE_REF + r')',
-    re.IGNORECASE,
-)
+# The patterns below are compiled on first use rather than at import time,
+# which keeps start-up cheap for short-lived processes.
+
+@cache
+def _stmt_table_pattern() -> re.Pattern[str]:
+    return re.compile(_TABLE_KW + r'\s+(' + _TABLE_REF + r')', re.IGNORECASE)
+
+
+@cache
+def _comma_table_pattern() -> re.Pattern[str]:
+    return re.compile(r'\s*,\s*(' + _TABLE_REF + r')', re.IGNORECASE)
 
-_COMMA_TABLE_PATTERN = re.compile(
-    r'\s*,\s*(' + _TABLE_REF + r')',
-    re.IGNORECASE,
-)
 
 # For splitting a dotted ref into segments (bracket-aware)
-_SEG_PATTERN = re.compile(r'\[([^\]]+)\]|([A-Za-z_#@][A-Za-z0-9_#@$]*)')
+@cache
+def _seg_pattern() -> re.Pattern[str]:
+    return re.compile(r'\[([^\]]+)\]|([A-Za-z_#@][A-Za-z0-9_#@$]*)')
 
-_BARE_IDENT = re.compile(r'^[A-Za-z_#@][A-Za-z0-9_#@$]*$')
+
+@cache
+def _bare_ident_pattern() -> re.Pattern[str]:
+    return re.compile(r'^[A-Za-z_#@][A-Za-z0-9_#@$]*$')
 
 
 def _quote_if_needed(ident: str) -> str:
     """Wrap in [brackets] if the identifier needs quoting."""
-    if _BARE_IDENT.match(ident):
+    if _bare_ident_pattern().match(ident):
         return ident
     return f'[{ident}]'
 
 
 def _split_ref(ref: str) -> list[str]:
     """Split a dotted table ref into unquoted segment names."""
-    return [m.group(1) or m.group(2) for m in _SEG_PATTERN.finditer(ref)]
+    return [m.group(1) or m.group(2) for m in _seg_pattern().finditer(ref)]
 
 
 def _cap_table_ref(ref: str, max_parts: int = 2) -> str:
@@ -67,6 +80,7 @@ def extract_tables_from_statement(raw_stmt: str) -> list[str]:
     found after FROM / JOIN keywords.  Returns an empty list when no tables
     are found, signalling that the caller should use the fallback output.
     """
+    charge(len(raw_stmt))
     # Unescape Exasol '' -> '
     stmt_sql = raw_stmt.replace("''", "'")
 
@@ -75,8 +89,9 @@ def extract_tables_from_statement(raw_stmt: str) -> list[str]:
 
     seen: set[str] = set()
     tables: list[str] = []
+    comma_pattern = _comma_table_pattern()
 
-    for m in _STMT_TABLE_PATTERN.finditer(stmt_clean):
+    for m in _stmt_table_pattern().finditer(stmt_clean):
         capped = _cap_table_ref(m.group(1))
         key = capped.upper()
         if key not in seen:
@@ -86,7 +101,7 @@ def extract_tables_from_statement(raw_stmt: str) -> list[str]:
         # Forward-scan for comma-separated tables (FROM t1, t2)
         pos = m.end()
         while True:
-            cm = _COMMA_TABLE_PATTERN.match(stmt_clean, pos)
+            cm = comma_pattern.match(stmt_clean, pos)
             if not cm:
                 break
             capped = _cap_table_ref(cm.group(1))
@@ -99,9 +114,73 @@ def extract_tables_from_statement(raw_stmt: str) -> list[str]:
     return tables
 
 
+# ---------------------------------------------------------------------------
+# Edits
+# ---------------------------------------------------------------------------
+
+def apply_edits(sql: str, edits: list[tuple[int, int, str]]) -> str:
+    """Apply ``(start, end, replacement)`` edits to *sql*.
+
+    Edits must be sorted and non-overlapping.  When there are no edits the
+    input object itself is returned, so callers can test ``result is sql``.
+    """
+    if not edits:
+        return sql
+
+    parts: list[str] = []
+    pos = 0
+    for start, end, text in edits:
+        parts.append(sql[pos:start])
+        parts.append(text)
+        pos = end
+    parts.append(sql[pos:])
+    return "".join(parts)
+
+
+def original_offset(pos: int, edits: list[tuple[int, int, str]]) -> int:
+    """Map offset *pos* in ``apply_edits(sql, edits)`` back to an offset in *sql*.
+
+    Positions inside a replacement map to the start of the span it replaced.
+    """
+    shift = 0
+    for start, end, text in edits:
+        new_start = start + shift
+        if pos < new_start:
+            break
+        if pos < new_start + len(text):
+            return start
+        shift += len(text) - (end - start)
+    return pos - shift
+
+
 # ---------------------------------------------------------------------------
 # Quoted-string helpers
 # ---------------------------------------------------------------------------
+#
+# The scanners below never step one character at a time in Python: they
+# jump to the next interesting character with str.find or a compiled
+# pattern, so their cost grows with the number of quotes and parens, not
+# with the length of the text between them.
+
+# Body of a single-quoted string: stops at its closing quote or the end
+@cache
+def _quoted_body() -> re.Pattern[str]:
+    return re.compile(r"[^']*(?:''[^']*)*")
+
+
+@cache
+def _whitespace() -> re.Pattern[str]:
+    return re.compile(r"[ \t\n\r]*")
+
+
+def closing_quote(sql: str, pos: int) -> int:
+    """Return the index of the quote closing the single-quoted string at *pos*.
+
+    ``''`` inside the string is an escaped quote.  Returns ``len(sql)`` if
+    the string is unterminated.
+    """
+    return _quoted_body().match(sql, pos + 1).end()
+
 
 def extract_quoted_string(sql: str, pos: int) -> tuple[int, str]:
     """Extract content of a single-quoted string starting at *pos*.
@@ -111,21 +190,10 @@ def extract_quoted_string(sql: str, pos: int) -> tuple[int, str]:
     """
     if pos >= len(sql) or sql[pos] != "'":
         return pos, ""
-
-    i = pos + 1
-    chars: list[str] = []
-    while i < len(sql):
-        if sql[i] == "'":
-            if i + 1 < len(sql) and sql[i + 1] == "'":
-                chars.append("'")
-                i += 2
-            else:
-                return i + 1, "".join(chars)
-        else:
-            chars.append(sql[i])
-            i += 1
-
-    return len(sql), "".join(chars)
+    close = closing_quote(sql, pos)
+    end = min(close + 1, len(sql))
+    charge(end - pos)
+    return end, sql[pos + 1:close].replace("''", "'")
 
 
 def skip_quoted_string(sql: str, pos: int) -> int:
@@ -133,38 +201,121 @@ def skip_quoted_string(sql: str, pos: int) -> int:
 
     Returns the position after the closing quote.
     """
-    end, _ = extract_quoted_string(sql, pos)
+    if pos >= len(sql) or sql[pos] != "'":
+        return pos
+    end = min(closing_quote(sql, pos) + 1, len(sql))
+    charge(end - pos)
     return end
 
 
 def skip_whitespace(sql: str, pos: int) -> int:
     """Advance past whitespace characters."""
-    while pos < len(sql) and sql[pos] in (" ", "\t", "\n", "\r"):
-        pos += 1
-    return pos
+    return _whitespace().match(sql, pos).end()
+
+
+# ---------------------------------------------------------------------------
+# Skip spans: string literals, quoted identifiers and comments
+# ---------------------------------------------------------------------------
+
+# Unterminated literals and comments run to the end of the input
+@cache
+def _skip_pattern() -> re.Pattern[str]:
+    return re.compile(
+        r"'[^']*(?:''[^']*)*'?"
+        r'|"[^"]*"?'
+        r"|--[^\n]*"
+        r"|/\*[\s\S]*?(?:\*/|\Z)"
+    )
+
+
+class SkipSpans:
+    """Sorted, non-overlapping spans of *sql* that keyword searches must skip.
+
+    Covers single-quoted strings, double-quoted identifiers, ``--`` line
+    comments and ``/* */`` block comments.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts: list[int], ends: list[int]) -> None:
+        self.starts = starts
+        self.ends = ends
+
+    def end_at(self, pos: int) -> int:
+        """Return the end of the span containing *pos*, or -1 if there is none."""
+        k = bisect_right(self.starts, pos) - 1
+        if k >= 0 and pos < self.ends[k]:
+            return self.ends[k]
+        return -1
+
+
+# [text, spans] of the last ``skip_spans`` call while sharing is active
+_SHARED_SPANS: ContextVar[list | None] = ContextVar(
+    "exasol_sql_normalizer_skip_spans", default=None,
+)
+
+
+def share_skip_spans():
+    """Reuse ``skip_spans`` results in the current context; returns a reset token.
+
+    While active, the spans of the most recent text are kept, so the handlers
+    of a pipeline share them until one of them rewrites the text.  Pass the
+    token to ``stop_sharing_skip_spans`` to drop them again.
+    """
+    return _SHARED_SPANS.set([None, None])
+
+
+def stop_sharing_skip_spans(token) -> None:
+    _SHARED_SPANS.reset(token)
+
+
+def skip_spans(sql: str) -> SkipSpans:
+    """Return the ``SkipSpans`` of *sql*, found in one pass.
+
+    Inside ``share_skip_spans`` a repeated call for the same string object
+    returns the previous result.
+    """
+    shared = _SHARED_SPANS.get()
+    if shared is not None:
+        if shared[0] is sql:
+            return shared[1]
+        shared[1] = _find_skip_spans(sql)
+        shared[0] = sql
+        return shared[1]
+    return _find_skip_spans(sql)
+
+
+def _find_skip_spans(sql: str) -> SkipSpans:
+    charge(len(sql))
+    starts = []
+    ends = []
+    for m in _skip_pattern().finditer(sql):
+        starts.append(m.start())
+        ends.append(m.end())
+    return SkipSpans(starts, ends)
 
 
 def is_inside_string(sql: str, pos: int) -> bool:
     """Check if position *pos* is inside a single-quoted string."""
-    in_string = False
-    i = 0
-    while i < pos:
-        if sql[i] == "'":
-            if in_string:
-                if i + 1 < len(sql) and sql[i + 1] == "'":
-                    i += 2
-                    continue
-                in_string = False
-            else:
-                in_string = True
-        i += 1
-    return in_string
+    charge(pos)
+    i = sql.find("'", 0, pos)
+    while i != -1:
+        close = closing_quote(sql, i)
+        if close >= pos:
+            return True
+        i = sql.find("'", close + 1, pos)
+    return False
 
 
 # ---------------------------------------------------------------------------
 # Parenthesis matching
 # ---------------------------------------------------------------------------
 
+@cache
+def _paren_scan() -> re.Pattern[str]:
+    return re.compile(r"[()'\"]")
+
+
 def find_matching_paren(sql: str, open_pos: int) -> int:
     """Find the position of the closing parenthesis matching the one at open_pos.
 
@@ -185,37 +336,96 @@ def find_matching_paren(sql: str, open_pos: int) -> int:
     """
     if sql[open_pos] != "(":
         raise ValueError(f"Character at position {open_pos} is {sql[open_pos]!r}, not '('")
+    close = matching_paren(sql, open_pos)
+    if close == -1:
+        raise ValueError(f"No matching closing paren for '(' at position {open_pos}")
+    return close
+
 
+def matching_paren(sql: str, open_pos: int) -> int:
+    """Return the index of the ')' matching the '(' at *open_pos*, or -1.
+
+    Like ``find_matching_paren`` but without the checks, for scanners that
+    treat an unbalanced paren as "no match".
+    """
+    search = _paren_scan().search
     depth = 1
     i = open_pos + 1
-    length = len(sql)
-
-    while i < length:
+    while True:
+        m = search(sql, i)
+        if m is None:
+            break
+        i = m.start()
         ch = sql[i]
-
         if ch == "'":
-            # Skip single-quoted string (handles '' escape)
-            i += 1
-            while i < length:
-                if sql[i] == "'":
-                    if i + 1 < length and sql[i + 1] == "'":
-                        i += 2  # escaped quote
-                    else:
-                        break  # end of string
-                else:
-                    i += 1
+            i = closing_quote(sql, i) + 1
         elif ch == '"':
-            # Skip double-quoted identifier
+            i = sql.find('"', i + 1)
+            if i == -1:
+                break
             i += 1
-            while i < length and sql[i] != '"':
-                i += 1
         elif ch == "(":
             depth += 1
-        elif ch == ")":
+            i += 1
+        else:
             depth -= 1
             if depth == 0:
+                charge(i - open_pos)
                 return i
+            i += 1
+    charge(len(sql) - open_pos)
+    return -1
+
 
-        i += 1
+@cache
+def _comma_scan() -> re.Pattern[str]:
+    return re.compile(r"[(),'\"]")
 
-    raise ValueError(f"No matching closing paren for '(' at position {open_pos}")
+
+def top_level_comma(sql: str, start: int, end: int) -> int:
+    """Return the index of the first comma in ``sql[start:end]`` outside
+    parentheses, strings and quoted identifiers, or -1 if there is none.
+    """
+    search = _comma_scan().search
+    depth = 0
+    i = start
+    while i < end:
+        m = search(sql, i, end)
+        if m is None:
+            break
+        i = m.start()
+        ch = sql[i]
+        if ch == "'":
+            i = closing_quote(sql, i) + 1
+        elif ch == '"':
+            i = sql.find('"', i + 1, end)
+            if i == -1:
+                break
+            i += 1
+        elif ch == "(":
+            depth += 1
+            i += 1
+        elif ch == ")":
+            depth -= 1
+            i += 1
+        elif depth == 0:
+            charge(i - start)
+            return i
+        else:
+            i += 1
+    charge(end - start)
+    return -1
+
+
+def split_top_level(sql: str, start: int = 0, end: int | None = None) -> list[str]:
+    """Split ``sql[start:end]`` at the commas found by ``top_level_comma``."""
+    if end is None:
+        end = len(sql)
+    parts = []
+    comma = top_level_comma(sql, start, end)
+    while comma != -1:
+        parts.append(sql[start:comma])
+        start = comma + 1
+        comma = top_level_comma(sql, start, end)
+    parts.append(sql[start:end])
+    return parts
@@ -0,0 +1,309 @@
+"""Round-trip validation: does every normalized statement parse with sqlglot?
+
+``validate`` splits SQL files into top-level statements (see
+``statements``), normalizes each one and parses the output with
+``sqlglot.parse_one(..., dialect=...)`` on a process pool.  Results are
+cached by a hash of the normalized text, so a statement whose output has
+not changed since the last run is not parsed again; the cache is dropped
+when the dialect or the sqlglot version changes.
+
+Failures are reported with their offsets in the original file, and counted
+per handler that rewrote the failing statement, which points at the handler
+whose output the parser rejects.  ``CREATE ... SCRIPT`` statements are not
+SQL and are skipped.
+
+sqlglot is an optional dependency (``pip install
+exasol-sql-normalizer[validate]``).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+from typing import Iterable, Iterator
+
+from ._optional import require
+from .normalizer import normalize
+from .statements import script_regions, split_statements
+
+CACHE_VERSION = 1
+# Breakdown key for failing statements that no handler rewrote
+UNCHANGED = "(unchanged)"
+
+# Whitespace and comments before a statement
+_LEADING_TRIVIA = re.compile(r"(?:\s+|--[^\n]*|/\*.*?(?:\*/|\Z))*", re.DOTALL)
+
+# Cache keys known to the workers of the current pool
+_KNOWN: frozenset[str] = frozenset()
+
+
+class ValidationFailure:
+    """A statement whose normalized form does not parse.
+
+    Attributes:
+        path: File the statement came from.
+        start, end: Offsets of the statement in the original file.
+        line, column: 1-based position of *start*.
+        error: The parser's message.
+        handlers: Handlers that rewrote the statement.
+    """
+
+    __slots__ = ("path", "start", "end", "line", "column", "error", "handlers")
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        line: int,
+        column: int,
+        error: str,
+        handlers: tuple[str, ...],
+    ) -> None:
+        self.path = path
+        self.start = start
+        self.end = end
+        self.line = line
+        self.column = column
+        self.error = error
+        self.handlers = handlers
+
+    def __repr__(self) -> str:
+        return f"ValidationFailure({self.path}:{self.line}:{self.column}, {self.error!r})"
+
+
+class ValidationReport:
+    """Outcome of a ``validate`` run.
+
+    Attributes:
+        statements: Statements checked.
+        parsed: Distinct normalized statements parsed in this run; the rest
+            were answered from the cache or were duplicates.
+        failures: Failing statements, in input order.
+        by_handler: ``handler -> (failed, rewritten)``: statements the handler
+            rewrote, and how many of those fail to parse.  Statements no
+            handler touched are counted under ``UNCHANGED``.
+        seconds: Wall-clock time of the run.
+    """
+
+    __slots__ = ("statements", "parsed", "failures", "by_handler", "seconds")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.parsed = 0
+        self.failures: list[ValidationFailure] = []
+        self.by_handler: dict[str, tuple[int, int]] = {}
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def __repr__(self) -> str:
+        return (
+            f"ValidationReport(statements={self.statements}, parsed={self.parsed}, "
+            f"failures={len(self.failures)})"
+        )
+
+
+def validate(
+    paths: Iterable[str],
+    *,
+    dialect: str = "tsql",
+    handlers: Iterable[str] | None = None,
+    workers: int | None = None,
+    cache_path: str | None = None,
+    chunk_size: int = 64,
+    encoding: str = "utf-8",
+) -> ValidationReport:
+    """Normalize and parse every statement in *paths*.
+
+    Args:
+        paths: SQL files to check.
+        dialect: sqlglot dialect to parse the normalized SQL with.
+        handlers: Optional subset of handler names to run.
+        workers: Worker processes (default: CPU count).  ``1`` parses in the
+            calling process.
+        cache_path: JSON file with the results of earlier runs; read if it
+            exists and written back.  ``None`` disables the cache.
+        chunk_size: Statements sent to a worker at a time.
+        encoding: Encoding of the files.
+
+    Raises:
+        ImportError: If sqlglot is not installed.
+        ValueError: If *handlers* names an unregistered handler, or a size
+            argument is not positive.
+    """
+    sqlglot = require("sqlglot", "validate")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+    handler_set = None if handlers is None else frozenset(handlers)
+    normalize("", handler_set)
+    workers = workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    namespace = {"version": CACHE_VERSION, "dialect": dialect, "sqlglot": sqlglot.__version__}
+    cache = _load_cache(cache_path, namespace)
+
+    # Each distinct statement text is checked once: text -> its locations
+    located: dict[str, list[tuple[str, int, int, int, int]]] = {}
+    order: dict[str, int] = {}
+    for path in paths:
+        order.setdefault(path, len(order))
+        with open(path, encoding=encoding) as f:
+            text = f.read()
+        for start, end, line, column in statements(text):
+            located.setdefault(text[start:end], []).append((path, start, end, line, column))
+
+    texts = list(located)
+    checked = _check(texts, handler_set, dialect, frozenset(cache), workers, chunk_size)
+
+    report = ValidationReport()
+    counts: dict[str, list[int]] = {}
+    for sql, (key, rewritten, error) in zip(texts, checked):
+        if error is None:
+            error = cache[key]
+        else:
+            report.parsed += 1
+            cache[key] = error or None
+        for path, start, end, line, column in located[sql]:
+            report.statements += 1
+            for name in rewritten or (UNCHANGED,):
+                tally = counts.setdefault(name, [0, 0])
+                tally[1] += 1
+                if error:
+                    tally[0] += 1
+            if error:
+                report.failures.append(
+                    ValidationFailure(path, start, end, line, column, error, rewritten)
+                )
+
+    report.failures.sort(key=lambda f: (order[f.path], f.start))
+    report.by_handler = {name: (failed, total) for name, (failed, total) in counts.items()}
+    if cache_path is not None:
+        _save_cache(cache_path, namespace, cache)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def statements(text: str) -> Iterator[tuple[int, int, int, int]]:
+    """Yield ``(start, end, line, column)`` of each SQL statement in *text*.
+
+    *start* skips leading whitespace and comments; empty statements and
+    ``CREATE ... SCRIPT`` statements are left out.
+    """
+    regions = script_regions(text)
+    region_starts = [start for start, _ in regions]
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+    for span_start, end in split_statements(text):
+        start = _LEADING_TRIVIA.match(text, span_start, end).end()
+        if start == end or text[start:end] == ";":
+            continue
+        k = bisect_right(region_starts, start) - 1
+        if k >= 0 and regions[k][1] > start:
+            continue
+        line = bisect_right(line_starts, start)
+        yield start, end, line, start - line_starts[line - 1] + 1
+
+
+def _check(
+    texts: list[str],
+    handlers: frozenset[str] | None,
+    dialect: str,
+    known: frozenset[str],
+    workers: int,
+    chunk_size: int,
+) -> list[tuple[str, tuple[str, ...], str | None]]:
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if workers == 1 or len(chunks) < 2:
+        return [r for chunk in chunks for r in _check_chunk(chunk, handlers, dialect, known)]
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(known,),
+    ) as pool:
+        for chunk_results in pool.map(
+            _check_chunk, chunks, [handlers] * len(chunks), [dialect] * len(chunks),
+        ):
+            results.extend(chunk_results)
+    return results
+
+
+def _init_worker(known: frozenset[str]) -> None:
+    global _KNOWN
+    _KNOWN = known
+    # Pay sqlglot's import before the first chunk arrives
+    import sqlglot  # noqa: F401
+
+
+def _check_chunk(
+    texts: list[str],
+    handlers: frozenset[str] | None,
+    dialect: str,
+    known: frozenset[str] | None = None,
+) -> list[tuple[str, tuple[str, ...], str | None]]:
+    """Return ``(cache key, rewriting handlers, error)`` for each of *texts*.
+
+    *error* is ``""`` when the statement parses and ``None`` when its key
+    is in *known* and it was not parsed.
+    """
+    import sqlglot
+    from sqlglot.errors import SqlglotError
+
+    if known is None:
+        known = _KNOWN
+    results = []
+    for sql in texts:
+        result = normalize(sql, handlers, report=True)
+        rewritten = tuple(name for name, count in result.rewrites.items() if count)
+        key = blake2b(result.sql.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        error = None
+        if key not in known:
+            try:
+                sqlglot.parse_one(result.sql, dialect=dialect)
+                error = ""
+            except (SqlglotError, RecursionError) as exc:
+                error = _message(exc)
+        results.append((key, rewritten, error))
+    return results
+
+
+def _message(exc: Exception) -> str:
+    errors = getattr(exc, "errors", None)
+    if errors:
+        first = errors[0]
+        return (
+            f"{first.get('description')} "
+            f"(line {first.get('line')}, column {first.get('col')} of the normalized statement)"
+        )
+    return str(exc).splitlines()[0] if str(exc) else type(exc).__name__
+
+
+def _load_cache(path: str | None, namespace: dict) -> dict[str, str | None]:
+    if path is None or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or any(data.get(k) != v for k, v in namespace.items()):
+        return {}
+    results = data.get("results")
+    return results if isinstance(results, dict) else {}
+
+
+def _save_cache(path: str, namespace: dict, results: dict[str, str | None]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({**namespace, "results": results}, f)
+    os.replace(tmp, path)
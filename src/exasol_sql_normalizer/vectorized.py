@@ -0,0 +1,117 @@
+"""Column-at-a-time normalization for pandas and pyarrow.
+
+``normalize_series`` and ``normalize_array`` factorize the column, normalize
+each distinct value once and scatter the results back, so a column of a
+million view definitions with a few thousand distinct texts costs a few
+thousand ``normalize()`` calls.  Above ``PARALLEL_THRESHOLD`` distinct
+values the work runs on a process pool (``batch.normalize_many``).
+
+The result has the input's type, index and name; nulls stay null.  pandas
+and pyarrow are optional dependencies (``pip install
+exasol-sql-normalizer[pandas]`` / ``[arrow]``) imported on first use.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from ._optional import require
+from .normalizer import normalize
+
+# Distinct values from which normalization runs on a process pool
+PARALLEL_THRESHOLD = 10_000
+
+
+def normalize_series(
+    series: Any,
+    handlers: Iterable[str] | None = None,
+    *,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+    workers: int | None = None,
+) -> Any:
+    """Return a ``pandas.Series`` with every string of *series* normalized.
+
+    Raises:
+        ImportError: If pandas is not installed.
+        TypeError: If a non-null value is not a string.
+    """
+    pd = require("pandas", "pandas")
+    import numpy as np
+
+    codes, uniques = pd.factorize(series)
+    normalized = np.empty(len(uniques), dtype=object)
+    normalized[:] = _normalize_uniques(uniques.tolist(), handlers, parallel_threshold, workers)
+
+    # Null rows (code -1) keep their original null value
+    values = series.to_numpy(dtype=object, copy=True)
+    mask = codes >= 0
+    values[mask] = normalized[codes[mask]]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Normalization may merge categories, so they are rebuilt
+        return pd.Series(values, index=series.index, name=series.name, dtype="category")
+    return pd.Series(values, index=series.index, name=series.name, dtype=series.dtype)
+
+
+def normalize_array(
+    array: Any,
+    handlers: Iterable[str] | None = None,
+    *,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+    workers: int | None = None,
+) -> Any:
+    """Return a pyarrow array with every string of *array* normalized.
+
+    Accepts ``string``, ``large_string`` and dictionary-encoded arrays, plain
+    or chunked.  Dictionary arrays keep their indices and only have their
+    dictionary normalized.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        TypeError: If *array* does not hold strings.
+    """
+    pa = require("pyarrow", "arrow")
+    import pyarrow.compute as pc
+
+    if isinstance(array, pa.ChunkedArray):
+        chunks = [
+            normalize_array(
+                chunk, handlers, parallel_threshold=parallel_threshold, workers=workers,
+            )
+            for chunk in array.chunks
+        ]
+        return pa.chunked_array(chunks, type=array.type)
+
+    if pa.types.is_dictionary(array.type):
+        dictionary = normalize_array(
+            array.dictionary, handlers, parallel_threshold=parallel_threshold, workers=workers,
+        )
+        return pa.DictionaryArray.from_arrays(array.indices, dictionary)
+
+    if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        raise TypeError(f"Expected a string array, got {array.type}")
+    encoded = pc.dictionary_encode(array)
+    normalized = pa.array(
+        _normalize_uniques(
+            encoded.dictionary.to_pylist(), handlers, parallel_threshold, workers,
+        ),
+        type=array.type,
+    )
+    # Null indices take to null
+    return pc.take(normalized, encoded.indices)
+
+
+def _normalize_uniques(
+    uniques: list[Any],
+    handlers: Iterable[str] | None,
+    parallel_threshold: int,
+    workers: int | None,
+) -> list[str]:
+    for value in uniques:
+        if not isinstance(value, str):
+            raise TypeError(f"Expected SQL strings, got {type(value).__name__}: {value!r}")
+    if len(uniques) >= parallel_threshold:
+        from .batch import normalize_many
+
+        return list(normalize_many(uniques, handlers, workers=workers))
+    handler_set = None if handlers is None else frozenset(handlers)
+    return [normalize(sql, handler_set) for sql in uniques]
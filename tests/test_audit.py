@@ -0,0 +1,100 @@
+"""Tests for audit-log ingestion."""
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from exasol_sql_normalizer.audit import ingest
+from exasol_sql_normalizer.cli import main
+
+_MULTILINE = "SELECT *\nFROM t\nWHERE c REGEXP_LIKE('a,b')"
+_ROWS = [
+    ["SESSION_ID", "STMT_ID", "COMMAND_NAME", "SQL_TEXT"],
+    ["1", "1", "SELECT", _MULTILINE],
+    ["1", "2", "SELECT", "SELECT CONVERT(VARCHAR(5) UTF8, \"x\") FROM t"],
+    ["2", "1", "SELECT", _MULTILINE],
+]
+
+
+def _csv_text(rows):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def audit_file(tmp_path):
+    path = tmp_path / "audit.csv"
+    path.write_text(_csv_text(_ROWS), encoding="utf-8", newline="")
+    return path
+
+
+class TestIngest:
+    def test_jsonl(self, audit_file):
+        out = io.StringIO()
+        stats = ingest(str(audit_file), out, workers=1)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [(r["SESSION_ID"], r["STMT_ID"]) for r in records] == [("1", "1"), ("1", "2"), ("2", "1")]
+        assert records[0]["NORMALIZED_SQL"] == "SELECT *\nFROM t\nWHERE REGEXP_LIKE(c, 'a,b')"
+        assert records[1]["NORMALIZED_SQL"] == 'SELECT CAST("x" AS VARCHAR(5)) FROM t'
+        assert (stats.rows, stats.normalized) == (3, 2)
+        assert stats.rows_per_second > 0
+
+    def test_gzip_and_csv_output(self, tmp_path):
+        path = tmp_path / "audit.csv.gz"
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+            f.write(_csv_text(_ROWS))
+        out = io.StringIO()
+        ingest([str(path)], out, output_format="csv", workers=1)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        assert rows[0] == ["SESSION_ID", "STMT_ID", "NORMALIZED_SQL"]
+        assert rows[3] == ["2", "1", "SELECT *\nFROM t\nWHERE REGEXP_LIKE(c, 'a,b')"]
+
+    def test_several_files_and_explicit_keys(self, audit_file):
+        out = io.StringIO()
+        stats = ingest([str(audit_file), str(audit_file)], out, key_columns=["COMMAND_NAME"], workers=1)
+        assert stats.rows == 6
+        assert json.loads(out.getvalue().splitlines()[0]).keys() == {"COMMAND_NAME", "NORMALIZED_SQL"}
+
+    def test_headerless_input(self):
+        source = io.StringIO(_csv_text(_ROWS[1:]), newline="")
+        out = io.StringIO()
+        ingest(source, out, columns=_ROWS[0], workers=1)
+        assert len(out.getvalue().splitlines()) == 3
+
+    def test_default_keys_without_audit_columns(self):
+        source = io.StringIO(_csv_text([["ID", "SQL_TEXT"], ["7", "SELECT 1"]]), newline="")
+        out = io.StringIO()
+        ingest(source, out, workers=1)
+        assert json.loads(out.getvalue()) == {"ID": "7", "NORMALIZED_SQL": "SELECT 1"}
+
+    def test_large_field(self):
+        sql = "SELECT '" + "x" * 200_000 + "'"
+        source = io.StringIO(_csv_text([["SQL_TEXT"], [sql]]), newline="")
+        out = io.StringIO()
+        ingest(source, out, workers=1)
+        assert json.loads(out.getvalue())["NORMALIZED_SQL"] == sql
+
+    def test_missing_columns(self, audit_file):
+        with pytest.raises(ValueError, match="SQL"):
+            ingest(str(audit_file), io.StringIO(), sql_column="SQL", workers=1)
+        with pytest.raises(ValueError, match="NOPE"):
+            ingest(str(audit_file), io.StringIO(), key_columns=["NOPE"], workers=1)
+
+    def test_empty_input(self):
+        stats = ingest(io.StringIO(""), io.StringIO(), workers=1)
+        assert stats.rows == 0
+
+
+class TestCli:
+    def test_audit_command(self, audit_file, tmp_path, capsys):
+        target = tmp_path / "out.jsonl"
+        assert main(["audit", str(audit_file), "-o", str(target), "--workers", "1"]) == 0
+        assert len(target.read_text().splitlines()) == 3
+        assert "rows/s" in capsys.readouterr().err
+
+    def test_missing_column_exit_code(self, audit_file, capsys):
+        assert main(["audit", str(audit_file), "--sql-column", "X", "--workers", "1"]) == 2
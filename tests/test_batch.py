@@ -0,0 +1,109 @@
+"""Tests for order-preserving bulk normalization."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from exasol_sql_normalizer import normalize
+from exasol_sql_normalizer import batch
+from exasol_sql_normalizer.batch import BatchStats, normalize_many, normalize_shared
+
+_INFIX = "SELECT * FROM t WHERE c{} REGEXP_LIKE('x')"
+
+
+class TestNormalizeMany:
+    def test_in_process_preserves_order(self):
+        sqls = [_INFIX.format(i) for i in range(10)]
+        assert list(normalize_many(sqls, workers=1, chunk_size=3)) == [normalize(s) for s in sqls]
+
+    def test_pool_preserves_order(self):
+        sqls = [_INFIX.format(i % 7) for i in range(200)]
+        result = list(normalize_many(iter(sqls), workers=2, chunk_size=8))
+        assert result == [normalize(s) for s in sqls]
+
+    def test_duplicates_normalized_once(self):
+        sqls = [_INFIX.format(i % 3) for i in range(30)]
+        stats = BatchStats()
+        list(normalize_many(sqls, workers=1, chunk_size=4, stats=stats))
+        assert (stats.items, stats.normalized) == (30, 3)
+
+    def test_duplicates_within_a_chunk(self):
+        stats = BatchStats()
+        result = list(normalize_many(["a", "a", "b", "a"], workers=1, stats=stats))
+        assert result == ["a", "a", "b", "a"]
+        assert stats.normalized == 2
+
+    def test_small_cache_still_correct(self):
+        sqls = [_INFIX.format(i % 5) for i in range(50)]
+        result = list(normalize_many(sqls, workers=1, chunk_size=2, cache_size=1))
+        assert result == [normalize(s) for s in sqls]
+
+    def test_handler_subset(self):
+        sql = "SELECT CONVERT(VARCHAR(5) UTF8, a) FROM t WHERE a REGEXP_LIKE('x')"
+        assert list(normalize_many([sql], {"convert"}, workers=1)) == [normalize(sql, {"convert"})]
+
+    def test_lazy_consumption(self):
+        consumed = []
+
+        def source():
+            for i in range(1000):
+                consumed.append(i)
+                yield f"SELECT {i}"
+
+        results = normalize_many(source(), workers=1, chunk_size=10)
+        assert next(results) == "SELECT 0"
+        assert len(consumed) < 1000
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            list(normalize_many(["SELECT 1"], {"nope"}))
+        with pytest.raises(ValueError):
+            list(normalize_many(["SELECT 1"], chunk_size=0))
+        with pytest.raises(ValueError):
+            list(normalize_many(["SELECT 1"], workers=0))
+
+
+def _shared_maps(_):
+    """Shared-memory segments mapped in this (worker) process."""
+    with open("/proc/self/maps") as f:
+        return os.getpid(), frozenset(line.split()[-1] for line in f if "/psm_" in line)
+
+
+class TestNormalizeShared:
+    def test_pool_preserves_order(self):
+        sqls = [_INFIX.format(i) for i in range(12)] + ["SELECT 1"]
+        assert normalize_shared(sqls, workers=2) == [normalize(s) for s in sqls]
+
+    def test_unchanged_returns_input_object(self):
+        sqls = ["SELECT 1", _INFIX.format(1), "SELECT 2"]
+        result = normalize_shared(sqls, workers=2)
+        assert result[0] is sqls[0] and result[2] is sqls[2]
+
+    def test_non_ascii(self):
+        sqls = [_INFIX.format("\u00e4\u00f6") + " -- \u2603", "SELECT '\U0001f600'", ""]
+        assert normalize_shared(sqls, workers=2) == [normalize(s) for s in sqls]
+
+    def test_output_overflowing_arena(self, monkeypatch):
+        monkeypatch.setattr(batch, "_ARENA_HEADROOM", 0)
+        sqls = [_INFIX.format(i) for i in range(4)]
+        assert normalize_shared(sqls, workers=2) == [normalize(s) for s in sqls]
+
+    @pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="needs /proc")
+    def test_reused_executor_keeps_no_segments(self):
+        sqls = [_INFIX.format(i) * 50 for i in range(8)]
+        with ProcessPoolExecutor(2) as pool:
+            before = set(pool.map(_shared_maps, range(8)))
+            for _ in range(5):
+                assert normalize_shared(sqls, workers=2, executor=pool) == [normalize(s) for s in sqls]
+            assert set(pool.map(_shared_maps, range(8))) == before
+
+    def test_in_process(self):
+        sqls = [_INFIX.format(i) for i in range(3)]
+        assert normalize_shared(sqls, workers=1) == [normalize(s) for s in sqls]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            normalize_shared(["SELECT 1"], {"nope"})
+        with pytest.raises(ValueError):
+            normalize_shared(["SELECT 1"], workers=0)
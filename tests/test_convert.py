@@ -61,6 +61,19 @@ class TestConvertEdgeCases:
         result = normalize_convert_charset(sql)
         assert result == sql
 
+    def test_nested_converts_both_rewritten(self):
+        sql = "SELECT CONVERT(VARCHAR(10) UTF8, CONVERT(VARCHAR(5) ASCII, x)) FROM t"
+        result = normalize_convert_charset(sql)
+        assert result == "SELECT CAST(CAST(x AS VARCHAR(5)) AS VARCHAR(10)) FROM t"
+
+    def test_whitespace_around_type_parts(self):
+        sql = "SELECT CONVERT\n  ( VARCHAR (10)\tUTF8 ,\n x ) FROM t"
+        assert normalize_convert_charset(sql) == "SELECT CAST(x AS VARCHAR(10)) FROM t"
+
+    def test_unbalanced_precision_unchanged(self):
+        sql = "SELECT CONVERT(VARCHAR(10 UTF8, x) FROM t"
+        assert normalize_convert_charset(sql) == sql
+
     def test_lowercase_convert(self):
         sql = "SELECT convert(VARCHAR(10000) UTF8, col1) FROM t"
         result = normalize_convert_charset(sql)
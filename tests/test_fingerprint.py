@@ -0,0 +1,54 @@
+"""Tests for query fingerprints."""
+
+from exasol_sql_normalizer import fingerprint, normalize
+from exasol_sql_normalizer.fingerprint import canonical, fingerprint_normalized
+
+
+class TestCanonical:
+    def test_literals_whitespace_and_case(self):
+        assert canonical("select a,  'x' -- note\nFROM t where b = 1.5") == (
+            "SELECT A , ? FROM T WHERE B = ?"
+        )
+
+    def test_quoted_identifiers_keep_case(self):
+        assert canonical('SELECT "MixedCase" FROM t') == 'SELECT "MixedCase" FROM T'
+
+    def test_in_list_collapsed(self):
+        assert canonical("WHERE a IN (1, 2, -3) AND b IN ('x')") == (
+            "WHERE A IN ( ... ) AND B IN ( ... )"
+        )
+
+    def test_in_subquery_kept(self):
+        assert canonical("WHERE a IN (SELECT 1 FROM t)") == (
+            "WHERE A IN ( SELECT ? FROM T )"
+        )
+
+    def test_script_body_verbatim(self):
+        sql = "CREATE SCRIPT s AS\n  x = 'a'  -- keep\n/\nSELECT 1;"
+        assert canonical(sql) == "CREATE SCRIPT s AS\n  x = 'a'  -- keep\n/ SELECT ? ;"
+
+
+class TestFingerprint:
+    def test_groups_literal_variants(self):
+        first = "SELECT a FROM t WHERE d = '2024-01-01' AND id IN (1, 2)"
+        second = "select A\nfrom T where d='2024-12-31' and id in (7, 8, 9, 10)"
+        assert fingerprint(first) == fingerprint(second)
+
+    def test_distinguishes_shapes(self):
+        assert fingerprint("SELECT a FROM t") != fingerprint("SELECT a FROM u")
+        assert fingerprint("SELECT a FROM t") != fingerprint('SELECT "a" FROM t')
+
+    def test_computed_after_normalization(self):
+        infix = "SELECT * FROM t WHERE a REGEXP_LIKE('x')"
+        call = "SELECT * FROM t WHERE REGEXP_LIKE(a, 'y')"
+        assert fingerprint(infix) == fingerprint(call)
+
+    def test_stable_value(self):
+        # Fingerprints are stored; changing the canonical form is a breaking change
+        assert fingerprint("SELECT 1") == "c148796e1220075a"
+        assert len(fingerprint("SELECT a FROM t")) == 16
+
+    def test_result_property(self):
+        sql = "SELECT CONVERT(VARCHAR(5) UTF8, a) FROM t"
+        result = normalize(sql, report=True)
+        assert result.fingerprint == fingerprint_normalized(result.sql) == fingerprint(sql)
@@ -0,0 +1,116 @@
+"""Tests for git-aware normalization of changed files."""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from exasol_sql_normalizer import normalize
+from exasol_sql_normalizer.cli import main
+from exasol_sql_normalizer.gitdiff import (
+    GitError,
+    changed_line_ranges,
+    changed_sql_files,
+    changed_statements,
+    normalize_changed,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+_CONVERT = "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t;\n"
+_REGEXP = "SELECT * FROM t WHERE b REGEXP_LIKE('x');\n"
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        check=True, capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "views").mkdir()
+    (tmp_path / "views" / "a.sql").write_text(_CONVERT + _REGEXP)
+    (tmp_path / "views" / "b.sql").write_text(_CONVERT)
+    (tmp_path / "README.md").write_text("docs")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+
+    # Modify the second statement of a.sql, add c.sql, touch a non-SQL file
+    (tmp_path / "views" / "a.sql").write_text(_CONVERT + _REGEXP.replace("'x'", "'y'"))
+    (tmp_path / "c.sql").write_text(_REGEXP)
+    (tmp_path / "README.md").write_text("more docs")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "head")
+    return tmp_path
+
+
+class TestChangedFiles:
+    def test_only_added_and_modified_sql(self, repo):
+        assert sorted(changed_sql_files("HEAD~1", "HEAD", str(repo))) == ["c.sql", "views/a.sql"]
+
+    def test_whole_files_normalized(self, repo):
+        results = {r.path: r for r in normalize_changed("HEAD~1", "HEAD", str(repo))}
+        assert results["views/a.sql"].sql == normalize(_CONVERT + _REGEXP.replace("'x'", "'y'"))
+        assert results["c.sql"].statements is None
+
+    def test_changed_line_ranges(self, repo):
+        assert changed_line_ranges("HEAD~1", "HEAD", "views/a.sql", str(repo)) == [(2, 2)]
+
+    def test_statement_mode_limits_output(self, repo):
+        results = {
+            r.path: r
+            for r in normalize_changed("HEAD~1", "HEAD", str(repo), statements=True)
+        }
+        stmts = results["views/a.sql"].statements
+        assert len(stmts) == 1
+        assert (stmts[0].start_line, stmts[0].end_line) == (2, 2)
+        assert stmts[0].sql == "SELECT * FROM t WHERE REGEXP_LIKE(b, 'y');"
+        assert results["views/a.sql"].sql is None
+
+    def test_unknown_revision_raises(self, repo):
+        with pytest.raises(GitError):
+            normalize_changed("no-such-rev", "HEAD", str(repo))
+
+
+    def test_option_like_revision_is_a_revision(self, repo, tmp_path_factory):
+        target = tmp_path_factory.mktemp("elsewhere") / "out.txt"
+        with pytest.raises(GitError):
+            changed_sql_files(f"--output={target}", "HEAD", str(repo))
+        with pytest.raises(GitError):
+            changed_line_ranges(f"--output={target}", "HEAD", "views/a.sql", str(repo))
+        assert not target.exists()
+
+    def test_external_diff_ignored(self, repo):
+        _git(repo, "config", "diff.external", "echo")
+        assert changed_line_ranges("HEAD~1", "HEAD", "views/a.sql", str(repo)) == [(2, 2)]
+
+class TestChangedStatements:
+    def test_multiline_statement_overlap(self):
+        text = "SELECT 1;\nSELECT a\nFROM t\nWHERE b REGEXP_LIKE('x');\nSELECT 3;"
+        stmts = changed_statements(text, [(3, 3)])
+        assert [(s.start_line, s.end_line) for s in stmts] == [(2, 4)]
+
+    def test_no_ranges(self):
+        assert changed_statements("SELECT 1;", []) == []
+
+
+class TestChangedCommand:
+    def test_jsonl_output(self, repo, capsys):
+        assert main(["changed", "HEAD~1", "HEAD", "--repo", str(repo), "--statements"]) == 0
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert {r["path"] for r in records} == {"c.sql", "views/a.sql"}
+
+    def test_output_dir(self, repo, tmp_path_factory):
+        out = tmp_path_factory.mktemp("out")
+        assert main(["changed", "HEAD~1", "--repo", str(repo), "--output-dir", str(out)]) == 0
+        assert (out / "views" / "a.sql").read_text() == normalize(
+            _CONVERT + _REGEXP.replace("'x'", "'y'")
+        )
+
+    def test_git_failure_exit_code(self, repo, capsys):
+        assert main(["changed", "no-such-rev", "--repo", str(repo)]) == 2
+        assert "failed" in capsys.readouterr().err
@@ -0,0 +1,99 @@
+"""Tests for guard limits on untrusted input."""
+
+import pickle
+import time
+
+import pytest
+
+from exasol_sql_normalizer import (
+    BudgetExceeded,
+    Guard,
+    InputTooLarge,
+    TooManyRewrites,
+    WorkBudgetExceeded,
+    normalize,
+)
+from exasol_sql_normalizer.guard import _ACTIVE_METER, charge
+
+_SQL = "SELECT CONVERT(VARCHAR(10) UTF8, a), CONVERT(VARCHAR(5) UTF8, b) FROM t"
+
+# Thousands of unbalanced CONVERT calls: every one makes the handler scan to
+# the end of the input looking for its closing paren.
+_PATHOLOGICAL = "SELECT " + "CONVERT(x, " * 5000
+
+
+class TestGuardLimits:
+    def test_within_limits_matches_unguarded(self):
+        guard = Guard(max_input_size=1000, max_rewrites=10, max_work=100_000)
+        assert normalize(_SQL, guard=guard) == normalize(_SQL)
+
+    def test_input_too_large(self):
+        with pytest.raises(InputTooLarge) as excinfo:
+            normalize(_SQL, guard=Guard(max_input_size=10))
+        assert excinfo.value.budget == 10
+        assert excinfo.value.used == len(_SQL)
+
+    def test_too_many_rewrites(self):
+        with pytest.raises(TooManyRewrites):
+            normalize(_SQL, guard=Guard(max_rewrites=1))
+
+    def test_work_budget_stops_pathological_input_quickly(self):
+        guard = Guard(max_work=20 * len(_PATHOLOGICAL))
+        start = time.perf_counter()
+        with pytest.raises(WorkBudgetExceeded):
+            normalize(_PATHOLOGICAL, guard=guard)
+        assert time.perf_counter() - start < 1.0
+
+    @pytest.mark.parametrize("near_miss", [
+        "IMPORT INTO (a INT) FROM CSV AT x, ",
+        "IMPORT FROM CSV AT x, ",
+        "EXPORT (SELECT 1) TO x, ",
+        "GROUP_CONCAT x, ",
+    ])
+    def test_near_misses_cost_linear_work(self, near_miss):
+        sql = "SELECT " + near_miss * 5000
+        assert normalize(sql, guard=Guard(max_work=20 * len(sql))) == sql
+
+    def test_exceptions_share_base_class(self):
+        assert issubclass(WorkBudgetExceeded, BudgetExceeded)
+        assert issubclass(InputTooLarge, BudgetExceeded)
+
+    def test_exception_pickles(self):
+        exc = pickle.loads(pickle.dumps(TooManyRewrites(3, 4)))
+        assert isinstance(exc, TooManyRewrites)
+        assert (exc.budget, exc.used) == (3, 4)
+        assert "rewrite limit of 3" in str(exc)
+
+    def test_invalid_on_exceed(self):
+        with pytest.raises(ValueError):
+            Guard(on_exceed="ignore")
+
+
+class TestPassthrough:
+    def test_returns_input_unchanged(self):
+        guard = Guard(max_rewrites=1, on_exceed="passthrough")
+        assert normalize(_SQL, guard=guard) is _SQL
+
+    def test_report_carries_diagnostic(self):
+        guard = Guard(max_work=1000, on_exceed="passthrough")
+        result = normalize(_PATHOLOGICAL, guard=guard, report=True)
+        assert result.sql is _PATHOLOGICAL
+        assert result.changed is False
+        assert [d.code for d in result.diagnostics] == ["budget-exceeded"]
+
+    def test_report_counts_every_handler(self):
+        guard = Guard(max_rewrites=1, on_exceed="passthrough")
+        result = normalize(_SQL, guard=guard, report=True)
+        assert result.rewrites == dict.fromkeys(normalize(_SQL, report=True).rewrites, 0)
+        assert result.rewrites["convert"] == 0
+
+
+class TestMeterScope:
+    def test_charge_is_noop_outside_guarded_call(self):
+        charge(10**12)
+
+    def test_meter_reset_after_failure(self):
+        with pytest.raises(WorkBudgetExceeded):
+            normalize(_PATHOLOGICAL, guard=Guard(max_work=100))
+        # Later unguarded calls are not metered
+        assert _ACTIVE_METER.get() is None
@@ -82,6 +82,17 @@ class TestImportIntoBasic:
         result = normalize_import_into(sql)
         assert "SELECT name, id FROM __JDBC_IMPORT__CONN1.t" in result
 
+    def test_comma_in_default_literal(self):
+        sql = (
+            "SELECT * FROM (\n"
+            "    IMPORT INTO (tag VARCHAR(10) DEFAULT 'a,b', id INT)\n"
+            "    FROM JDBC AT CONN1\n"
+            "    STATEMENT 'SELECT tag, id FROM t'\n"
+            ")"
+        )
+        result = normalize_import_into(sql)
+        assert "SELECT tag, id FROM __JDBC_IMPORT__CONN1.t" in result
+
 
 class TestImportIntoMultiTable:
     def test_join_in_statement(self):
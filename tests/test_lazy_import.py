@@ -0,0 +1,44 @@
+"""Tests that importing the package defers handler modules and regexes."""
+
+import subprocess
+import sys
+
+import pytest
+
+from exasol_sql_normalizer import handlers
+
+
+def _loaded_after(code: str) -> set[str]:
+    script = code + "\nimport sys; print(' '.join(sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+    )
+    return set(proc.stdout.split())
+
+
+class TestLazyImport:
+    def test_import_does_not_load_handlers(self):
+        loaded = _loaded_after("import exasol_sql_normalizer")
+        assert not any(m.startswith("exasol_sql_normalizer.handlers") for m in loaded)
+        assert "exasol_sql_normalizer.utils" not in loaded
+
+    def test_import_does_not_load_heavy_stdlib(self):
+        loaded = _loaded_after("import exasol_sql_normalizer")
+        assert "typing" not in loaded
+        assert "dataclasses" not in loaded
+
+    def test_only_triggered_handlers_load(self):
+        loaded = _loaded_after(
+            "from exasol_sql_normalizer import normalize\n"
+            "normalize(\"SELECT CONVERT(VARCHAR(1) UTF8, a) FROM t\")"
+        )
+        assert "exasol_sql_normalizer.handlers.convert" in loaded
+        assert "exasol_sql_normalizer.handlers.import_into" not in loaded
+
+    def test_handlers_package_exports_resolve_lazily(self):
+        assert callable(handlers.normalize_convert_charset)
+        assert "normalize_regexp_like" in dir(handlers)
+
+    def test_unknown_handler_attribute(self):
+        with pytest.raises(AttributeError):
+            handlers.normalize_nothing
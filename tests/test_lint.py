@@ -0,0 +1,109 @@
+"""Tests for the query-performance lint pass."""
+
+import json
+
+import pytest
+
+from exasol_sql_normalizer import normalize
+from exasol_sql_normalizer.cli import main
+
+
+def _lint(sql):
+    return normalize(sql, report=True, lint=True).diagnostics
+
+
+def _codes(sql):
+    return [d.code for d in _lint(sql)]
+
+
+class TestRules:
+    def test_import_from_without_columns(self):
+        sql = "SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM dbo.t')"
+        [diag] = _lint(sql)
+        assert diag.code == "L001"
+        assert diag.severity == "warning"
+        assert sql[diag.start:diag.end] == "IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM dbo.t'"
+
+    def test_import_into_with_columns_is_clean(self):
+        sql = "SELECT * FROM (IMPORT INTO (a INT) FROM JDBC AT C STATEMENT 'SELECT a FROM t')"
+        assert _lint(sql) == []
+
+    def test_no_extractable_tables(self):
+        sql = "SELECT * FROM (IMPORT INTO (a INT) FROM JDBC AT C STATEMENT 'EXEC dbo.p')"
+        [diag] = _lint(sql)
+        assert (diag.code, diag.severity) == ("L002", "info")
+
+    def test_duplicate_remote_statement(self):
+        first = "SELECT * FROM (IMPORT INTO (a INT) FROM JDBC AT C STATEMENT 'SELECT a FROM t');\n"
+        second = "SELECT * FROM (IMPORT INTO (a INT) FROM JDBC AT D STATEMENT 'select a  from t');\n"
+        diags = _lint(first + second)
+        assert [d.code for d in diags] == ["L003"]
+        assert diags[0].start == len(first) + first.index("IMPORT")
+        assert str(first.index("IMPORT")) in diags[0].message
+
+    def test_large_convert_around_group_concat(self):
+        sql = "SELECT CONVERT(VARCHAR(2000000) UTF8, GROUP_CONCAT(a SEPARATOR '|')) FROM t"
+        [diag] = _lint(sql)
+        assert diag.code == "L004"
+        # The span is mapped back through the GROUP_CONCAT rewrite
+        assert sql[diag.start:diag.end] == sql[len("SELECT "):-len(" FROM t")]
+
+    def test_small_convert_is_clean(self):
+        assert _lint("SELECT CONVERT(VARCHAR(100) UTF8, GROUP_CONCAT(a)) FROM t") == []
+
+    def test_large_convert_without_group_concat_is_clean(self):
+        assert _lint("SELECT CONVERT(VARCHAR(2000000) UTF8, a) FROM t") == []
+
+
+class TestLintPass:
+    def test_offsets_after_earlier_rewrites(self):
+        sql = (
+            "SELECT CONVERT(VARCHAR(1) UTF8, x), b REGEXP_LIKE('y') FROM t "
+            "JOIN (IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM dbo.t') s ON 1 = 1"
+        )
+        [diag] = _lint(sql)
+        assert sql[diag.start:].startswith("IMPORT FROM JDBC")
+
+    def test_findings_sorted_by_position(self):
+        sql = (
+            "SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'EXEC p');\n"
+            "SELECT CONVERT(VARCHAR(500000) UTF8, GROUP_CONCAT(a)) FROM t;"
+        )
+        diags = _lint(sql)
+        assert _codes(sql) == ["L001", "L002", "L004"]
+        assert [d.start for d in diags] == sorted(d.start for d in diags)
+
+    def test_normalized_output_unchanged(self):
+        sql = "SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM dbo.t')"
+        assert normalize(sql, report=True, lint=True).sql == normalize(sql)
+
+    def test_lint_requires_report(self):
+        with pytest.raises(ValueError):
+            normalize("SELECT 1", lint=True)
+
+    def test_no_findings_without_lint(self):
+        sql = "SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'EXEC p')"
+        assert normalize(sql, report=True).diagnostics == []
+
+
+class TestLintCommand:
+    def test_text_output_and_exit_status(self, tmp_path, capsys):
+        path = tmp_path / "q.sql"
+        path.write_text("SELECT 1;\nSELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM t');\n")
+        assert main(["lint", str(path)]) == 1
+        assert capsys.readouterr().out == (
+            f"{path}:2:16: warning L001 IMPORT FROM JDBC without a column list "
+            "pulls every remote column\n"
+        )
+
+    def test_json_output(self, tmp_path, capsys):
+        path = tmp_path / "q.sql"
+        path.write_text("SELECT * FROM (IMPORT INTO (a INT) FROM JDBC AT C STATEMENT 'EXEC p')")
+        assert main(["lint", "--format", "json", str(path)]) == 0
+        record = json.loads(capsys.readouterr().out)
+        assert (record["code"], record["line"], record["column"]) == ("L002", 1, 16)
+
+    def test_fail_on_info(self, tmp_path):
+        path = tmp_path / "q.sql"
+        path.write_text("SELECT * FROM (IMPORT INTO (a INT) FROM JDBC AT C STATEMENT 'EXEC p')")
+        assert main(["lint", "--fail-on", "info", str(path)]) == 1
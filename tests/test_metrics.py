@@ -0,0 +1,118 @@
+"""Tests for the metrics registry and its Prometheus text output."""
+
+import io
+import re
+import threading
+
+import pytest
+
+from exasol_sql_normalizer import Guard, TemplateCache, metrics, normalize, normalize_to
+from exasol_sql_normalizer import normalizer
+
+_SQL = "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t WHERE b REGEXP_LIKE('x')"
+
+
+@pytest.fixture
+def enabled():
+    metrics.enable()
+    metrics.reset()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def _samples(text: str) -> dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestRecording:
+    def test_disabled_by_default(self):
+        assert normalizer._metrics is None
+        assert not metrics.is_enabled()
+
+    def test_disabled_records_nothing(self, enabled):
+        metrics.disable()
+        normalize(_SQL)
+        assert metrics.snapshot()["calls"] == 0
+
+    def test_calls_bytes_and_rewrites(self, enabled):
+        normalize(_SQL)
+        normalize("SELECT 'ä'")
+        snap = metrics.snapshot()
+        assert snap["calls"] == 2
+        assert snap["input_bytes"] == len(_SQL) + len("SELECT 'ä'") + 1
+        assert snap["rewrites"] == {"convert": 1, "regexp_like": 1}
+        assert snap["latency_seconds"] > 0
+
+    def test_normalize_to(self, enabled):
+        normalize_to(_SQL, io.StringIO())
+        assert metrics.snapshot()["calls"] == 1
+
+    def test_guard_trips(self, enabled):
+        normalize("SELECT 12345", guard=Guard(max_input_size=5, on_exceed="passthrough"))
+        with pytest.raises(Exception):
+            normalize(_SQL, guard=Guard(max_rewrites=1))
+        snap = metrics.snapshot()
+        assert snap["guard_trips"] == {"input_size": 1, "rewrite": 1}
+        assert snap["calls"] == 2
+
+    def test_template_cache_lookups(self, enabled):
+        cache = TemplateCache()
+        for i in range(3):
+            cache.normalize(f"SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t WHERE id = {i}")
+        snap = metrics.snapshot()
+        assert (snap["template_cache_hits"], snap["template_cache_misses"]) == (2, 1)
+
+    def test_threads_are_summed(self, enabled):
+        threads = [
+            threading.Thread(target=lambda: [normalize(_SQL) for _ in range(10)])
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # A new recording thread folds the finished threads' shards
+        last = threading.Thread(target=normalize, args=(_SQL,))
+        last.start()
+        last.join()
+        assert metrics.snapshot()["calls"] == 41
+        assert len(metrics._shards) <= 3
+
+    def test_drain_and_merge(self, enabled):
+        normalize(_SQL)
+        counts = metrics.drain()
+        assert metrics.snapshot()["calls"] == 0
+        metrics.merge(counts)
+        metrics.merge(counts)
+        assert metrics.snapshot()["rewrites"] == {"convert": 2, "regexp_like": 2}
+
+
+class TestRender:
+    def test_histograms_are_cumulative(self, enabled):
+        normalize(_SQL)
+        normalize("x" * 5000)
+        samples = _samples(metrics.render())
+        assert samples["sqlnorm_calls_total"] == 2
+        assert samples['sqlnorm_input_bytes_bucket{le="256"}'] == 1
+        assert samples['sqlnorm_input_bytes_bucket{le="16384"}'] == 2
+        assert samples['sqlnorm_input_bytes_bucket{le="+Inf"}'] == 2
+        assert samples["sqlnorm_input_bytes_count"] == 2
+        assert samples['sqlnorm_latency_seconds_bucket{le="+Inf"}'] == 2
+        assert samples['sqlnorm_rewrites_total{handler="convert"}'] == 1
+
+    def test_format(self, enabled):
+        normalize(_SQL)
+        text = metrics.render()
+        assert text.endswith("\n")
+        sample = re.compile(r'[a-z_]+(\{[a-z]+="[^"]*"\})? [0-9.e+-]+')
+        for line in text.splitlines():
+            if line.startswith("# TYPE"):
+                assert line.split()[-1] in ("counter", "histogram")
+            elif not line.startswith("# HELP"):
+                assert sample.fullmatch(line), line
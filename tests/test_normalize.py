@@ -1,6 +1,11 @@
 """Integration tests for the full normalize() pipeline."""
 
-from exasol_sql_normalizer import normalize
+import io
+import tracemalloc
+
+import pytest
+
+from exasol_sql_normalizer import Guard, TooManyRewrites, normalize, normalize_to
 
 
 class TestNormalizeChain:
@@ -76,6 +81,236 @@ class TestNormalizeChain:
         assert normalize(sql) == sql
 
 
+_FULL_QUERY = (
+    "SELECT convert(VARCHAR(100) UTF8, group_concat(a ORDER BY a SEPARATOR '|')) AS c\n"
+    "FROM (\n"
+    "    IMPORT INTO (a VARCHAR(10)) FROM JDBC AT CON STATEMENT 'SELECT a FROM dbo.t'\n"
+    ")\n"
+    "WHERE a REGEXP_LIKE('[0-9]+')"
+)
+
+
+class TestChangeDetection:
+    def test_unchanged_input_is_returned_as_is(self):
+        sql = "SELECT a, b FROM t WHERE x REGEXP_LIKE_NOT_REALLY = 1"
+        assert normalize(sql) is sql
+
+    def test_triggered_but_untouched_input_is_returned_as_is(self):
+        sql = "SELECT GROUP_CONCAT(col) FROM t WHERE REGEXP_LIKE(a, 'x')"
+        assert normalize(sql) is sql
+
+    def test_report_counts_rewrites_per_handler(self):
+        result = normalize(_FULL_QUERY, report=True)
+        assert result.changed is True
+        assert result.sql == normalize(_FULL_QUERY)
+        assert result.rewrites == {
+            "export_into": 0,
+            "import_into": 1,
+            "import_from": 0,
+            "group_concat": 1,
+            "convert": 1,
+            "regexp_like": 1,
+        }
+
+    def test_report_unchanged(self):
+        sql = "SELECT 1"
+        result = normalize(sql, report=True)
+        assert result.changed is False
+        assert result.sql is sql
+        assert not any(result.rewrites.values())
+
+    def test_report_respects_handler_subset(self):
+        result = normalize(_FULL_QUERY, handlers={"regexp_like"}, report=True)
+        assert result.rewrites == {"regexp_like": 1}
+
+    def test_multiple_rewrites_counted(self):
+        sql = "SELECT CONVERT(VARCHAR(1) UTF8, a), CONVERT(VARCHAR(2) UTF8, b) FROM t"
+        assert normalize(sql, report=True).rewrites["convert"] == 2
+
+
+class TestIdempotency:
+    @pytest.mark.parametrize("sql", [
+        _FULL_QUERY,
+        "SELECT CONVERT(VARCHAR(10) UTF8, CONVERT(VARCHAR(5) ASCII, x)) FROM t",
+        "SELECT * FROM t WHERE a REGEXP_LIKE('x') AND b REGEXP_LIKE('y')",
+        "EXPORT(SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT 1')) "
+        "INTO SCRIPT s.x WITH A = 'b';",
+        "SELECT 'IMPORT INTO (a INT)' FROM t",
+        # Rewritten output where a keyword precedes REGEXP_LIKE(col, 'p')
+        "SELECT DISTINCT name REGEXP_LIKE('^a') FROM t",
+        "SELECT name FROM t ORDER BY name REGEXP_LIKE('^a')",
+        "SELECT COUNT(*) FROM t GROUP BY t.name REGEXP_LIKE('^a')",
+        "SELECT ROW_NUMBER() OVER (PARTITION BY c REGEXP_LIKE('x') ORDER BY d) FROM t",
+        "SELECT a REGEXP_LIKE(b REGEXP_LIKE('c')) FROM t",
+        "SELECT CASE WHEN x REGEXP_LIKE('a,b') THEN 1 END FROM t",
+        "SELECT DISTINCT CONVERT(VARCHAR(1) UTF8, x), y REGEXP_LIKE('z') FROM t",
+    ])
+    def test_second_pass_returns_same_object(self, sql):
+        once = normalize(sql)
+        assert normalize(once) is once
+
+
+_SCRIPT_FILE = (
+    "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t;\n"
+    "CREATE OR REPLACE PYTHON3 SCALAR SCRIPT s.f(a VARCHAR(10)) RETURNS VARCHAR(10) AS\n"
+    "import json\n"
+    "SQL = \"SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT 1')\"\n"
+    "def run(ctx):\n"
+    "    return 'CONVERT(VARCHAR(1) UTF8, x)'\n"
+    "/\n"
+    "SELECT GROUP_CONCAT(a SEPARATOR '|') FROM t;\n"
+)
+
+
+class TestScriptBodies:
+    def test_script_body_copied_verbatim(self):
+        start = _SCRIPT_FILE.index("CREATE")
+        end = _SCRIPT_FILE.index("/\n") + 1
+        result = normalize(_SCRIPT_FILE)
+        assert _SCRIPT_FILE[start:end] in result
+        assert result.startswith("SELECT CAST(a AS VARCHAR(10))")
+        assert result.endswith("SELECT GROUP_CONCAT(a) FROM t;\n")
+
+    def test_rewrites_count_only_sql(self):
+        result = normalize(_SCRIPT_FILE, report=True)
+        assert result.rewrites["convert"] == 1
+        assert result.rewrites["import_from"] == 0
+
+    def test_script_only_input_unchanged(self):
+        start = _SCRIPT_FILE.index("CREATE")
+        script = _SCRIPT_FILE[start:_SCRIPT_FILE.index("/\n") + 2]
+        assert normalize(script) is script
+
+    def test_idempotent(self):
+        once = normalize(_SCRIPT_FILE)
+        assert normalize(once) is once
+
+
+class TestSharedSkipSpans:
+    def test_scanned_once_per_text_and_dropped_after_the_call(self, monkeypatch):
+        from exasol_sql_normalizer import utils
+
+        scanned = []
+        find = utils._find_skip_spans
+        monkeypatch.setattr(utils, "_find_skip_spans", lambda sql: scanned.append(sql) or find(sql))
+        sql = "SELECT 'IMPORT', 'EXPORT', 'GROUP_CONCAT', 'CONVERT', 'REGEXP_LIKE' FROM t"
+        assert normalize(sql) is sql
+        assert scanned == [sql]
+        assert utils._SHARED_SPANS.get() is None
+
+
+class TestComments:
+    def test_commented_out_constructs_untouched(self):
+        sql = (
+            "-- SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT 1')\n"
+            "/* SELECT CONVERT(VARCHAR(1) UTF8, a),\n"
+            "   GROUP_CONCAT(a SEPARATOR '|'), a REGEXP_LIKE('x')\n"
+            "   EXPORT(SELECT 1) INTO SCRIPT s.x WITH A = 'b'; */\n"
+            "SELECT 1"
+        )
+        assert normalize(sql) is sql
+
+    def test_quote_in_comment_does_not_hide_code(self):
+        sql = "-- don't\nSELECT CONVERT(VARCHAR(1) UTF8, a) FROM t"
+        assert normalize(sql) == "-- don't\nSELECT CAST(a AS VARCHAR(1)) FROM t"
+
+    def test_keyword_in_quoted_identifier_untouched(self):
+        sql = 'SELECT "x REGEXP_LIKE(1)" FROM t'
+        assert normalize(sql) is sql
+
+
+class _ChunkWriter:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, text):
+        self.chunks.append(text)
+
+
+class _NullWriter:
+    def write(self, text):
+        pass
+
+
+_STREAM_SQL = (
+    "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t;\n"
+    "-- IMPORT FROM JDBC AT C STATEMENT 'x';\n"
+    "SELECT 1;\n"
+    + _SCRIPT_FILE
+    + "SELECT x REGEXP_LIKE('y')"
+)
+
+
+class TestPeakMemory:
+    def test_normalize_peak_memory_bounded(self):
+        stmt = (
+            "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM (IMPORT INTO (a INT) FROM JDBC "
+            "AT C STATEMENT 'SELECT a FROM dbo.t') WHERE c REGEXP_LIKE('x');\n"
+        )
+        sql = (stmt + "SELECT a, b FROM t WHERE x = 1;\n" * 4) * 500
+        tracemalloc.start()
+        try:
+            normalize(sql)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Statement-sized intermediates plus the final string
+        assert peak < 3 * len(sql)
+
+
+class TestNormalizeTo:
+    def test_matches_normalize(self):
+        out = io.StringIO()
+        normalize_to(_STREAM_SQL, out)
+        assert out.getvalue() == normalize(_STREAM_SQL)
+
+    def test_writes_one_chunk_per_statement(self):
+        writer = _ChunkWriter()
+        normalize_to(_STREAM_SQL, writer)
+        assert len(writer.chunks) > 1
+        assert "\n-- IMPORT FROM JDBC AT C STATEMENT 'x';\nSELECT 1;" in writer.chunks
+
+    def test_returns_rewrite_counts(self):
+        rewrites = normalize_to(_STREAM_SQL, _NullWriter())
+        assert rewrites == normalize(_STREAM_SQL, report=True).rewrites
+
+    def test_file_writer(self, tmp_path):
+        target = tmp_path / "out.sql"
+        with open(target, "w", encoding="utf-8") as f:
+            normalize_to(_STREAM_SQL, f, handlers={"convert"})
+        assert target.read_text(encoding="utf-8") == normalize(_STREAM_SQL, {"convert"})
+
+    def test_empty_input(self):
+        out = io.StringIO()
+        normalize_to("", out)
+        assert out.getvalue() == ""
+
+    def test_guard_raise(self):
+        with pytest.raises(TooManyRewrites):
+            normalize_to(_STREAM_SQL, _NullWriter(), guard=Guard(max_rewrites=1))
+
+    def test_guard_passthrough_writes_rest_unchanged(self):
+        out = io.StringIO()
+        guard = Guard(max_rewrites=1, on_exceed="passthrough")
+        normalize_to(_STREAM_SQL, out, guard=guard)
+        first = "SELECT CAST(a AS VARCHAR(10)) FROM t;"
+        assert out.getvalue() == first + _STREAM_SQL[_STREAM_SQL.index("\n"):]
+
+    def test_peak_memory_below_input_size(self):
+        stmt = (
+            "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM (IMPORT INTO (a INT) FROM JDBC "
+            "AT C STATEMENT 'SELECT a FROM dbo.t') WHERE c REGEXP_LIKE('x');\n"
+        )
+        sql = stmt * 1000
+        tracemalloc.start()
+        try:
+            normalize_to(sql, _NullWriter())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak < len(sql) // 2
+
+
 class TestSqlglotRoundTrip:
     """Verify that normalized SQL can be parsed by sqlglot.
 
@@ -0,0 +1,16 @@
+"""Tests for optional-dependency imports."""
+
+import json
+
+import pytest
+
+from exasol_sql_normalizer._optional import require
+
+
+class TestRequire:
+    def test_installed(self):
+        assert require("json", "unused") is json
+
+    def test_missing_names_extra(self):
+        with pytest.raises(ImportError, match=r"exasol-sql-normalizer\[arrow\]"):
+            require("exasol_sql_normalizer_missing_module", "arrow")
@@ -0,0 +1,43 @@
+"""Tests for the piece table used to assemble normalized output."""
+
+import io
+
+from exasol_sql_normalizer.piecetable import PieceTable
+
+
+class TestPieceTable:
+    def test_untouched_source_is_returned_as_is(self):
+        source = "SELECT 1; SELECT 2;"
+        table = PieceTable(source)
+        table.append_source(0, 9)
+        table.append_source(9, len(source))
+        assert table.materialize() is source
+
+    def test_adjacent_source_ranges_merge(self):
+        table = PieceTable("abcdef")
+        table.append_source(0, 2)
+        table.append_source(2, 4)
+        assert list(table.chunks()) == ["abcd"]
+
+    def test_mixed_pieces(self):
+        table = PieceTable("abcdef")
+        table.append_source(0, 2)
+        table.append_text("XY")
+        table.append_source(4, 6)
+        assert table.materialize() == "abXYef"
+        assert len(table) == 6
+
+    def test_empty_pieces_ignored(self):
+        table = PieceTable("abc")
+        table.append_source(1, 1)
+        table.append_text("")
+        assert list(table.chunks()) == []
+        assert table.materialize() == ""
+
+    def test_write_to(self):
+        table = PieceTable("abcdef")
+        table.append_text(">")
+        table.append_source(0, 6)
+        out = io.StringIO()
+        table.write_to(out)
+        assert out.getvalue() == ">abcdef"
@@ -0,0 +1,101 @@
+"""Tests for the REGEXP_LIKE pattern catalog."""
+
+import pytest
+
+from exasol_sql_normalizer.regexp_catalog import (
+    backtracking_risks,
+    build_catalog,
+    compile_error,
+    find_regexp_patterns,
+)
+
+
+class TestFindPatterns:
+    def test_infix_form(self):
+        sql = "SELECT * FROM t WHERE t.col REGEXP_LIKE('^a+$')"
+        [occ] = find_regexp_patterns(sql)
+        assert (occ.form, occ.column, occ.pattern) == ("infix", "t.col", "^a+$")
+        assert sql[occ.start:occ.end] == "t.col REGEXP_LIKE('^a+$')"
+
+    def test_function_form(self):
+        sql = "SELECT * FROM t WHERE REGEXP_LIKE(UPPER(name), '[A-Z]{3}')"
+        [occ] = find_regexp_patterns(sql)
+        assert (occ.form, occ.column, occ.pattern) == ("function", "UPPER(name)", "[A-Z]{3}")
+        assert sql[occ.start:occ.end] == "REGEXP_LIKE(UPPER(name), '[A-Z]{3}')"
+
+    def test_escaped_quotes_resolved(self):
+        [occ] = find_regexp_patterns("WHERE c REGEXP_LIKE('it''s, ok')")
+        assert occ.pattern == "it's, ok"
+
+    def test_quoted_identifier_with_comma(self):
+        [occ] = find_regexp_patterns('WHERE REGEXP_LIKE("a,b", \'x\')')
+        assert (occ.form, occ.column, occ.pattern) == ("function", '"a,b"', "x")
+
+    def test_non_literal_pattern_ignored(self):
+        assert find_regexp_patterns("WHERE REGEXP_LIKE(c, p.pattern)") == []
+        assert find_regexp_patterns("WHERE c REGEXP_LIKE(:pat)") == []
+
+    def test_strings_and_comments_ignored(self):
+        sql = (
+            "SELECT 'c REGEXP_LIKE(''x'')' FROM t -- c REGEXP_LIKE('y')\n"
+            "WHERE c REGEXP_LIKE('z')"
+        )
+        assert [o.pattern for o in find_regexp_patterns(sql)] == ["z"]
+
+    def test_script_bodies_ignored(self):
+        sql = (
+            "CREATE SCRIPT s AS\n"
+            "  query([[SELECT * FROM t WHERE c REGEXP_LIKE('lua')]])\n"
+            "/\n"
+            "SELECT * FROM t WHERE c REGEXP_LIKE('sql');\n"
+        )
+        assert [o.pattern for o in find_regexp_patterns(sql)] == ["sql"]
+
+    def test_source_label(self):
+        [occ] = find_regexp_patterns("WHERE c REGEXP_LIKE('a')", source="q.sql")
+        assert occ.source == "q.sql"
+
+
+class TestCatalog:
+    def test_dedupes_by_pattern(self):
+        sql = (
+            "SELECT * FROM t WHERE a REGEXP_LIKE('x+') AND REGEXP_LIKE(b, 'x+')\n"
+            "  AND c REGEXP_LIKE('y')"
+        )
+        entries = build_catalog(find_regexp_patterns(sql))
+        assert [(e.pattern, e.count) for e in entries] == [("x+", 2), ("y", 1)]
+        assert [o.column for o in entries[0].occurrences] == ["a", "b"]
+
+    def test_across_sources(self):
+        occurrences = find_regexp_patterns("WHERE a REGEXP_LIKE('x')", "one.sql")
+        occurrences += find_regexp_patterns("WHERE b REGEXP_LIKE('x')", "two.sql")
+        [entry] = build_catalog(occurrences)
+        assert [o.source for o in entry.occurrences] == ["one.sql", "two.sql"]
+
+    def test_compile_error_reported(self):
+        [entry] = build_catalog(find_regexp_patterns("WHERE a REGEXP_LIKE('(ab')"))
+        assert entry.error is not None
+        assert compile_error("ab") is None
+
+    def test_compile_check_cached(self):
+        compile_error.cache_clear()
+        compile_error("a{2}")
+        compile_error("a{2}")
+        assert compile_error.cache_info().hits == 1
+
+
+class TestBacktrackingRisks:
+    @pytest.mark.parametrize("pattern", [
+        "(a+)+", "(a*)*", "^(\\w+\\s?)*$", "(?:[a-z]+,)+x", "((ab)*c)+", "(.*){2,}",
+    ])
+    def test_nested_quantifier(self, pattern):
+        assert "nested-quantifier" in backtracking_risks(pattern)
+
+    @pytest.mark.parametrize("pattern", [
+        "^a+$", "(ab)+", "(a+){3}", "(a+)?", "[(a+)]+", "\\(a+\\)+", "(\\d{2})*", "a.*b.*c",
+    ])
+    def test_safe(self, pattern):
+        assert backtracking_risks(pattern) == ()
+
+    def test_adjacent_wildcards(self):
+        assert backtracking_risks("^.*.+x$") == ("adjacent-wildcards",)
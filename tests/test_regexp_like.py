@@ -1,5 +1,7 @@
 """Tests for Handler 5: REGEXP_LIKE infix normalization."""
 
+import pytest
+
 from exasol_sql_normalizer.handlers.regexp_like import normalize_regexp_like
 
 
@@ -28,6 +30,20 @@ class TestRegexpLikeEdgeCases:
         result = normalize_regexp_like(sql)
         assert result == sql
 
+    @pytest.mark.parametrize("sql", [
+        "SELECT DISTINCT REGEXP_LIKE(name, '^a') FROM t",
+        "SELECT a FROM t ORDER BY REGEXP_LIKE(name, '^a')",
+        "SELECT a FROM t GROUP BY REGEXP_LIKE(name, '^a')",
+        "SELECT x REGEXP_LIKE(name, '^a') FROM t",
+    ])
+    def test_function_syntax_after_keyword_or_column_unchanged(self, sql):
+        """Two arguments mean function syntax, whatever word comes before."""
+        assert normalize_regexp_like(sql) == sql
+
+    def test_distinct_column(self):
+        sql = "SELECT DISTINCT name REGEXP_LIKE('^a') FROM t"
+        assert normalize_regexp_like(sql) == "SELECT DISTINCT REGEXP_LIKE(name, '^a') FROM t"
+
     def test_regexp_like_in_string_not_matched(self):
         sql = "SELECT 'col REGEXP_LIKE pattern' AS label FROM t"
         result = normalize_regexp_like(sql)
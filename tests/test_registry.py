@@ -0,0 +1,111 @@
+"""Tests for the handler registry and pipeline construction."""
+
+import pytest
+
+from exasol_sql_normalizer import (
+    build_pipeline,
+    handler_names,
+    normalize,
+    register_handler,
+    unregister_handler,
+)
+
+
+@pytest.fixture
+def scratch_handlers():
+    """Unregister any handlers a test registers."""
+    registered: list[str] = []
+    yield registered
+    for name in registered:
+        unregister_handler(name)
+
+
+class TestBuiltinPipeline:
+    def test_default_order(self):
+        names = [h.name for h in build_pipeline()]
+        assert names == [
+            "export_into",
+            "import_into",
+            "import_from",
+            "group_concat",
+            "convert",
+            "regexp_like",
+        ]
+
+    def test_builtins_registered(self):
+        assert set(handler_names()) >= {
+            "export_into", "import_into", "import_from",
+            "group_concat", "convert", "regexp_like",
+        }
+
+    def test_subset_keeps_constraints(self):
+        names = [h.name for h in build_pipeline({"convert", "group_concat"})]
+        assert names == ["group_concat", "convert"]
+
+    def test_unknown_handler_raises(self):
+        with pytest.raises(ValueError, match="no_such_handler"):
+            build_pipeline({"no_such_handler"})
+
+
+class TestHandlerSubset:
+    def test_only_selected_handlers_run(self):
+        sql = "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t WHERE b REGEXP_LIKE('x')"
+        result = normalize(sql, handlers={"convert"})
+        assert "CAST(a AS VARCHAR(10))" in result
+        assert "b REGEXP_LIKE('x')" in result
+
+    def test_empty_subset_is_identity(self):
+        sql = "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t"
+        assert normalize(sql, handlers=set()) == sql
+
+    def test_convert_without_group_concat_keeps_separator(self):
+        sql = "SELECT CONVERT(VARCHAR(10) UTF8, GROUP_CONCAT(a SEPARATOR '|')) FROM t"
+        result = normalize(sql, handlers={"convert"})
+        assert result == "SELECT CAST(GROUP_CONCAT(a SEPARATOR '|') AS VARCHAR(10)) FROM t"
+
+
+class TestCustomHandlers:
+    def test_plugin_handler_runs_in_declared_position(self, scratch_handlers):
+        seen = []
+
+        def mark(sql):
+            seen.append(sql)
+            return sql.replace("CONNECT_BY_ROOT", "ROOT")
+
+        register_handler(
+            "connect_by_root", mark,
+            triggers=("CONNECT_BY_ROOT",), after=("regexp_like",),
+        )
+        scratch_handlers.append("connect_by_root")
+
+        assert [h.name for h in build_pipeline()][-1] == "connect_by_root"
+        assert normalize("SELECT CONNECT_BY_ROOT a FROM t") == "SELECT ROOT a FROM t"
+
+    def test_trigger_absent_skips_handler(self, scratch_handlers):
+        calls = []
+        register_handler("spy", lambda sql: calls.append(sql) or sql, triggers=("MERGE",))
+        scratch_handlers.append("spy")
+
+        normalize("SELECT 1")
+        assert calls == []
+        normalize("merge into t using s on 1=1")
+        assert len(calls) == 1
+
+    def test_handler_without_triggers_always_runs(self, scratch_handlers):
+        register_handler("upper", str.upper)
+        scratch_handlers.append("upper")
+        assert normalize("select 1", handlers={"upper"}) == "SELECT 1"
+
+    def test_duplicate_name_rejected(self):
+        with pytest.raises(ValueError, match="already registered"):
+            register_handler("convert", str.upper)
+
+    def test_cycle_detected(self, scratch_handlers):
+        register_handler("a", str.lower, before=("b",))
+        scratch_handlers.append("a")
+        register_handler("b", str.lower, before=("a",))
+        scratch_handlers.append("b")
+        with pytest.raises(ValueError, match="cycle"):
+            build_pipeline({"a", "b"})
+        # Unrelated pipelines are unaffected
+        assert [h.name for h in build_pipeline({"a"})] == ["a"]
@@ -0,0 +1,154 @@
+"""Tests for declarative rewrite rules and the single-scan matcher."""
+
+import pytest
+
+from exasol_sql_normalizer import handler_names, normalize, unregister_handler
+from exasol_sql_normalizer.rules import (
+    BUILTIN_RULES,
+    FILTERS,
+    Rule,
+    compile_rules,
+    register_rules,
+)
+
+BUILTIN = compile_rules(BUILTIN_RULES)
+
+
+def _apply(pattern, template, sql):
+    return compile_rules([Rule("r", pattern, template)])(sql)
+
+
+class TestPatterns:
+    def test_keywords_are_case_insensitive_whole_words(self):
+        pattern, template = "NVL ( {a:body} )", "COALESCE({a})"
+        assert _apply(pattern, template, "SELECT nvl (x, 0)") == "SELECT COALESCE(x, 0)"
+        assert _apply(pattern, template, "SELECT my_nvl(x, 0)") == "SELECT my_nvl(x, 0)"
+
+    def test_alternative_keywords(self):
+        pattern, template = "TO_CHAR ( {v:word} FORMAT|FMT {f:string} )", "FORMAT({v}, '{f}')"
+        assert _apply(pattern, template, "TO_CHAR(d FMT 'yy')") == "FORMAT(d, 'yy')"
+
+    def test_arguments_split_at_top_level_comma(self):
+        pattern = "ADD_DAYS ( {date:expr} , {days:expr} )"
+        template = "DATEADD(day, {days|strip}, {date|strip})"
+        sql = "SELECT ADD_DAYS(f(a, ','), 3)"
+        assert _apply(pattern, template, sql) == "SELECT DATEADD(day, 3, f(a, ','))"
+
+    def test_expr_must_not_be_blank(self):
+        pattern, template = "F ( {a:expr} )", "G({a})"
+        assert _apply(pattern, template, "F( )") == "F( )"
+
+    def test_optional_clause(self):
+        pattern = "CAST_TO ( {t:word} [{size:parens}] )"
+        template = "{t}{size}"
+        assert _apply(pattern, template, "CAST_TO(INT)") == "INT"
+        assert _apply(pattern, template, "CAST_TO(VARCHAR (10))") == "VARCHAR(10)"
+
+    def test_string_capture_is_unescaped(self):
+        pattern, template = "LABEL {s:string}", "/* {s} */"
+        assert _apply(pattern, template, "LABEL 'it''s'") == "/* it's */"
+
+    def test_through_semi(self):
+        pattern, template = "OPTS {rest:through_semi}", "--"
+        assert _apply(pattern, template, "OPTS a = ';' b; SELECT 1") == "-- SELECT 1"
+
+    def test_unbalanced_group_does_not_match(self):
+        assert _apply("F ( {a:body} )", "G({a})", "F(a, (b)") == "F(a, (b)"
+
+    def test_keywords_in_literals_and_comments_are_skipped(self):
+        sql = "SELECT 'NVL(a)', \"NVL\" -- NVL(b)\n"
+        assert _apply("NVL ( {a:body} )", "COALESCE({a})", sql) == sql
+
+    def test_anchor_as_written(self):
+        assert _apply("NVL ( {a:body} )", "{keyword}2({a})", "nvl(x)") == "nvl2(x)"
+
+    def test_nested_matches_are_rewritten(self):
+        assert _apply("NVL ( {a:body} )", "COALESCE({a})", "NVL(NVL(a, b), c)") == (
+            "COALESCE(COALESCE(a, b), c)"
+        )
+
+
+class TestCompileErrors:
+    @pytest.mark.parametrize("pattern, template", [
+        ("F ( {a:blob} )", "{a}"),
+        ("F ( {a:body}", "{a}"),
+        ("F {a:body} )", "{a}"),
+        ("F [ {a:word}", "{a}"),
+        ("F ( {a:body} {b:word} )", "{a}"),
+        ("{a:word} F", "{a}"),
+        ("F {a:word} {b:operand}", "{a}"),
+        ("F ( {a:body} )", "{b}"),
+        ("F ( {a:body} )", "{a|shout}"),
+        ("F {a:word} {a:word}", "{a}"),
+        ("F {keyword:word}", ""),
+    ])
+    def test_malformed_rule(self, pattern, template):
+        with pytest.raises(ValueError):
+            compile_rules([Rule("bad", pattern, template)])
+
+
+class TestFilters:
+    def test_column_names_skip_quoted_commas(self):
+        defs = "a VARCHAR(5) DEFAULT 'x,y', \"b,c\" DECIMAL(18, 2)"
+        assert FILTERS["column_names"](defs, None) == "a, b,c"
+
+
+class TestBuiltinRules:
+    @pytest.mark.parametrize("sql", [
+        "SELECT * FROM (IMPORT INTO (a INT, \"b c\" VARCHAR(10)) FROM JDBC AT CON "
+        "STATEMENT 'SELECT a, b FROM dbo.t JOIN dbo.u ON 1=1') x",
+        "SELECT * FROM (IMPORT INTO (a VARCHAR(5) DEFAULT 'x,y', b INT) "
+        "FROM JDBC AT CON STATEMENT 'SELECT a, b FROM t')",
+        "SELECT * FROM (IMPORT FROM JDBC AT CON STATEMENT 'SELECT a FROM dbo.u')",
+        "SELECT * FROM (IMPORT FROM JDBC AT CON)",
+        "EXPORT (\n  SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM t')\n) "
+        "INTO SCRIPT s.e WITH A = 'x;y' B = 'z';",
+        "SELECT k, group_concat(DISTINCT v ORDER BY v SEPARATOR '|') FROM t GROUP BY k",
+        "SELECT CONVERT(VARCHAR(10000) UTF8, GROUP_CONCAT(a SEPARATOR ',')), "
+        "CONVERT(CHAR ASCII, b), CONVERT(VARCHAR(10), c, 120) FROM t",
+        "SELECT * FROM t WHERE t.name REGEXP_LIKE('^a') AND REGEXP_LIKE(b, 'x')",
+        "SELECT 1 FROM t",
+        "SELECT DISTINCT name REGEXP_LIKE('^a') FROM t",
+        "SELECT DISTINCT REGEXP_LIKE(name, '^a') FROM t",
+        "SELECT a FROM t ORDER BY name REGEXP_LIKE('^a')",
+        "SELECT a FROM t ORDER BY REGEXP_LIKE(name, '^a')",
+        "SELECT COUNT(*) FROM t GROUP BY REGEXP_LIKE(name, '^a')",
+        "SELECT * FROM t WHERE x IS NOT NULL AND REGEXP_LIKE(name, '^a')",
+        "SELECT * FROM t WHERE c " + " " * 300 + "REGEXP_LIKE('x')",
+    ])
+    def test_same_output_as_handlers(self, sql):
+        assert BUILTIN(sql) == normalize(sql)
+        assert BUILTIN(BUILTIN(sql)) == BUILTIN(sql)
+
+    def test_keywords(self):
+        assert set(BUILTIN.keywords) == {
+            "EXPORT", "IMPORT", "GROUP_CONCAT", "CONVERT", "REGEXP_LIKE",
+        }
+
+    def test_edits_are_sorted_and_disjoint(self):
+        sql = "SELECT CONVERT(CHAR ASCII, a), b REGEXP_LIKE('x') FROM (IMPORT FROM JDBC AT C)"
+        edits = BUILTIN.edits(sql)
+        assert len(edits) == 3
+        assert all(e1[1] <= e2[0] for e1, e2 in zip(edits, edits[1:]))
+
+
+class TestRegisterRules:
+    def test_registers_one_handler(self):
+        register_rules("date_arithmetic", [
+            Rule("add_days", "ADD_DAYS ( {d:expr} , {n:expr} )", "DATEADD(day, {n|strip}, {d|strip})"),
+        ], after=("convert",))
+        try:
+            assert "date_arithmetic" in handler_names()
+            result = normalize("SELECT ADD_DAYS(CONVERT(DATE UTF8, x), 3)", report=True)
+            assert result.sql == "SELECT DATEADD(day, 3, CAST(x AS DATE))"
+            assert result.rewrites["date_arithmetic"] == 1
+        finally:
+            unregister_handler("date_arithmetic")
+
+    def test_script_bodies_are_not_rewritten(self):
+        register_rules("builtin_rules", BUILTIN_RULES)
+        try:
+            sql = "CREATE SCRIPT s AS\n  x REGEXP_LIKE('lua')\n/\nSELECT c REGEXP_LIKE('sql');\n"
+            assert normalize(sql, {"builtin_rules"}) == normalize(sql)
+        finally:
+            unregister_handler("builtin_rules")
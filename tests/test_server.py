@@ -0,0 +1,205 @@
+"""Tests for the normalization server (HTTP and Unix-socket transports)."""
+
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from exasol_sql_normalizer import BudgetExceeded, Guard, metrics, normalize
+from exasol_sql_normalizer.server import (
+    NormalizationService,
+    ServiceBusy,
+    call_unix,
+    make_server,
+)
+
+_SQL = "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t WHERE b REGEXP_LIKE('x')"
+
+
+def _crash(sqls):
+    raise BrokenProcessPool("a worker died")
+
+
+@pytest.fixture(scope="module")
+def service():
+    svc = NormalizationService(workers=2, max_pending=4)
+    yield svc
+    svc.close()
+
+
+@pytest.fixture
+def running(service):
+    """Start a server in a background thread; yields a factory."""
+    servers = []
+
+    def start(**kwargs):
+        server = make_server(service, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class TestService:
+    def test_batch_preserves_order(self, service):
+        sqls = [f"SELECT x{i} REGEXP_LIKE('a') FROM t" for i in range(10)]
+        assert service.normalize_batch(sqls) == [normalize(s) for s in sqls]
+
+    def test_empty_batch(self, service):
+        assert service.normalize_batch([]) == []
+
+    def test_stats_count_requests(self, service):
+        before = service.stats()["requests"]
+        service.handle({"sql": _SQL})
+        stats = service.stats()
+        assert stats["requests"] == before + 1
+        assert stats["workers"] == 2
+        assert stats["in_flight"] == 0
+
+    def test_rejects_when_queue_full(self, service):
+        for _ in range(service.max_pending):
+            service._slots.acquire()
+        try:
+            with pytest.raises(ServiceBusy):
+                service.normalize_batch([_SQL])
+        finally:
+            for _ in range(service.max_pending):
+                service._slots.release()
+        assert service.stats()["rejected"] >= 1
+
+    def test_invalid_request(self, service):
+        with pytest.raises(ValueError):
+            service.handle({"batch": "not a list"})
+        with pytest.raises(ValueError):
+            service.handle({"op": "explode"})
+
+
+class TestUnixTransport:
+    def test_single_batch_health_stats(self, running, tmp_path):
+        path = str(tmp_path / "norm.sock")
+        running(unix_path=path)
+
+        assert call_unix(path, {"op": "normalize", "sql": _SQL}) == {"sql": normalize(_SQL)}
+        assert call_unix(path, {"op": "normalize", "batch": [_SQL, "SELECT 1"]}) == {
+            "batch": [normalize(_SQL), "SELECT 1"],
+        }
+        assert call_unix(path, {"op": "health"}) == {"status": "ok"}
+        assert "requests" in call_unix(path, {"op": "stats"})
+
+    def test_error_response(self, running, tmp_path):
+        path = str(tmp_path / "norm.sock")
+        running(unix_path=path)
+        assert "error" in call_unix(path, {"op": "normalize", "sql": 42})
+
+    def test_internal_error_response(self, running, tmp_path, service, monkeypatch):
+        path = str(tmp_path / "norm.sock")
+        running(unix_path=path)
+        monkeypatch.setattr(service, "normalize_batch", _crash)
+        response = call_unix(path, {"op": "normalize", "sql": _SQL})
+        assert response["error"] == "internal"
+        assert "BrokenProcessPool" in response["detail"]
+        assert call_unix(path, {"op": "health"}) == {"status": "ok"}
+
+    def test_replaces_stale_socket(self, running, tmp_path):
+        path = str(tmp_path / "norm.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(path)
+        running(unix_path=path)
+        assert call_unix(path, {"op": "health"}) == {"status": "ok"}
+
+    def test_refuses_to_remove_regular_file(self, service, tmp_path):
+        path = tmp_path / "norm.sock"
+        path.write_text("keep me")
+        with pytest.raises(FileExistsError):
+            make_server(service, unix_path=str(path))
+        assert path.read_text() == "keep me"
+
+
+class TestHTTPTransport:
+    def _url(self, server, path):
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def test_normalize_and_health(self, running):
+        server = running(port=0)
+        body = json.dumps({"batch": [_SQL]}).encode()
+        with urllib.request.urlopen(self._url(server, "/normalize"), data=body) as resp:
+            assert json.load(resp) == {"batch": [normalize(_SQL)]}
+        with urllib.request.urlopen(self._url(server, "/health")) as resp:
+            assert json.load(resp) == {"status": "ok"}
+        with urllib.request.urlopen(self._url(server, "/stats")) as resp:
+            assert json.load(resp)["workers"] == 2
+
+    def test_metrics_disabled(self, running):
+        server = running(port=0)
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(self._url(server, "/metrics"))
+        assert excinfo.value.code == 404
+
+    def test_bad_request(self, running):
+        server = running(port=0)
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(self._url(server, "/normalize"), data=b"[1, 2]")
+        assert excinfo.value.code == 400
+
+    def test_negative_content_length(self, running):
+        server = running(port=0)
+        with socket.create_connection(server.server_address[:2]) as sock:
+            sock.sendall(
+                b"POST /normalize HTTP/1.1\r\nHost: x\r\nContent-Length: -5\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            response = sock.makefile("rb").read()
+        assert response.startswith(b"HTTP/1.1 400 ")
+
+    def test_internal_error(self, running, service, monkeypatch):
+        server = running(port=0)
+        monkeypatch.setattr(service, "normalize_batch", _crash)
+        body = json.dumps({"sql": _SQL}).encode()
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(self._url(server, "/normalize"), data=body)
+        assert excinfo.value.code == 500
+        assert json.load(excinfo.value)["error"] == "internal"
+
+
+class TestMetrics:
+    @pytest.fixture
+    def metered(self):
+        metrics.reset()
+        svc = NormalizationService(workers=2, metrics=True)
+        server = make_server(svc, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield svc, server
+        server.shutdown()
+        server.server_close()
+        svc.close()
+        metrics.disable()
+        metrics.reset()
+
+    def test_worker_counts_reach_metrics_endpoint(self, metered):
+        service, server = metered
+        service.normalize_batch([_SQL, _SQL, "SELECT 1"])
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            text = resp.read().decode()
+        assert "sqlnorm_calls_total 3" in text
+        assert 'sqlnorm_rewrites_total{handler="convert"} 2' in text
+        assert service.handle({"op": "metrics"})["metrics"].startswith("# HELP")
+
+    def test_guard_trip_counted_once(self, metered):
+        service, _ = metered
+        service.guard = Guard(max_rewrites=1)
+        with pytest.raises(BudgetExceeded):
+            service.normalize_batch([_SQL])
+        service.guard = None
+        service.normalize_batch(["SELECT 1"])
+        assert metrics.snapshot()["guard_trips"] == {"rewrite": 1}
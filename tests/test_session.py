@@ -0,0 +1,137 @@
+"""Tests for incremental re-normalization sessions."""
+
+import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+import pytest
+
+from exasol_sql_normalizer import NormalizerSession, normalize, split_statements
+from exasol_sql_normalizer.session import _Offsets
+
+_STATEMENTS = [
+    "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t;\n",
+    "SELECT * FROM (IMPORT FROM JDBC AT CON STATEMENT 'SELECT 1 FROM dbo.x');\n",
+    "SELECT GROUP_CONCAT(a SEPARATOR '|') FROM t WHERE b REGEXP_LIKE('[0-9]');\n",
+    "EXPORT(SELECT a FROM t) INTO SCRIPT s.exp WITH BUCKET = 'gs://b/';\n",
+    "SELECT 'a;b', \"c;d\" FROM t;\n",
+    "CREATE LUA SCRIPT s.l() AS\n  x = 'CONVERT(VARCHAR(1) UTF8, y)';\n/\n",
+]
+
+
+def _buffer(n=20):
+    return "".join(_STATEMENTS[i % len(_STATEMENTS)] for i in range(n))
+
+
+class TestSessionBasics:
+    def test_initial_output_matches_normalize(self):
+        text = _buffer()
+        session = NormalizerSession(text)
+        assert session.text == text
+        assert session.output == normalize(text)
+
+    def test_edit_inside_statement(self):
+        text = _buffer(5)
+        session = NormalizerSession(text)
+        old_output = session.output
+        pos = text.index("VARCHAR(10)") + len("VARCHAR(")
+        out_start, out_end, replacement = session.edit(pos, pos + 2, "99")
+
+        assert "VARCHAR(99)" in session.output
+        assert old_output[:out_start] + replacement + old_output[out_end:] == session.output
+        # Only the first statement is reported as changed
+        assert out_end <= len(normalize(_STATEMENTS[0]))
+
+    def test_edit_returns_changed_range(self):
+        session = NormalizerSession("SELECT 1;\nSELECT 2;\nSELECT 3;")
+        out_start, out_end, replacement = session.edit(17, 18, "CONVERT(VARCHAR(1) UTF8, x)")
+        assert session.output == (
+            "SELECT 1;\nSELECT CAST(x AS VARCHAR(1));\nSELECT 3;"
+        )
+        assert (out_start, out_end) == (9, 19)
+        assert replacement == "\nSELECT CAST(x AS VARCHAR(1));"
+
+    def test_deleting_semicolon_merges_statements(self):
+        session = NormalizerSession("SELECT a; REGEXP_LIKE('x')")
+        session.edit(8, 9, "")
+        assert session.output == normalize("SELECT a REGEXP_LIKE('x')")
+
+    def test_opening_quote_extends_region(self):
+        text = "SELECT 1;\nSELECT 2;\nSELECT CONVERT(VARCHAR(1) UTF8, x);"
+        session = NormalizerSession(text)
+        session.edit(7, 7, "'")
+        assert session.output == normalize(session.text)
+
+    def test_text_after_script_terminator(self):
+        text = "CREATE SCRIPT s AS\nimport x;\n/\nIMPORT FROM JDBC AT c STATEMENT 'select 1 from t'"
+        session = NormalizerSession(text)
+        assert session.output == normalize(text)
+        pos = text.index("/") + 1
+        session.edit(pos, pos, "b")
+        assert session.output == normalize(session.text)
+        session.edit(pos, pos + 1, "")
+        assert session.output == normalize(text)
+
+    def test_edit_on_empty_buffer(self):
+        session = NormalizerSession("")
+        assert session.edit(0, 0, "SELECT x REGEXP_LIKE('y')") == (
+            0, 0, "SELECT REGEXP_LIKE(x, 'y')",
+        )
+
+    def test_out_of_range_edit_raises(self):
+        session = NormalizerSession("SELECT 1")
+        with pytest.raises(ValueError):
+            session.edit(5, 50, "")
+
+    def test_script_body_kept_verbatim(self):
+        session = NormalizerSession(_buffer(6))
+        assert _STATEMENTS[5] in session.output
+        session.edit(0, 0, "SELECT 1;\n")
+        assert _STATEMENTS[5] in session.output
+
+    def test_handler_subset(self):
+        session = NormalizerSession(_buffer(5), handlers={"regexp_like"})
+        assert "CONVERT(VARCHAR(10) UTF8, a)" in session.output
+        assert "REGEXP_LIKE(b, '[0-9]')" in session.output
+
+
+class TestSessionRandomEdits:
+    def test_random_edits_match_full_normalization(self):
+        rng = random.Random(1234)
+        fragments = ["", ";", "'", "(", ")", " x ", "CONVERT(VARCHAR(3) UTF8, y)",
+                     " REGEXP_LIKE('z')", "IMPORT", "\n", "\n/\n", "\nCREATE SCRIPT "]
+        session = NormalizerSession(_buffer(12))
+        output = session.output
+        for _ in range(300):
+            text = session.text
+            start = rng.randint(0, len(text))
+            end = min(len(text), start + rng.randint(0, 12))
+            out_start, out_end, replacement = session.edit(start, end, rng.choice(fragments))
+            output = output[:out_start] + replacement + output[out_end:]
+
+            expected = "".join(
+                normalize(session.text[s:e]) for s, e in split_statements(session.text)
+            )
+            assert session.output == expected
+            assert output == session.output
+
+
+class TestOffsets:
+    def test_matches_bisect_over_prefix_sums(self):
+        rng = random.Random(99)
+        lengths = [rng.randint(1, 9) for _ in range(37)]
+        offsets = _Offsets(list(lengths))
+        for _ in range(200):
+            first = rng.randint(0, len(lengths))
+            stop = min(len(lengths), first + rng.randint(0, 3))
+            k = stop - first if rng.random() < 0.7 else rng.randint(0, 4)
+            new = [rng.randint(1, 9) for _ in range(k)]
+            lengths[first:stop] = new
+            offsets.replace(first, stop, new)
+
+            ends = list(accumulate(lengths))
+            assert offsets.total == (ends[-1] if ends else 0)
+            assert [offsets.end(i) for i in range(-1, len(ends))] == [0, *ends]
+            for pos in range(offsets.total + 2):
+                assert offsets.count_upto(pos) == bisect_right(ends, pos)
+                assert offsets.count_below(pos) == bisect_left(ends, pos)
@@ -0,0 +1,244 @@
+"""Tests for sharded corpus runs and merging their outputs."""
+
+import json
+
+import pytest
+
+from exasol_sql_normalizer import normalize
+from exasol_sql_normalizer.cli import main
+from exasol_sql_normalizer.sharding import (
+    MANIFEST,
+    corpus_files,
+    merge_shards,
+    plan_shards,
+    run_shard,
+)
+
+_STATEMENTS = (
+    "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t{i};\n",
+    "SELECT GROUP_CONCAT(a SEPARATOR ',') FROM t{i};\n",
+    "SELECT a FROM t{i} WHERE a > {i};\n",
+)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    for i in range(12):
+        path = root / f"d{i % 3}" / f"q{i}.sql"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(_STATEMENTS[i % 3].format(i=i) * (i + 1))
+    (root / "notes.txt").write_text("not sql")
+    return root
+
+
+def _run_all(root, tmp_path, count, **kwargs):
+    dirs = [tmp_path / f"shard{k}" for k in range(count)]
+    for k, directory in enumerate(dirs):
+        run_shard(str(root), str(directory), k, count, workers=1, **kwargs)
+    return [str(d) for d in dirs]
+
+
+class TestPlan:
+    def test_corpus_files(self, corpus):
+        files = corpus_files(str(corpus))
+        assert len(files) == 12
+        assert files == sorted(files)
+        assert ("d0/q0.sql", len(_STATEMENTS[0].format(i=0))) in files
+
+    @pytest.mark.parametrize("strategy", ["hash", "size"])
+    def test_partition_covers_corpus_once(self, corpus, strategy):
+        files = corpus_files(str(corpus))
+        plan = plan_shards(files, 4, strategy)
+        assert len(plan) == 4
+        assert sorted(path for paths in plan for path in paths) == [path for path, _ in files]
+        assert plan == plan_shards(list(reversed(files)), 4, strategy)
+
+    def test_hash_keeps_files_in_their_shard(self, corpus):
+        files = corpus_files(str(corpus))
+        before = plan_shards(files, 3)
+        after = plan_shards(files + [("new/x.sql", 10)], 3)
+        for old, new in zip(before, after):
+            assert set(old) <= set(new)
+
+    def test_size_balances_bytes(self):
+        files = [(f"f{i}.sql", size) for i, size in enumerate([90, 50, 40, 30, 30, 20, 20, 10, 10])]
+        sizes = dict(files)
+        loads = [sum(sizes[p] for p in paths) for paths in plan_shards(files, 3, "size")]
+        assert max(loads) - min(loads) <= 10
+
+    @pytest.mark.parametrize("count, strategy", [(0, "hash"), (2, "random")])
+    def test_bad_arguments(self, count, strategy):
+        with pytest.raises(ValueError):
+            plan_shards([], count, strategy)
+
+
+class TestRunShard:
+    def test_output_and_manifest(self, corpus, tmp_path):
+        out = tmp_path / "out"
+        manifest = run_shard(str(corpus), str(out), 0, 1, workers=1)
+        assert json.loads((out / MANIFEST).read_text()) == manifest
+        assert manifest["stats"]["files"] == 12
+        assert manifest["stats"]["changed"] == 8
+        assert manifest["stats"]["rewrites"] == {"convert": 22, "group_concat": 26}
+        for path, _ in corpus_files(str(corpus)):
+            assert (out / path).read_text() == normalize((corpus / path).read_text())
+
+    def test_outputs_under_root_are_not_corpus(self, corpus):
+        run_shard(str(corpus), str(corpus / "out"), 0, 1, workers=1)
+        assert len(corpus_files(str(corpus))) == 12
+
+    def test_undecodable_file_is_an_error(self, corpus, tmp_path):
+        (corpus / "bad.sql").write_bytes(b"SELECT '\xff';")
+        manifest = run_shard(str(corpus), str(tmp_path / "out"), 0, 1, workers=1)
+        [entry] = [e for e in manifest["files"] if "error" in e]
+        assert entry["path"] == "bad.sql"
+        assert manifest["stats"]["errors"] == 1
+
+    def test_unwritable_output_is_an_error(self, corpus, tmp_path):
+        out = tmp_path / "out"
+        (out / "d0" / "q0.sql").mkdir(parents=True)
+        manifest = run_shard(str(corpus), str(out), 0, 1, workers=1)
+        [entry] = [e for e in manifest["files"] if "error" in e]
+        assert entry["path"] == "d0/q0.sql"
+        assert manifest["stats"]["files"] == 12
+
+    def test_line_endings_preserved(self, corpus, tmp_path):
+        text = "SELECT GROUP_CONCAT(a SEPARATOR ',')\r\nFROM t;\r\n"
+        (corpus / "crlf.sql").write_bytes(text.encode())
+        run_shard(str(corpus), str(tmp_path / "out"), 0, 1, workers=1)
+        output = (tmp_path / "out" / "crlf.sql").read_bytes()
+        assert output == normalize(text).encode()
+        assert output.count(b"\r\n") == 2
+
+    def test_bad_index(self, corpus, tmp_path):
+        with pytest.raises(ValueError):
+            run_shard(str(corpus), str(tmp_path / "out"), 2, 2)
+
+    def test_worker_processes(self, corpus, tmp_path):
+        single = run_shard(str(corpus), str(tmp_path / "a"), 0, 1, workers=1)
+        pooled = run_shard(str(corpus), str(tmp_path / "b"), 0, 1, workers=2)
+        assert single["files"] == pooled["files"]
+
+
+class TestMerge:
+    @pytest.mark.parametrize("strategy", ["hash", "size"])
+    def test_complete_merge_equals_single_run(self, corpus, tmp_path, strategy):
+        dirs = _run_all(corpus, tmp_path, 3, strategy=strategy)
+        single = run_shard(str(corpus), str(tmp_path / "single"), 0, 1, workers=1)
+        report = merge_shards(dirs, str(tmp_path / "merged"), root=str(corpus))
+        assert report.ok, report.problems
+        assert (report.shards, report.files, report.changed) == (3, 12, 8)
+        assert report.rewrites == single["stats"]["rewrites"]
+        merged = json.loads((tmp_path / "merged" / MANIFEST).read_text())
+        assert merged["files"] == single["files"]
+        assert merged["merged"] == [0, 1, 2]
+        for path, _ in corpus_files(str(corpus)):
+            assert (tmp_path / "merged" / path).read_text() == (tmp_path / "single" / path).read_text()
+
+    def test_missing_shard(self, corpus, tmp_path):
+        dirs = _run_all(corpus, tmp_path, 3)
+        report = merge_shards(dirs[:2], str(tmp_path / "merged"))
+        assert report.problems == ["missing shard(s): 2 of 3"]
+
+    def test_duplicate_shard(self, corpus, tmp_path):
+        dirs = _run_all(corpus, tmp_path, 2)
+        report = merge_shards(dirs + dirs[:1], str(tmp_path / "merged"))
+        assert any("shard 0 appears in" in p for p in report.problems)
+        assert any("processed by shards 0 and 0" in p for p in report.problems)
+
+    def test_altered_output(self, corpus, tmp_path):
+        dirs = _run_all(corpus, tmp_path, 2, strategy="size")
+        manifest = json.loads((tmp_path / "shard1" / MANIFEST).read_text())
+        path = manifest["files"][0]["path"]
+        (tmp_path / "shard1" / path).write_text("SELECT 0;\n")
+        report = merge_shards(dirs, str(tmp_path / "merged"))
+        assert report.problems == [f"{path}: output in {dirs[1]} does not match its manifest"]
+
+    def test_different_plans(self, corpus, tmp_path):
+        run_shard(str(corpus), str(tmp_path / "a"), 0, 2, workers=1)
+        run_shard(str(corpus), str(tmp_path / "b"), 1, 2, strategy="size", workers=1)
+        report = merge_shards([str(tmp_path / "a"), str(tmp_path / "b")], str(tmp_path / "merged"))
+        assert any("strategy differs" in p for p in report.problems)
+
+    def test_corpus_changed_since_sharding(self, corpus, tmp_path):
+        dirs = _run_all(corpus, tmp_path, 2)
+        (corpus / "late.sql").write_text("SELECT 1;\n")
+        report = merge_shards(dirs, str(tmp_path / "merged"), root=str(corpus))
+        assert any("corpus under" in p for p in report.problems)
+        assert any(p.startswith("late.sql: not processed") for p in report.problems)
+
+    def test_errors_are_reported(self, corpus, tmp_path):
+        (corpus / "bad.sql").write_bytes(b"\xff")
+        dirs = _run_all(corpus, tmp_path, 2)
+        report = merge_shards(dirs, str(tmp_path / "merged"))
+        assert report.problems == []
+        assert [path for path, _ in report.errors] == ["bad.sql"]
+        assert not report.ok
+
+    def test_suffix_used_when_replanning(self, corpus, tmp_path):
+        for i in range(4):
+            (corpus / f"p{i}.psql").write_text(_STATEMENTS[i % 3].format(i=i))
+        dirs = _run_all(corpus, tmp_path, 2, suffix=".psql")
+        report = merge_shards(dirs, str(tmp_path / "merged"), root=str(corpus))
+        assert report.ok, report.problems
+        assert report.files == 4
+
+    @pytest.mark.parametrize("drop", ["shard", "stats", "corpus.digest", "files.0.output"])
+    def test_incomplete_manifest(self, corpus, tmp_path, drop):
+        dirs = _run_all(corpus, tmp_path, 2)
+        path = tmp_path / "shard1" / MANIFEST
+        manifest = json.loads(path.read_text())
+        *parents, key = drop.split(".")
+        node = manifest
+        for parent in parents:
+            node = node[int(parent)] if parent.isdigit() else node[parent]
+        del node[key]
+        path.write_text(json.dumps(manifest))
+        report = merge_shards(dirs, str(tmp_path / "merged"))
+        assert report.problems[0].startswith(f"{dirs[1]}: no readable manifest ({path}:")
+        assert "missing shard(s): 1 of 2" in report.problems
+
+    def test_no_manifest(self, tmp_path):
+        report = merge_shards([str(tmp_path)], str(tmp_path / "merged"))
+        assert report.problems[-1] == "no shards to merge"
+
+
+class TestCommands:
+    def test_list(self, corpus, capsys):
+        assert main(["shard", str(corpus), "--count", "2", "--list"]) == 0
+        rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert sorted(row["path"] for row in rows) == [p for p, _ in corpus_files(str(corpus))]
+        assert {row["shard"] for row in rows} == {0, 1}
+
+    def test_shard_and_merge(self, corpus, tmp_path, capsys):
+        for k in range(2):
+            out = str(tmp_path / f"s{k}")
+            assert main(["shard", str(corpus), "--count", "2", "--index", str(k),
+                         "--output", out, "--workers", "1"]) == 0
+        assert "shard 1 of 2:" in capsys.readouterr().err
+        merged = str(tmp_path / "merged")
+        argv = ["merge", str(tmp_path / "s0"), str(tmp_path / "s1"), "--output", merged]
+        assert main(argv + ["--root", str(corpus)]) == 0
+        assert "2 shards, 12 files" in capsys.readouterr().err
+        assert main(argv[:2] + argv[3:]) == 1
+        assert "missing shard(s): 1 of 2" in capsys.readouterr().err
+
+    def test_handlers_subset(self, corpus, tmp_path):
+        out = tmp_path / "out"
+        assert main(["--handlers", "convert", "shard", str(corpus), "--count", "1",
+                     "--index", "0", "--output", str(out), "--workers", "1"]) == 0
+        manifest = json.loads((out / MANIFEST).read_text())
+        assert manifest["handlers"] == ["convert"]
+        assert manifest["stats"]["rewrites"] == {"convert": 22}
+
+    def test_bad_arguments(self, corpus, capsys):
+        assert main(["shard", str(corpus), "--count", "2", "--index", "0"]) == 2
+        assert main(["shard", str(corpus), "--count", "0", "--list"]) == 2
+        assert "count must be positive" in capsys.readouterr().err
+
+    def test_merge_into_a_file(self, corpus, tmp_path, capsys):
+        dirs = _run_all(corpus, tmp_path, 1)
+        (tmp_path / "taken").write_text("")
+        assert main(["merge", *dirs, "--output", str(tmp_path / "taken")]) == 2
+        assert "taken" in capsys.readouterr().err
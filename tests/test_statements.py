@@ -0,0 +1,126 @@
+"""Tests for top-level statement splitting."""
+
+from exasol_sql_normalizer.statements import (
+    script_regions,
+    split_statements,
+    statement_ends,
+    statement_layout,
+)
+
+
+def _texts(sql):
+    return [sql[s:e] for s, e in split_statements(sql)]
+
+
+class TestSplitStatements:
+    def test_simple_split(self):
+        assert _texts("SELECT 1; SELECT 2;") == ["SELECT 1;", " SELECT 2;"]
+
+    def test_trailing_text_without_semicolon(self):
+        assert _texts("SELECT 1;\nSELECT 2") == ["SELECT 1;", "\nSELECT 2"]
+
+    def test_spans_cover_whole_text(self):
+        sql = "a; b; c"
+        spans = split_statements(sql)
+        assert spans[0][0] == 0
+        assert spans[-1][1] == len(sql)
+        assert all(prev[1] == cur[0] for prev, cur in zip(spans, spans[1:]))
+
+    def test_semicolon_in_string_not_split(self):
+        assert _texts("SELECT 'a;b'; SELECT 2") == ["SELECT 'a;b';", " SELECT 2"]
+
+    def test_escaped_quote_in_string(self):
+        assert _texts("SELECT 'it''s;'; x") == ["SELECT 'it''s;';", " x"]
+
+    def test_semicolon_in_quoted_identifier_not_split(self):
+        assert _texts('SELECT "a;b"; x') == ['SELECT "a;b";', " x"]
+
+    def test_semicolon_inside_parens_not_split(self):
+        sql = "EXPORT(SELECT 1; SELECT 2) INTO SCRIPT s.x WITH A = 'b'; SELECT 3"
+        assert _texts(sql) == [
+            "EXPORT(SELECT 1; SELECT 2) INTO SCRIPT s.x WITH A = 'b';",
+            " SELECT 3",
+        ]
+
+    def test_stray_close_paren_ignored(self):
+        assert _texts("SELECT 1); SELECT 2") == ["SELECT 1);", " SELECT 2"]
+
+    def test_empty(self):
+        assert split_statements("") == []
+
+
+class TestStatementEnds:
+    def test_clean_state(self):
+        assert statement_ends("a; b") == ([2], True)
+
+    def test_unterminated_string_is_not_clean(self):
+        assert statement_ends("a; 'b; c") == ([2], False)
+
+    def test_open_paren_is_not_clean(self):
+        assert statement_ends("a; (b; c") == ([2], False)
+
+
+_PY_SCRIPT = (
+    "CREATE OR REPLACE PYTHON3 SCALAR SCRIPT s.f(a VARCHAR(10)) RETURNS VARCHAR(10) AS\n"
+    "import re\n"
+    "def run(ctx):\n"
+    "    return 'it;s'\n"
+    "/\n"
+)
+
+
+class TestScriptRegions:
+    def test_script_is_one_statement(self):
+        sql = "SELECT 1;\n" + _PY_SCRIPT + "SELECT 2;"
+        assert _texts(sql) == ["SELECT 1;", "\n" + _PY_SCRIPT[:-1], "\nSELECT 2;"]
+
+    def test_region_spans_create_to_slash_line(self):
+        sql = "SELECT 1;\n" + _PY_SCRIPT
+        start = sql.index("CREATE")
+        assert script_regions(sql) == [(start, start + len(_PY_SCRIPT) - 1)]
+
+    def test_lua_script_without_language(self):
+        sql = "create script s.lua_prog() as\n  query([[SELECT 1]]);\n/"
+        assert script_regions(sql) == [(0, len(sql))]
+
+    def test_unterminated_script_runs_to_end(self):
+        sql = "CREATE JAVA SET SCRIPT s.j() EMITS (a INT) AS\nclass X {}"
+        assert script_regions(sql) == [(0, len(sql))]
+        assert statement_ends(sql) == ([], False)
+
+    def test_table_named_script_is_sql(self):
+        assert script_regions("CREATE TABLE script (a INT);") == []
+
+    def test_header_inside_string_ignored(self):
+        assert script_regions("SELECT '\nCREATE SCRIPT x AS\n/\n' FROM t") == []
+
+    def test_layout_matches_ends_and_regions(self):
+        sql = "SELECT 1;\n" + _PY_SCRIPT + "SELECT 2"
+        ends, regions = statement_layout(sql)
+        assert ends == statement_ends(sql)[0] + [len(sql)]
+        assert regions == script_regions(sql)
+
+    def test_crlf_slash_line(self):
+        sql = "CREATE LUA SCRIPT s.l() AS\r\nx = 1\r\n/\r\nSELECT 1;"
+        end = sql.index("/") + 1
+        assert script_regions(sql) == [(0, end)]
+
+    def test_export_into_script_is_sql(self):
+        assert script_regions("EXPORT(SELECT 1) INTO SCRIPT s.x WITH A = 'b';") == []
+
+
+class TestComments:
+    def test_semicolon_in_line_comment_not_split(self):
+        assert _texts("SELECT 1 -- a; b\n; SELECT 2") == ["SELECT 1 -- a; b\n;", " SELECT 2"]
+
+    def test_semicolon_in_block_comment_not_split(self):
+        assert _texts("SELECT /* ; */ 1; x") == ["SELECT /* ; */ 1;", " x"]
+
+    def test_quote_in_comment_does_not_open_string(self):
+        assert _texts("SELECT 1; -- don't\nSELECT 2;") == ["SELECT 1;", " -- don't\nSELECT 2;"]
+
+    def test_unterminated_block_comment_is_not_clean(self):
+        assert statement_ends("a; /* b; c") == ([2], False)
+
+    def test_script_header_in_comment_ignored(self):
+        assert script_regions("/*\nCREATE SCRIPT x AS\n*/ SELECT 1;") == []
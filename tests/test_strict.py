@@ -0,0 +1,179 @@
+"""Tests for strict-mode diagnostics of unrewritten constructs."""
+
+import pytest
+
+from exasol_sql_normalizer import normalize, register_handler, unregister_handler
+from exasol_sql_normalizer.cli import main
+
+
+def _strict(sql, handlers=None):
+    return normalize(sql, handlers, report=True, strict=True).diagnostics
+
+
+def _found(sql, handlers=None):
+    return [(d.code, sql[d.start:d.end]) for d in _strict(sql, handlers)]
+
+
+class TestKnownGaps:
+    def test_top_level_import_into_table(self):
+        sql = "IMPORT INTO stage.t FROM JDBC AT C STATEMENT 'SELECT a FROM t';"
+        [diag] = _strict(sql)
+        assert (diag.code, diag.severity) == ("S001", "error")
+        assert (diag.start, diag.end) == (0, len("IMPORT"))
+        assert "loads into a table" in diag.message
+
+    def test_top_level_import_after_comment(self):
+        sql = "SELECT 1;\n-- load\nIMPORT INTO t FROM CSV AT C FILE 'a.csv';"
+        assert _found(sql) == [("S001", "IMPORT")]
+
+    def test_rewritten_top_level_import_is_clean(self):
+        assert _strict("IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM t';") == []
+
+    def test_connect_by(self):
+        sql = "SELECT id FROM t START WITH pid IS NULL CONNECT  BY PRIOR id = pid"
+        assert _found(sql) == [("S002", "CONNECT  BY")]
+
+    def test_merge(self):
+        [diag] = _strict("MERGE INTO t USING u ON t.id = u.id WHEN MATCHED THEN DELETE")
+        assert (diag.code, diag.severity, diag.start) == ("S003", "warning", 0)
+
+    def test_script_region(self):
+        script = "CREATE PYTHON SCALAR SCRIPT s.f(a INT) RETURNS INT AS\nimport re\n/\n"
+        sql = "SELECT 1;\n" + script + "SELECT 2;"
+        [diag] = _strict(sql)
+        assert (diag.code, diag.severity) == ("S004", "info")
+        assert sql[diag.start:diag.end] == script.rstrip("\n")
+
+
+class TestNearMisses:
+    def test_import_into_unclosed_column_list(self):
+        sql = "SELECT * FROM (IMPORT INTO (a INT FROM JDBC AT C STATEMENT 'SELECT a FROM t')"
+        [diag] = _strict(sql)
+        assert diag.code == "S005"
+        assert sql[diag.start:diag.end] == "IMPORT"
+        assert "no closing ')'" in diag.message
+
+    @pytest.mark.parametrize("source, reason", [
+        ("FROM JDBC C", "FROM JDBC without AT"),
+        ("FROM EXA AT C", "FROM EXA is not a JDBC source"),
+        ("AT C", "no FROM JDBC AT"),
+    ])
+    def test_import_source(self, source, reason):
+        sql = f"SELECT * FROM (IMPORT INTO (a INT) {source} STATEMENT 'SELECT a FROM t')"
+        [diag] = _strict(sql)
+        assert diag.code == "S005"
+        assert reason in diag.message
+
+    @pytest.mark.parametrize("sql, reason", [
+        ("EXPORT s.t INTO CSV AT C FILE 'a.csv'", "exports a table"),
+        ("EXPORT (SELECT a FROM t INTO SCRIPT s.e", "no closing ')'"),
+        ("EXPORT (SELECT a FROM t) INTO CSV AT C FILE 'a.csv'", "INTO CSV is not INTO SCRIPT"),
+    ])
+    def test_export(self, sql, reason):
+        [diag] = _strict(sql)
+        assert (diag.code, diag.start) == ("S006", 0)
+        assert reason in diag.message
+
+    def test_group_concat_separator(self):
+        sql = "SELECT GROUP_CONCAT(a SEPARATOR ',' FROM t"
+        assert _found(sql) == [("S007", "SEPARATOR")]
+
+    def test_convert_with_charset(self):
+        sql = "SELECT CONVERT(VARCHAR(10) UTF8, a FROM t"
+        assert _found(sql) == [("S008", "CONVERT")]
+
+    def test_tsql_convert_is_clean(self):
+        assert _strict("SELECT CONVERT(VARCHAR(10), a, 120) FROM t") == []
+
+    def test_infix_regexp_like(self):
+        sql = "SELECT * FROM t WHERE name REGEXP_LIKE '^a'"
+        [diag] = _strict(sql)
+        assert (diag.code, sql[diag.start:diag.end]) == ("S009", "REGEXP_LIKE")
+        assert "not parenthesized" in diag.message
+
+    def test_function_regexp_like_is_clean(self):
+        assert _strict("SELECT * FROM t WHERE REGEXP_LIKE(name, '^a')") == []
+
+    @pytest.mark.parametrize("sql", [
+        "SELECT DISTINCT REGEXP_LIKE(name, '^a') FROM t",
+        "SELECT a FROM t ORDER BY REGEXP_LIKE(name, '^a')",
+        "SELECT COUNT(*) FROM t GROUP BY REGEXP_LIKE(name, '^a')",
+        "SELECT * FROM t WHERE x IN (1) AND y IS NOT NULL AND REGEXP_LIKE(name, '^a')",
+        "SELECT f(a) REGEXP_LIKE(name, '^a') FROM t",
+    ])
+    def test_function_regexp_like_after_keyword_is_clean(self, sql):
+        assert normalize(sql) == sql
+        assert _strict(sql) == []
+
+    def test_infix_regexp_like_unclosed(self):
+        sql = "SELECT * FROM t WHERE name REGEXP_LIKE('^a'"
+        [diag] = _strict(sql)
+        assert "no closing ')'" in diag.message
+
+    def test_only_for_handlers_in_pipeline(self):
+        sql = "SELECT GROUP_CONCAT(a SEPARATOR ',') FROM t"
+        assert _strict(sql, {"convert"}) == []
+        assert _strict(sql, {"group_concat"}) == []
+
+
+class TestStrictPass:
+    def test_clean_after_rewrites(self):
+        sql = (
+            "SELECT CONVERT(VARCHAR(1) UTF8, x), GROUP_CONCAT(b SEPARATOR '|'), "
+            "c REGEXP_LIKE('y') FROM (IMPORT INTO (c INT) FROM JDBC AT C "
+            "STATEMENT 'SELECT c FROM dbo.t') s;\n"
+            "EXPORT (SELECT 1) INTO SCRIPT s.e WITH A = 'b';"
+        )
+        assert _strict(sql) == []
+
+    def test_offsets_after_earlier_rewrites(self):
+        sql = (
+            "SELECT CONVERT(VARCHAR(1) UTF8, x), b REGEXP_LIKE('y') FROM t "
+            "START WITH p IS NULL CONNECT BY PRIOR id = p"
+        )
+        assert _found(sql) == [("S002", "CONNECT BY")]
+
+    def test_strings_and_comments_are_skipped(self):
+        sql = "SELECT 'CONNECT BY', \"MERGE\" FROM t -- IMPORT INTO x\n/* EXPORT t */"
+        assert _strict(sql) == []
+
+    def test_combined_with_lint_sorted_by_position(self):
+        sql = (
+            "SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM t');\n"
+            "MERGE INTO t USING u ON 1 = 1;"
+        )
+        result = normalize(sql, report=True, lint=True, strict=True)
+        assert [d.code for d in result.diagnostics] == ["L001", "S003"]
+
+    def test_normalized_output_unchanged(self):
+        sql = "SELECT GROUP_CONCAT(a SEPARATOR ',') FROM t CONNECT BY PRIOR a = b"
+        assert normalize(sql, report=True, strict=True).sql == normalize(sql)
+
+    def test_strict_implies_report(self):
+        result = normalize("SELECT a FROM t CONNECT BY PRIOR a = b", strict=True)
+        assert [d.code for d in result.diagnostics] == ["S002"]
+        assert result.sql == "SELECT a FROM t CONNECT BY PRIOR a = b"
+
+    def test_offsets_after_handler_without_scanner(self):
+        register_handler("expand", lambda sql: sql.replace("$T", "stage.target_table"), triggers=("$T",))
+        try:
+            sql = "SELECT a FROM $T CONNECT BY PRIOR a = b;"
+            [diag] = _strict(sql)
+            assert sql[diag.start:diag.end] == "CONNECT BY"
+        finally:
+            unregister_handler("expand")
+
+    def test_no_findings_without_strict(self):
+        assert normalize("MERGE INTO t USING u ON 1 = 1", report=True).diagnostics == []
+
+
+class TestLintCommand:
+    def test_strict_flag(self, tmp_path, capsys):
+        path = tmp_path / "q.sql"
+        path.write_text("SELECT 1;\nSELECT a FROM t CONNECT BY PRIOR a = b;\n")
+        assert main(["lint", str(path)]) == 0
+        assert capsys.readouterr().out == ""
+        assert main(["lint", "--strict", str(path)]) == 1
+        assert capsys.readouterr().out == (
+            f"{path}:2:17: error S002 CONNECT BY hierarchical query is not rewritten\n"
+        )
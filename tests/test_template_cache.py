@@ -0,0 +1,107 @@
+"""Tests for the literal-insensitive template cache."""
+
+import pytest
+
+from exasol_sql_normalizer import TemplateCache, normalize
+from exasol_sql_normalizer.template_cache import parameterize
+
+_TEMPLATE = (
+    "SELECT CONVERT(VARCHAR({size}) UTF8, GROUP_CONCAT(a SEPARATOR '{sep}')) AS c\n"
+    "FROM (IMPORT INTO (a VARCHAR(10)) FROM JDBC AT CON STATEMENT 'SELECT a FROM dbo.t')\n"
+    "WHERE a REGEXP_LIKE('{pattern}') AND batch_id = {batch} AND d = '{day}';\n"
+)
+
+
+def _query(i):
+    return _TEMPLATE.format(
+        size=100 + i, sep=",|"[i % 2], pattern=f"[0-{i % 10}]+", batch=i, day=f"2024-01-{i:02}",
+    )
+
+
+class TestParameterize:
+    def test_literals_replaced(self):
+        key, values = parameterize("SELECT 'a', 1 FROM t WHERE b = 2.5")
+        assert key == "SELECT '\ue000', \ue001 FROM t WHERE b = \ue001"
+        assert values == ["'a'", "1", "2.5"]
+
+    def test_statement_and_connection_stay_in_key(self):
+        sql = "IMPORT FROM JDBC AT 'jdbc:x' STATEMENT 'SELECT 1 FROM t'"
+        key, values = parameterize(sql)
+        assert key == sql
+        assert values == []
+
+    def test_script_bodies_stay_in_key(self):
+        sql = "CREATE SCRIPT s AS\n  x = 'lua' .. 1\n/\nSELECT 'sql';\n"
+        key, values = parameterize(sql)
+        assert "'lua' .. 1" in key
+        assert values == ["'sql'"]
+
+    def test_multiline_literals_stay_in_key(self):
+        _, values = parameterize("SELECT 'a\nb', 'c'")
+        assert values == ["'c'"]
+
+    def test_variants_share_a_key(self):
+        assert parameterize(_query(1))[0] == parameterize(_query(2))[0]
+
+
+class TestTemplateCache:
+    def test_matches_normalize(self):
+        cache = TemplateCache()
+        for i in range(20):
+            sql = _query(i)
+            assert cache.normalize(sql) == normalize(sql)
+        assert (cache.hits, cache.misses) == (19, 1)
+        assert cache.hit_rate == pytest.approx(0.95)
+        assert len(cache) == 1
+
+    def test_different_remote_statement_misses(self):
+        cache = TemplateCache()
+        first = "SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM x')"
+        second = "SELECT * FROM (IMPORT FROM JDBC AT C STATEMENT 'SELECT a FROM y')"
+        assert cache.normalize(first) == normalize(first)
+        assert cache.normalize(second) == normalize(second)
+        assert cache.hits == 0
+
+    def test_unchanged_input_returned_as_is(self):
+        cache = TemplateCache()
+        for i in range(3):
+            sql = f"SELECT a FROM t WHERE b = {i}"
+            assert cache.normalize(sql) is sql
+        assert cache.hits == 2
+
+    def test_unreplayable_template_falls_back(self):
+        # A number in front of infix REGEXP_LIKE is taken as the column
+        cache = TemplateCache()
+        for i in range(3):
+            sql = f"SELECT * FROM t WHERE {i} REGEXP_LIKE('a')"
+            assert cache.normalize(sql) == normalize(sql)
+        assert cache.hits == 0
+
+    def test_reserved_characters_bypass_cache(self):
+        cache = TemplateCache()
+        sql = "SELECT '\ue000' FROM t"
+        assert cache.normalize(sql) is sql
+        assert len(cache) == 0
+
+    def test_handler_subset(self):
+        cache = TemplateCache(handlers={"regexp_like"})
+        sql = "SELECT CONVERT(VARCHAR(5) UTF8, a) FROM t WHERE a REGEXP_LIKE('x')"
+        assert cache.normalize(sql) == normalize(sql, {"regexp_like"})
+
+    def test_lru_eviction(self):
+        cache = TemplateCache(maxsize=2)
+        for table in ("a", "b", "c"):
+            cache.normalize(f"SELECT * FROM {table} WHERE x = 1")
+        assert len(cache) == 2
+        cache.normalize("SELECT * FROM a WHERE x = 2")
+        assert cache.hits == 0
+
+    def test_clear(self):
+        cache = TemplateCache()
+        cache.normalize("SELECT 1")
+        cache.clear()
+        assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            TemplateCache(maxsize=0)
@@ -0,0 +1,51 @@
+"""Tests for the SQL tokenizer."""
+
+from exasol_sql_normalizer.tokens import literals, tokenize
+
+
+def _tokens(sql):
+    return [(kind, sql[start:end]) for kind, start, end in tokenize(sql)]
+
+
+class TestTokenize:
+    def test_kinds(self):
+        sql = "SELECT \"a b\", 'it''s', 1.5e3 FROM t -- x\n/* y */;"
+        assert [t for t in _tokens(sql) if t[0] != "space"] == [
+            ("word", "SELECT"), ("quoted", '"a b"'), ("punct", ","),
+            ("string", "'it''s'"), ("punct", ","), ("number", "1.5e3"),
+            ("word", "FROM"), ("word", "t"), ("comment", "-- x"),
+            ("comment", "/* y */"), ("punct", ";"),
+        ]
+
+    def test_tokens_cover_input(self):
+        sql = "SELECT a1, $x, 'open"
+        tokens = list(tokenize(sql))
+        assert "".join(sql[s:e] for _, s, e in tokens) == sql
+        assert tokens[-1][0] == "string"
+
+    def test_range(self):
+        sql = "abc 12 def"
+        assert [(k, sql[s:e]) for k, s, e in tokenize(sql, 4, 6)] == [("number", "12")]
+
+
+class TestLiterals:
+    def _literals(self, sql):
+        return [(kind, sql[start:end]) for kind, start, end in literals(sql)]
+
+    def test_strings_and_numbers(self):
+        sql = "SELECT a, 42, .5, 'x''y' FROM t WHERE b = 1e-3"
+        assert self._literals(sql) == [
+            ("number", "42"), ("number", ".5"), ("string", "'x''y'"), ("number", "1e-3"),
+        ]
+
+    def test_identifiers_comments_and_quoted_skipped(self):
+        sql = "SELECT t1.c2, \"3\", x.5 -- 4\n/* '5' */ FROM t"
+        assert self._literals(sql) == []
+
+    def test_unterminated_string_skipped(self):
+        assert self._literals("SELECT 1, 'open 2") == [("number", "1")]
+
+    def test_matches_tokenize_on_plain_sql(self):
+        sql = "SELECT a, 7, 'b', \"c\" FROM t WHERE d IN (1, 2.5) -- 9"
+        expected = [t for t in tokenize(sql) if t[0] in ("string", "number")]
+        assert list(literals(sql)) == expected
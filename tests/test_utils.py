@@ -2,11 +2,20 @@
 
 from exasol_sql_normalizer.utils import (
     _cap_table_ref,
+    apply_edits,
+    closing_quote,
     extract_quoted_string,
     extract_tables_from_statement,
     is_inside_string,
+    matching_paren,
+    original_offset,
     skip_quoted_string,
+    share_skip_spans,
+    skip_spans,
     skip_whitespace,
+    split_top_level,
+    stop_sharing_skip_spans,
+    top_level_comma,
 )
 
 
@@ -41,6 +50,15 @@ class TestExtractQuotedString:
         assert "FROM t" in content
 
 
+class TestClosingQuote:
+    def test_skips_escaped_quotes(self):
+        assert closing_quote("'it''s' x", 0) == 6
+
+    def test_unterminated(self):
+        assert closing_quote("'abc", 0) == 4
+        assert closing_quote("'abc''", 0) == 6
+
+
 class TestSkipQuotedString:
     def test_skips_past_closing_quote(self):
         assert skip_quoted_string("'hello' rest", 0) == 7
@@ -70,6 +88,106 @@ class TestIsInsideString:
     def test_after_escaped_quote(self):
         assert is_inside_string("'it''s here'", 7) is True
 
+    def test_unterminated_string_at_end(self):
+        assert is_inside_string("SELECT 'abc", 11) is True
+
+
+class TestMatchingParen:
+    def test_skips_quotes_and_nested_parens(self):
+        sql = "(a, ')', \"(\", (b)) tail"
+        assert matching_paren(sql, 0) == sql.index(" tail") - 1
+
+    def test_unbalanced(self):
+        assert matching_paren("(a, 'b)", 0) == -1
+        assert matching_paren('(a "b)', 0) == -1
+
+
+class TestTopLevelComma:
+    def test_skips_nested_and_quoted_commas(self):
+        sql = "(f(a, b) || ',' || \"x,y\", c, d)"
+        assert top_level_comma(sql, 1, len(sql) - 1) == sql.index(", c")
+
+    def test_none(self):
+        sql = "(f(a, b) || ',')"
+        assert top_level_comma(sql, 1, len(sql) - 1) == -1
+
+
+class TestSplitTopLevel:
+    def test_parts_keep_whitespace(self):
+        assert split_top_level("a INT DEFAULT 'x,y', b DECIMAL(18, 2)") == [
+            "a INT DEFAULT 'x,y'", " b DECIMAL(18, 2)",
+        ]
+
+    def test_slice(self):
+        sql = "f(a, (b, c))"
+        assert split_top_level(sql, 2, len(sql) - 1) == ["a", " (b, c)"]
+
+
+class TestSkipSpans:
+    def test_string_and_comments(self):
+        sql = "SELECT 'a' -- c\n/* d */ x"
+        spans = skip_spans(sql)
+        assert list(zip(spans.starts, spans.ends)) == [(7, 10), (11, 15), (16, 23)]
+
+    def test_end_at(self):
+        spans = skip_spans("a /* b */ c")
+        assert spans.end_at(4) == 9
+        assert spans.end_at(2) == 9
+        assert spans.end_at(9) == -1
+        assert spans.end_at(0) == -1
+
+    def test_comment_markers_inside_string(self):
+        spans = skip_spans("SELECT '--', '/*' FROM t")
+        assert list(zip(spans.starts, spans.ends)) == [(7, 11), (13, 17)]
+
+    def test_quote_inside_comment(self):
+        spans = skip_spans("-- don't\nIMPORT")
+        assert spans.end_at(10) == -1
+
+    def test_unterminated_runs_to_end(self):
+        assert skip_spans("x /* open").ends == [9]
+        assert skip_spans("x 'open").ends == [7]
+
+    def test_shared_only_while_active(self):
+        sql = "SELECT 'a' FROM t"
+        assert skip_spans(sql) is not skip_spans(sql)
+        token = share_skip_spans()
+        try:
+            spans = skip_spans(sql)
+            assert skip_spans(sql) is spans
+            assert skip_spans(sql + " ") is not spans
+        finally:
+            stop_sharing_skip_spans(token)
+        assert skip_spans(sql) is not spans
+
+
+class TestApplyEdits:
+    def test_no_edits_returns_same_object(self):
+        sql = "SELECT 1"
+        assert apply_edits(sql, []) is sql
+
+    def test_replacements_in_order(self):
+        assert apply_edits("abcdef", [(0, 1, "X"), (3, 5, "")]) == "Xbcf"
+
+    def test_insertion(self):
+        assert apply_edits("ab", [(1, 1, "-")]) == "a-b"
+
+
+class TestOriginalOffset:
+    def test_maps_through_edits(self):
+        sql = "abcdefgh"
+        edits = [(1, 3, "XYZW"), (5, 6, "")]
+        out = apply_edits(sql, edits)
+        assert out == "aXYZWdeg" + "h"
+        assert original_offset(0, edits) == 0
+        assert original_offset(3, edits) == 1
+        assert original_offset(out.index("d"), edits) == 3
+        assert original_offset(out.index("g"), edits) == 6
+        assert original_offset(len(out), edits) == len(sql)
+
+    def test_no_edits(self):
+        assert original_offset(4, []) == 4
+
 
 class TestCapTableRef:
     def test_one_part_unchanged(self):
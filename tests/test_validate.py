@@ -0,0 +1,107 @@
+"""Tests for round-trip validation with sqlglot."""
+
+import json
+
+import pytest
+
+from exasol_sql_normalizer.cli import main
+from exasol_sql_normalizer.validate import UNCHANGED, statements, validate
+
+_GOOD = "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t;\n"
+_BAD_CONVERT = "SELECT CONVERT(VARCHAR(10) UTF8, a) FROM t WHERE;\n"
+_BAD = "SELECT * FROM t WHERE AND;\n"
+
+
+@pytest.fixture
+def sqlglot():
+    return pytest.importorskip("sqlglot")
+
+
+class TestStatements:
+    def test_offsets_skip_leading_comments(self):
+        text = "SELECT 1;\n-- note\n  SELECT 2;"
+        assert [(text[s:e], line, col) for s, e, line, col in statements(text)] == [
+            ("SELECT 1;", 1, 1), ("SELECT 2;", 3, 3),
+        ]
+
+    def test_empty_and_script_statements_skipped(self):
+        text = "SELECT 1;\n;\nCREATE SCRIPT s.x AS\nselect ( ;\n/\n-- trailing\n"
+        assert [text[s:e] for s, e, _, _ in statements(text)] == ["SELECT 1;"]
+
+
+class TestValidate:
+    def test_failures_with_original_offsets(self, sqlglot, tmp_path):
+        path = tmp_path / "a.sql"
+        path.write_text(_GOOD + _BAD_CONVERT + _BAD)
+        report = validate([str(path)], workers=1)
+        assert report.statements == 3
+        assert [(f.line, f.handlers) for f in report.failures] == [
+            (2, ("convert",)), (3, ()),
+        ]
+        first = report.failures[0]
+        assert path.read_text()[first.start:first.end] == _BAD_CONVERT.strip()
+        assert report.by_handler == {"convert": (1, 2), UNCHANGED: (1, 1)}
+
+    def test_cache_skips_parsing(self, sqlglot, tmp_path):
+        path = tmp_path / "a.sql"
+        path.write_text(_GOOD + _BAD)
+        cache = str(tmp_path / "cache.json")
+        first = validate([str(path)], workers=1, cache_path=cache)
+        assert first.parsed == 2
+
+        path.write_text(_GOOD + _BAD + "SELECT 3;\n")
+        second = validate([str(path)], workers=1, cache_path=cache)
+        assert second.parsed == 1
+        assert [f.line for f in second.failures] == [2]
+        assert second.failures[0].error == first.failures[0].error
+
+    def test_cache_dropped_for_other_dialect(self, sqlglot, tmp_path):
+        path = tmp_path / "a.sql"
+        path.write_text(_GOOD)
+        cache = str(tmp_path / "cache.json")
+        validate([str(path)], workers=1, cache_path=cache)
+        assert validate([str(path)], workers=1, cache_path=cache, dialect="mysql").parsed == 1
+
+    def test_duplicates_parsed_once(self, sqlglot, tmp_path):
+        path = tmp_path / "a.sql"
+        path.write_text(_BAD * 3)
+        report = validate([str(path)], workers=1)
+        assert (report.statements, report.parsed, len(report.failures)) == (3, 1, 3)
+
+    def test_pool_matches_in_process(self, sqlglot, tmp_path):
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"{i}.sql"
+            path.write_text((_GOOD + _BAD_CONVERT + f"SELECT {i};\n") * 5)
+            paths.append(str(path))
+        pooled = validate(paths, workers=2, chunk_size=2)
+        serial = validate(paths, workers=1)
+        assert [(f.path, f.start) for f in pooled.failures] == [
+            (f.path, f.start) for f in serial.failures
+        ]
+        assert pooled.by_handler == serial.by_handler
+
+    def test_invalid_arguments(self, sqlglot, tmp_path):
+        with pytest.raises(ValueError):
+            validate([], handlers={"nope"})
+        with pytest.raises(ValueError):
+            validate([], workers=0)
+
+
+class TestCli:
+    def test_exit_codes_and_json(self, sqlglot, tmp_path, capsys):
+        good = tmp_path / "good.sql"
+        good.write_text(_GOOD)
+        bad = tmp_path / "bad.sql"
+        bad.write_text(_GOOD + _BAD_CONVERT)
+        assert main(["validate", "--no-cache", "--workers", "1", str(good)]) == 0
+        capsys.readouterr()
+
+        assert main(["validate", "--no-cache", "--format", "json", str(bad)]) == 1
+        out, err = capsys.readouterr()
+        record = json.loads(out)
+        assert (record["line"], record["handlers"]) == (2, ["convert"])
+        assert "convert" in err
+
+    def test_missing_file(self, sqlglot, tmp_path):
+        assert main(["validate", "--no-cache", str(tmp_path / "missing.sql")]) == 2
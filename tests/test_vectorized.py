@@ -0,0 +1,106 @@
+"""Tests for the pandas / pyarrow column adapters."""
+
+import importlib.util
+
+import pytest
+
+from exasol_sql_normalizer import normalize
+from exasol_sql_normalizer import vectorized
+
+_INFIX = "SELECT * FROM t WHERE c REGEXP_LIKE('x')"
+_CONVERT = "SELECT CONVERT(VARCHAR(5) UTF8, a) FROM t"
+_PLAIN = "SELECT 1"
+
+
+@pytest.fixture
+def pd():
+    return pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def pa():
+    return pytest.importorskip("pyarrow")
+
+
+class TestSeries:
+    def test_object_series(self, pd):
+        series = pd.Series(
+            [_INFIX, None, _CONVERT, _INFIX], index=[10, 11, 12, 13], name="sql", dtype=object,
+        )
+        result = vectorized.normalize_series(series)
+        assert result.tolist() == [normalize(_INFIX), None, normalize(_CONVERT), normalize(_INFIX)]
+        assert result.index.tolist() == [10, 11, 12, 13]
+        assert result.name == "sql"
+        assert result.dtype == object
+
+    def test_string_dtype_keeps_na(self, pd):
+        series = pd.Series([_INFIX, pd.NA, _PLAIN], dtype="string")
+        result = vectorized.normalize_series(series)
+        assert result.dtype == series.dtype
+        assert result.isna().tolist() == [False, True, False]
+        assert result[0] == normalize(_INFIX)
+
+    def test_inferred_dtype_kept(self, pd):
+        series = pd.Series([_INFIX, None, _PLAIN])
+        result = vectorized.normalize_series(series)
+        assert result.dtype == series.dtype
+        assert result.isna().tolist() == [False, True, False]
+        assert result[0] == normalize(_INFIX)
+
+    def test_categorical(self, pd):
+        series = pd.Series([_INFIX, _PLAIN, _INFIX], dtype="category")
+        result = vectorized.normalize_series(series)
+        assert result.dtype == "category"
+        assert result.tolist() == [normalize(_INFIX), _PLAIN, normalize(_INFIX)]
+
+    def test_parallel_above_threshold(self, pd):
+        series = pd.Series([f"SELECT * FROM t WHERE c{i % 20} REGEXP_LIKE('x')" for i in range(60)])
+        result = vectorized.normalize_series(series, parallel_threshold=10, workers=2)
+        assert result.tolist() == [normalize(s) for s in series]
+
+    def test_non_string_rejected(self, pd):
+        with pytest.raises(TypeError):
+            vectorized.normalize_series(pd.Series([_PLAIN, 3]))
+
+
+class TestArrow:
+    @pytest.mark.parametrize("type_name", ["string", "large_string"])
+    def test_string_array(self, pa, type_name):
+        array = pa.array([_INFIX, None, _CONVERT, _INFIX], type=getattr(pa, type_name)())
+        result = vectorized.normalize_array(array)
+        assert result.type == array.type
+        assert result.to_pylist() == [normalize(_INFIX), None, normalize(_CONVERT), normalize(_INFIX)]
+
+    def test_chunked_array(self, pa):
+        array = pa.chunked_array([[_INFIX, None], [_PLAIN]])
+        result = vectorized.normalize_array(array)
+        assert isinstance(result, pa.ChunkedArray)
+        assert result.to_pylist() == [normalize(_INFIX), None, _PLAIN]
+
+    def test_dictionary_array(self, pa):
+        array = pa.array([_INFIX, _PLAIN, None, _INFIX]).dictionary_encode()
+        result = vectorized.normalize_array(array)
+        assert pa.types.is_dictionary(result.type)
+        assert result.to_pylist() == [normalize(_INFIX), _PLAIN, None, normalize(_INFIX)]
+
+    def test_non_string_rejected(self, pa):
+        with pytest.raises(TypeError):
+            vectorized.normalize_array(pa.array([1, 2]))
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pandas") is not None, reason="pandas installed")
+def test_missing_pandas_message():
+    with pytest.raises(ImportError, match=r"exasol-sql-normalizer\[pandas\]"):
+        vectorized.normalize_series([_PLAIN])
+
+
+class TestUniques:
+    def test_parallel_and_serial_agree(self):
+        uniques = [f"SELECT * FROM t WHERE c{i} REGEXP_LIKE('x')" for i in range(30)]
+        serial = vectorized._normalize_uniques(uniques, None, 1000, None)
+        parallel = vectorized._normalize_uniques(uniques, None, 10, 2)
+        assert serial == parallel == [normalize(s) for s in uniques]
+
+    def test_non_string_rejected(self):
+        with pytest.raises(TypeError, match="int"):
+            vectorized._normalize_uniques([_PLAIN, 3], None, 1000, None)